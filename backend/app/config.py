@@ -55,6 +55,12 @@ MODEL_IDLE_TIMEOUT = int(os.getenv("MODEL_IDLE_TIMEOUT", "480"))  # 8 minutes be
 
 # rembg model
 REMBG_MODEL = os.getenv("REMBG_MODEL", "u2net")
+# "adaptive": decode large JPEGs at reduced scale, cap the output at
+# REMBG_MAX_OUTPUT_SIDE px, infer the mask at REMBG_MASK_SIZE px and upscale it
+# with edge refinement. "full": run rembg on the full-resolution upload.
+REMBG_MODE = os.getenv("REMBG_MODE", "adaptive")
+REMBG_MASK_SIZE = int(os.getenv("REMBG_MASK_SIZE", "1024"))
+REMBG_MAX_OUTPUT_SIDE = int(os.getenv("REMBG_MAX_OUTPUT_SIDE", "2048"))  # 0 = keep original size
 
 # Texture generation
 ENABLE_TEXTURE = os.getenv("ENABLE_TEXTURE", "true").lower() in ("true", "1", "yes")
@@ -85,6 +91,112 @@ QUALITY_PRESETS = {
 
 DEFAULT_QUALITY_PRESET = "balanced"
 
+# Background warmup after startup: import rendering/rembg stacks, then load job history
+JOB_CACHE_WARM_DELAY = float(os.getenv("JOB_CACHE_WARM_DELAY", "5"))
+PRELOAD_HEAVY_MODULES = os.getenv("PRELOAD_HEAVY_MODULES", "true").lower() in ("true", "1", "yes")
+
+# Stage profiling (opt-in): cProfile sampled runs of the listed stages ("rembg,render")
+# and keep the stats when a run takes longer than PROFILE_SLOW_SECONDS
+PROFILE_STAGES = {s.strip() for s in os.getenv("PROFILE_STAGES", "").split(",") if s.strip()}
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "10"))
+
+# Asset serving (per-job manifest + resized thumbnails)
+ASSET_THUMBNAIL_SIZES = (128, 256, 512)
+ASSET_THUMBNAIL_CACHE_MB = int(os.getenv("ASSET_THUMBNAIL_CACHE_MB", "64"))
+ASSET_CACHE_MAX_AGE = int(os.getenv("ASSET_CACHE_MAX_AGE", "31536000"))  # 1 year for versioned URLs
+
+# Per-route rate limits ("<count>/<second|minute|hour|day>"), keyed by API key + client IP
+RATE_LIMITS = {
+    "upload": os.getenv("RATE_LIMIT_UPLOAD", "100/hour"),
+    "generate": os.getenv("RATE_LIMIT_GENERATE", "10/hour"),
+    "retexture": os.getenv("RATE_LIMIT_RETEXTURE", "20/hour"),
+    "export": os.getenv("RATE_LIMIT_EXPORT", "30/hour"),
+    "print": os.getenv("RATE_LIMIT_PRINT", "60/hour"),
+    "batch": os.getenv("RATE_LIMIT_BATCH", "1000/hour"),  # counted per batch item
+}
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "1000000"))
+RATE_LIMIT_SWEEP_SECONDS = float(os.getenv("RATE_LIMIT_SWEEP_SECONDS", "60"))
+
+# Event loop lag sampling (seconds between probes); stalls longer than
+# LOOP_BLOCK_THRESHOLD are logged with the loop thread's stack
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+LOOP_BLOCK_THRESHOLD = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.25"))
+
+# Stuck-job reaper: per-stage deadlines (seconds) for Meshy generations.
+# Stuck jobs are resubmitted JOB_STUCK_RETRIES times, then failed.
+JOB_QUEUE_DEADLINE = int(os.getenv("JOB_QUEUE_DEADLINE", "1800"))            # queued / Meshy PENDING
+JOB_GENERATION_DEADLINE = int(os.getenv("JOB_GENERATION_DEADLINE", "1800"))  # Meshy IN_PROGRESS
+JOB_POLL_FAILURE_DEADLINE = int(os.getenv("JOB_POLL_FAILURE_DEADLINE", "600"))  # no successful poll
+JOB_STUCK_RETRIES = int(os.getenv("JOB_STUCK_RETRIES", "1"))
+REAPER_INTERVAL = float(os.getenv("REAPER_INTERVAL", "30"))
+
+# Meshy submission control: generations in flight upstream adapt (AIMD) between
+# 1 and MESHY_MAX_IN_FLIGHT; create calls slower than the latency target count as
+# congestion. 5xx/network errors are retried up to MESHY_SUBMIT_MAX_ATTEMPTS times
+# with jittered backoff. Retries in the last MESHY_RETRY_BUDGET_WINDOW seconds are
+# limited to MESHY_RETRY_BUDGET_RATIO of the successful submissions in that window
+# plus a reserve of MESHY_RETRY_BUDGET_MIN.
+MESHY_INITIAL_IN_FLIGHT = int(os.getenv("MESHY_INITIAL_IN_FLIGHT", "4"))
+MESHY_MAX_IN_FLIGHT = int(os.getenv("MESHY_MAX_IN_FLIGHT", "20"))
+MESHY_SUBMIT_LATENCY_TARGET = float(os.getenv("MESHY_SUBMIT_LATENCY_TARGET", "10"))
+MESHY_SUBMIT_MAX_ATTEMPTS = int(os.getenv("MESHY_SUBMIT_MAX_ATTEMPTS", "5"))
+MESHY_RETRY_BUDGET_RATIO = float(os.getenv("MESHY_RETRY_BUDGET_RATIO", "0.2"))
+MESHY_RETRY_BUDGET_MIN = float(os.getenv("MESHY_RETRY_BUDGET_MIN", "10"))
+MESHY_RETRY_BUDGET_WINDOW = float(os.getenv("MESHY_RETRY_BUDGET_WINDOW", "60"))
+MESHY_RETRY_BACKOFF_BASE = float(os.getenv("MESHY_RETRY_BACKOFF_BASE", "1"))
+MESHY_RETRY_BACKOFF_MAX = float(os.getenv("MESHY_RETRY_BACKOFF_MAX", "60"))
+
+# Background rendering of the four preview views after completion
+# (RENDER_NICE lowers the render threads' CPU priority on Linux)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "1"))
+RENDER_NICE = int(os.getenv("RENDER_NICE", "10"))
+
+# Threads for blocking filesystem work (uploads, job state, listings, deletes)
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "4"))
+
+# Storage budgets (MB, 0 = unlimited) and retention (days since last access,
+# 0 = keep). Over budget, the least recently used finished jobs are deleted.
+STORAGE_QUOTA_MB = int(os.getenv("STORAGE_QUOTA_MB", "0"))
+STORAGE_TENANT_QUOTA_MB = int(os.getenv("STORAGE_TENANT_QUOTA_MB", "0"))
+STORAGE_RETENTION_DAYS = float(os.getenv("STORAGE_RETENTION_DAYS", "0"))
+STORAGE_GC_INTERVAL = float(os.getenv("STORAGE_GC_INTERVAL", "300"))
+
+# Object storage for job artifacts: "local" (STORAGE_DIR, served by the API) or
+# "s3" (uploaded, served by presigned URL). S3_ENDPOINT_URL targets MinIO or
+# another S3-compatible service; credentials come from the usual AWS_* variables.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_PRESIGN_EXPIRY = int(os.getenv("S3_PRESIGN_EXPIRY", "3600"))
+S3_MULTIPART_CHUNK_MB = int(os.getenv("S3_MULTIPART_CHUNK_MB", "8"))
+
+# Bulk ZIP export: max jobs per archive and read size per step (memory per export)
+EXPORT_MAX_JOBS = int(os.getenv("EXPORT_MAX_JOBS", "1000"))
+EXPORT_CHUNK_KB = int(os.getenv("EXPORT_CHUNK_KB", "1024"))
+
+# Print exports (STL/3MF/OBJ): converter processes, conversions queued before
+# requests get 503, converted files kept per job, and the largest size_mm accepted
+PRINT_WORKERS = int(os.getenv("PRINT_WORKERS", "2"))
+PRINT_MAX_PENDING = int(os.getenv("PRINT_MAX_PENDING", "16"))
+PRINT_CACHE_FILES = int(os.getenv("PRINT_CACHE_FILES", "12"))
+PRINT_MAX_SIZE_MM = float(os.getenv("PRINT_MAX_SIZE_MM", "2000"))
+
+# Batch submission: items per request and size of one image part
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_IMAGE_MB = int(os.getenv("BATCH_MAX_IMAGE_MB", "25"))
+
+# ETA estimates: weight kept by older stage-duration samples per new sample
+# (0.95 ~ the last 20 jobs), and how many samples' worth the stage-wide
+# average counts for when estimating a settings combination with little history
+ETA_DECAY = float(os.getenv("ETA_DECAY", "0.95"))
+ETA_PRIOR_SAMPLES = float(os.getenv("ETA_PRIOR_SAMPLES", "3"))
+
+# Longest a status long-poll (GET /api/jobs/{id}/status?wait=) is held, in seconds
+STATUS_MAX_WAIT = float(os.getenv("STATUS_MAX_WAIT", "60"))
+
 
 # ============================================================================
 # VRAM MANAGEMENT & TEXTURE ADAPTIVE CONFIGURATION
@@ -218,10 +330,11 @@ class GPUSlotManager:
                 GEOMETRY_DEVICE: {"busy_seconds": 0, "total_seconds": 0},
                 REMBG_DEVICE: {"busy_seconds": 0, "total_seconds": 0}
             },
+            # Running count/sum per stage (constant memory; percentiles are on /metrics)
             "stage_completion_times": {
-                JobStage.REMBG.value: [],
-                JobStage.GEOMETRY.value: [],
-                JobStage.TEXTURE.value: []
+                JobStage.REMBG.value: {"count": 0, "sum": 0.0},
+                JobStage.GEOMETRY.value: {"count": 0, "sum": 0.0},
+                JobStage.TEXTURE.value: {"count": 0, "sum": 0.0}
             }
         }
         
@@ -287,8 +400,10 @@ class GPUSlotManager:
         """Record completion time untuk metrics."""
         with self._lock:
             self._metrics["total_jobs_processed"] += 1
-            if stage.value in self._metrics["stage_completion_times"]:
-                self._metrics["stage_completion_times"][stage.value].append(duration_seconds)
+            totals = self._metrics["stage_completion_times"].get(stage.value)
+            if totals is not None:
+                totals["count"] += 1
+                totals["sum"] += duration_seconds
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get processing metrics."""
@@ -300,8 +415,8 @@ class GPUSlotManager:
                 "uptime_seconds": total_time,
                 "current_slots": self.get_slot_status(),
                 "avg_stage_times": {
-                    stage: sum(times) / len(times) if times else 0
-                    for stage, times in self._metrics["stage_completion_times"].items()
+                    stage: totals["sum"] / totals["count"] if totals["count"] else 0
+                    for stage, totals in self._metrics["stage_completion_times"].items()
                 }
             }
 
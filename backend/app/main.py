@@ -1,44 +1,84 @@
+import time
 import logging
 import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
-from app.config import CORS_ORIGINS
+from app.config import CORS_ORIGINS, JOB_CACHE_WARM_DELAY, PRELOAD_HEAVY_MODULES
 from app.routers import jobs
-from app.workers.task_queue import restore_jobs_from_disk
+from app.workers.task_queue import (
+    restore_active_jobs, warm_job_cache, stop_job_cache_warmer, run_in_thread, shutdown_io_executor
+)
 from app.services.meshy import meshy_service
+from app.services import mesh_renderer, image_processor
+from app.services.print_export import shutdown_print_pool
+from app.services.eta import load_stats as load_eta_stats, save_stats as save_eta_stats
+from app.services.metrics import REGISTRY
+from app.middleware.rate_limit import limiter
+from app.workers.loop_monitor import monitor_loop_lag
+from app.workers.render_queue import shutdown_render_queue
+from app.workers.storage_gc import run_storage_gc, save_ledger
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _preload_heavy_modules():
+    started = time.perf_counter()
+    for module in (mesh_renderer, image_processor):
+        try:
+            module.preload()
+        except Exception as e:
+            logger.warning(f"Preload of {module.__name__} failed: {e}")
+    logger.info(f"✓ Heavy modules preloaded in {time.perf_counter() - started:.2f}s")
+
+
+async def _warmup():
+    """Warm module imports and job history once the server is serving."""
+    await asyncio.sleep(JOB_CACHE_WARM_DELAY)
+    if PRELOAD_HEAVY_MODULES:
+        await run_in_thread(_preload_heavy_modules)
+    count = await run_in_thread(warm_job_cache)
+    logger.info(f"✓ Job cache warmed ({count} historical job(s))")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Restore jobs from disk (important for history)
-    restore_jobs_from_disk()
-    logger.info("✓ Jobs restored from disk")
+    # Only in-flight jobs are needed before serving; history is loaded on
+    # first access (get_job disk fallback) or by the background warmer
+    active_count = restore_active_jobs()
+    logger.info(f"✓ {active_count} active job(s) restored from disk")
+    if load_eta_stats():
+        logger.info("✓ ETA statistics restored")
 
     # Start Meshy polling service
     meshy_service.start_polling()
+    warm_task = asyncio.create_task(_warmup())
+    lag_task = asyncio.create_task(monitor_loop_lag())
+    sweep_task = asyncio.create_task(limiter.run_sweeper())
+    gc_task = asyncio.create_task(run_storage_gc())
 
     yield
 
     # Clean up on shutdown
+    stop_job_cache_warmer()
+    warm_task.cancel()
+    lag_task.cancel()
+    sweep_task.cancel()
+    gc_task.cancel()
     meshy_service.stop_polling()
+    shutdown_render_queue()
+    shutdown_print_pool()
+    shutdown_io_executor()
+    save_ledger()
+    save_eta_stats()
     logger.info("Shutting down")
 
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/hour"])
-
 app = FastAPI(title="ProtoScale-AI Backend", lifespan=lifespan)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 logger.info(f"CORS allowed origins: {CORS_ORIGINS}")
 
@@ -97,3 +137,9 @@ async def health():
         "service": "ProtoScale-AI Backend"
 
     }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition (stage histograms, Meshy API counters, gauges)."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,210 @@
+"""Per-route rate limiting with GCRA (generic cell rate algorithm).
+
+Each key stores a single float, its "theoretical arrival time" (TAT), so
+memory is O(1) per client regardless of the limit. A key whose TAT has
+passed carries no information (the client has its full burst back) and is
+evicted by the background sweeper.
+
+Keys combine route, API key and client IP. Storage is pluggable: implement
+RateLimitStorage (e.g. on Redis with a Lua script) and pass it to
+RateLimiter.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from app.config import RATE_LIMITS, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_SWEEP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`limit` requests per `period` seconds; the whole limit may be used as a burst."""
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """Parse "10/hour", "100/minute", "5/30second" style specs."""
+        match = _LIMIT_RE.match(spec.lower())
+        if not match:
+            raise ValueError(f"Invalid rate limit: {spec!r}")
+        count, multiplier, unit = match.groups()
+        return cls(int(count), _PERIODS[unit] * int(multiplier or 1))
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class RateLimitStorage:
+    """Key -> TAT store. `update` must apply `fn` atomically per key."""
+
+    def update(self, key: str, fn: Callable[[Optional[float]], Tuple[Optional[float], RateLimitResult]]) -> RateLimitResult:
+        """Store fn(current TAT or None)[0] unless it is None; return fn(...)[1]."""
+        raise NotImplementedError
+
+    def sweep(self, now: float, batch_size: int = 10_000) -> Iterator[int]:
+        """Yield after each batch of keys checked, evicting those with TAT <= now."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryStorage(RateLimitStorage):
+    """Process-local storage bounded to `max_keys` entries.
+
+    Keys are stored as their 64-bit hash (stable within the process), so a
+    long API key + IP string costs no more than a short one. Past the cap the
+    oldest key is dropped, which at worst resets that client's allowance.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self._tats: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def update(self, key, fn):
+        key = hash(key)
+        tats = self._tats
+        with self._lock:
+            new_tat, result = fn(tats.get(key))
+            if new_tat is not None:
+                tats[key] = new_tat
+                if len(tats) > self._max_keys:
+                    del tats[next(iter(tats))]
+            return result
+
+    def sweep(self, now, batch_size=10_000):
+        with self._lock:
+            keys = list(self._tats)
+        for start in range(0, len(keys), batch_size):
+            evicted = 0
+            with self._lock:
+                for key in islice(keys, start, start + batch_size):
+                    tat = self._tats.get(key)
+                    if tat is not None and tat <= now:
+                        del self._tats[key]
+                        evicted += 1
+            yield evicted
+
+    def __len__(self):
+        return len(self._tats)
+
+
+class RateLimiter:
+    def __init__(self, storage: Optional[RateLimitStorage] = None, clock: Callable[[], float] = time.monotonic):
+        self.storage = storage if storage is not None else InMemoryStorage()
+        self.clock = clock
+
+    def hit(self, key: str, rate: RateLimit, now: Optional[float] = None, cost: int = 1) -> RateLimitResult:
+        """Count `cost` requests for `key` at once; denied requests do not consume quota."""
+        now = self.clock() if now is None else now
+        interval = rate.interval * cost
+
+        period = rate.period
+
+        def gcra(tat: Optional[float]):
+            if tat is None or tat < now:
+                tat = now
+            new_tat = tat + interval
+            excess = new_tat - now - period
+            if excess > 0:
+                return None, RateLimitResult(False, 0, excess)
+            remaining = int((period - (new_tat - now)) // rate.interval + 1e-9)
+            return new_tat, RateLimitResult(True, remaining, 0.0)
+
+        return self.storage.update(key, gcra)
+
+    def refund(self, key: str, rate: RateLimit, now: Optional[float] = None, cost: int = 1):
+        """Give back `cost` requests counted by hit() (e.g. for work that was never done)."""
+        now = self.clock() if now is None else now
+        interval = rate.interval * cost
+
+        def give_back(tat: Optional[float]):
+            if tat is None or tat <= now:
+                return None, None  # nothing outstanding; the client already has its full burst
+            return max(now, tat - interval), None
+
+        self.storage.update(key, give_back)
+
+    async def run_sweeper(self, every: float = RATE_LIMIT_SWEEP_SECONDS):
+        """Periodically evict idle keys, yielding to the loop between batches."""
+        while True:
+            await asyncio.sleep(every)
+            evicted = 0
+            for batch_evicted in self.storage.sweep(self.clock()):
+                evicted += batch_evicted
+                await asyncio.sleep(0)
+            if evicted:
+                logger.info(f"Rate limiter evicted {evicted} idle key(s), {len(self.storage)} tracked")
+
+
+limiter = RateLimiter()
+_RATES = {route: RateLimit.parse(spec) for route, spec in RATE_LIMITS.items()}
+
+
+def client_key(request: Request) -> str:
+    api_key = request.headers.get("x-api-key") or "-"
+    client_ip = request.client.host if request.client else "unknown"
+    return f"{api_key}|{client_ip}"
+
+
+def tenant_id(request: Request) -> str:
+    """Stable, non-reversible id of the client, stored on jobs for storage quotas."""
+    return "c-" + hashlib.sha256(client_key(request).encode()).hexdigest()[:12]
+
+
+def charge_rate_limit(request: Request, route: str, cost: int = 1) -> Dict[str, str]:
+    """Count `cost` requests against RATE_LIMITS[route] for this client.
+
+    Raises 429 when over the limit; returns the X-RateLimit-* headers otherwise.
+    """
+    spec = RATE_LIMITS[route]
+    rate = _RATES[route]
+    if cost > rate.limit:
+        raise HTTPException(429, f"Rate limit for {route} is {spec}; {cost} requested at once")
+    result = limiter.hit(f"{route}|{client_key(request)}", rate, cost=cost)
+    headers = {"X-RateLimit-Limit": str(rate.limit), "X-RateLimit-Remaining": str(result.remaining)}
+    if not result.allowed:
+        headers["Retry-After"] = str(math.ceil(result.retry_after))
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded for {route}: max {spec}. Retry in {math.ceil(result.retry_after)}s.",
+            headers=headers,
+        )
+    return headers
+
+
+def refund_rate_limit(request: Request, route: str, cost: int = 1):
+    """Undo a charge_rate_limit(request, route, cost) whose request failed."""
+    limiter.refund(f"{route}|{client_key(request)}", _RATES[route], cost=cost)
+
+
+def rate_limit(route: str):
+    """FastAPI dependency enforcing RATE_LIMITS[route] per API key + client IP."""
+
+    async def dependency(request: Request, response: Response):
+        response.headers.update(charge_rate_limit(request, route))
+
+    return dependency
@@ -1,29 +1,44 @@
 import uuid
-import shutil
 import logging
 import asyncio
 import json
 import time
-import re
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
 
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
-from fastapi.responses import FileResponse, StreamingResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, StreamingResponse, Response, RedirectResponse, JSONResponse
+from pydantic import BaseModel, Field, ValidationError
 
-from app.config import UPLOADS_DIR, OUTPUTS_DIR, JobStage, VALID_RETEXTURE_RESOLUTIONS
+from app.config import (
+    UPLOADS_DIR, OUTPUTS_DIR, JobStage,
+    ASSET_THUMBNAIL_SIZES, ASSET_CACHE_MAX_AGE, EXPORT_MAX_JOBS, PRINT_MAX_SIZE_MM, STATUS_MAX_WAIT,
+)
 from app.middleware.auth import verify_api_key
+from app.middleware.rate_limit import rate_limit, charge_rate_limit, refund_rate_limit, tenant_id
 from app.models.schemas import JobCreatedResponse, JobStatusResponse, JobStatus, JobListItem
 from app.workers.task_queue import (
-    create_job, get_job, update_job, update_job_stage, run_in_thread, jobs,
-    get_pipeline_metrics,
-    subscribe_job_events, unsubscribe_job_events
+    create_job, create_jobs, get_job, update_job, update_job_stage, run_in_thread, run_io, jobs, remove_job,
+    delete_job_storage, append_job_spans, retexture_state, RETEXTURE_ACTIVE_STATUSES,
+    subscribe_job_events, unsubscribe_job_events, batch_channel
 )
+from app.workers import batches
 from app.services.image_processor import remove_background
+from app.services.assets import (
+    get_original_image_paths, get_asset_manifest, refresh_asset_manifest, get_resized_asset,
+    build_asset_manifest, gallery_thumbnail_path, asset_version,
+)
+from app.services import variants
+from app.services.export import stream_export, INCLUDE_OPTIONS
+from app.services import print_export
+from app.services.batch_upload import receive_batch, BatchUploadError
+from app.services.object_store import get_store
 from app.services.meshy import meshy_service
+from app.workers.render_queue import schedule_view_render, schedule_repackage
+from app.workers.storage_gc import touch as touch_storage, forget_job
+from app.services.metrics import get_pipeline_metrics, RETEXTURE_REQUESTS, STATUS_REQUESTS
+from app.services.tracing import make_span, call_traced, read_profile
 
 
 class RetextureRequest(BaseModel):
@@ -36,6 +51,24 @@ class RetextureRequest(BaseModel):
     ai_model: str = Field(default="meshy-6-preview", description="AI model to use")
 
 
+class ExportRequest(BaseModel):
+    job_ids: Optional[List[str]] = Field(default=None, description="Jobs to export (default: history filter below)")
+    since: Optional[datetime] = Field(default=None, description="History filter: created at or after")
+    until: Optional[datetime] = Field(default=None, description="History filter: created before")
+    quality_preset: Optional[str] = Field(default=None, description="History filter: quality preset")
+    include: str = Field(default="model", description="model (model.glb) or all (every asset)")
+    limit: Optional[int] = Field(default=None, description="Max jobs (newest first), up to EXPORT_MAX_JOBS")
+
+
+class JobHistoryItem(JobListItem):
+    thumbnail_url: Optional[str] = Field(default=None, description="Gallery thumbnail URL with its asset version (?v=)")
+
+
+class JobStatusWithEta(JobStatusResponse):
+    eta_seconds: Optional[int] = Field(default=None, description="Estimated seconds until the job completes")
+    version: int = Field(default=0, description="Job state version (also sent as the ETag)")
+
+
 class Generate3DRequest(BaseModel):
     remove_bg: Optional[bool] = Field(default=None, description="Remove image background before generation")
     ai_model: Optional[str] = Field(default=None, description="AI model (meshy-4, meshy-5, latest)")
@@ -43,41 +76,9 @@ class Generate3DRequest(BaseModel):
     enable_pbr: Optional[bool] = Field(default=None, description="Generate PBR maps (if texture enabled)")
     model_type: Optional[str] = Field(default=None, description="standard or lowpoly")
     symmetry_mode: Optional[str] = Field(default=None, description="off, auto, on")
+    progressive: Optional[bool] = Field(default=None, description="Publish a fast low-poly untextured preview before the full model")
 
 
-# In-memory retexture status tracking
-_retexture_status: dict[str, dict] = {}
-_retexture_tasks: dict[str, asyncio.Task] = {}
-_retexture_cancel: dict[str, bool] = {}
-_retexture_backup: dict[str, str] = {}
-
-# Simple rate limiter: track generation requests per IP (limit: 10/hour)
-_request_timestamps = defaultdict(list)
-
-
-def _check_rate_limit(client_ip: str, limit: int = 10, window_seconds: int = 3600) -> bool:
-    """Check if IP has exceeded generation rate limit.
-
-    Args:
-        client_ip: Client IP address
-        limit: Max requests allowed in window
-        window_seconds: Time window in seconds (default 1 hour)
-
-    Returns:
-        True if within limit, False if exceeded
-    """
-    now = time.time()
-    # Remove timestamps outside window
-    _request_timestamps[client_ip] = [
-        ts for ts in _request_timestamps[client_ip]
-        if now - ts < window_seconds
-    ]
-    # Check limit
-    if len(_request_timestamps[client_ip]) >= limit:
-        return False
-    # Record this request
-    _request_timestamps[client_ip].append(now)
-    return True
 
 
 def _quality_preset_from_ai_model(ai_model: str) -> str:
@@ -90,6 +91,13 @@ def _quality_preset_from_ai_model(ai_model: str) -> str:
     return quality_preset_map.get(ai_model, "v2")
 
 
+def _write_uploads(job_dir: Path, uploads: List[tuple]) -> None:
+    job_dir.mkdir(parents=True, exist_ok=True)
+    for path, content in uploads:
+        with open(path, "wb") as f:
+            f.write(content)
+
+
 def _persist_settings(job_id: str, settings: Dict[str, Any]) -> None:
     try:
         job_dir = UPLOADS_DIR / job_id
@@ -100,32 +108,9 @@ def _persist_settings(job_id: str, settings: Dict[str, Any]) -> None:
         logger.warning(f"Failed to save settings for {job_id}: {e}")
 
 
-def _get_original_image_paths(job_dir: Path) -> List[Path]:
-    indexed_files = []
-    for path in job_dir.glob("original_*"):
-        if not path.is_file():
-            continue
-        match = re.match(r"original_(\d+)$", path.stem)
-        index = int(match.group(1)) if match else 999_999
-        indexed_files.append((index, path))
-
-    indexed_files.sort(key=lambda item: item[0])
-    originals = [path for _, path in indexed_files]
-    if originals:
-        return originals
-
-    # Legacy fallback: original.png / original.jpg / original.jpeg
-    for ext in (".png", ".jpg", ".jpeg", ".webp"):
-        legacy = job_dir / f"original{ext}"
-        if legacy.exists():
-            return [legacy]
-
-    return []
-
-
 async def _resolve_generate_image_paths(job_id: str, remove_bg: bool) -> List[str]:
     job_dir = UPLOADS_DIR / job_id
-    originals = _get_original_image_paths(job_dir)
+    originals = await run_io(get_original_image_paths, job_dir)
     if not originals:
         raise HTTPException(404, "Source image not found")
 
@@ -133,18 +118,22 @@ async def _resolve_generate_image_paths(job_id: str, remove_bg: bool) -> List[st
         return [str(path) for path in originals]
 
     resolved_paths: List[str] = []
+    spans: List[Dict[str, Any]] = []
     for idx, raw_path in enumerate(originals):
         nobg_path = job_dir / f"nobg_{idx}.png"
         if nobg_path.exists():
             resolved_paths.append(str(nobg_path))
             continue
         try:
-            result_path = await run_in_thread(remove_background, str(raw_path), str(nobg_path))
+            result_path = await run_in_thread(
+                call_traced, spans, job_id, "rembg", remove_background, str(raw_path), str(nobg_path)
+            )
             resolved_paths.append(result_path)
         except Exception as e:
             logger.warning(f"Background removal failed for image {idx} on job {job_id}, using original: {e}")
             resolved_paths.append(str(raw_path))
 
+    append_job_spans(job_id, spans)
     return resolved_paths
 
 
@@ -182,50 +171,69 @@ async def _apply_generate_settings(job_id: str, job: Dict[str, Any], overrides:
         image_path=all_image_paths[0],
         processed_image_path=all_image_paths[0] if remove_bg else None,
     )
-    _persist_settings(job_id, settings)
+    await run_io(_persist_settings, job_id, settings)
+    await run_io(refresh_asset_manifest, job_id)
     return settings
 
 
-def _backup_model_glb(job_id: str) -> str | None:
-    output_glb = OUTPUTS_DIR / job_id / "model.glb"
-    if not output_glb.exists():
-        return None
-    backup_path = OUTPUTS_DIR / job_id / "model.glb.bak"
-    try:
-        shutil.copy2(output_glb, backup_path)
-        return str(backup_path)
-    except Exception:
-        return None
+def _lookup_asset(job_id: str, name: str) -> Optional[Dict[str, Any]]:
+    manifest = get_asset_manifest(job_id)
+    entry = manifest["files"].get(name) if manifest else None
+    if entry and not entry.get("key") and not Path(entry["path"]).exists():
+        # File removed since the manifest was built
+        manifest = refresh_asset_manifest(job_id)
+        entry = manifest["files"].get(name) if manifest else None
+    return entry
 
 
-def _restore_model_glb(job_id: str) -> None:
-    backup_path = _retexture_backup.get(job_id)
-    if not backup_path:
-        return
-    backup_file = Path(backup_path)
-    output_glb = OUTPUTS_DIR / job_id / "model.glb"
-    if backup_file.exists():
-        try:
-            shutil.copy2(backup_file, output_glb)
-        except Exception:
-            pass
-    if backup_file.exists():
-        try:
-            backup_file.unlink()
-        except Exception:
-            pass
-    _retexture_backup.pop(job_id, None)
+async def _serve_asset(
+    request: Request,
+    job_id: str,
+    name: str,
+    v: Optional[str] = None,
+    size: Optional[int] = None,
+    filename: Optional[str] = None,
+    missing_detail: Optional[str] = None,
+):
+    """Serve a manifest asset with ETag revalidation.
 
+    Requests carrying the current version (`?v=`) get immutable caching; the
+    version changes whenever the file is rewritten, so the URL changes too.
+    Assets in object storage are redirected to a presigned URL instead.
+    """
+    entry = await run_io(_lookup_asset, job_id, name)
+    if not entry:
+        raise HTTPException(404, missing_detail or f"Asset not found: {name}")
+
+    if size is not None:
+        if size not in ASSET_THUMBNAIL_SIZES:
+            raise HTTPException(400, f"Invalid size: {size}. Allowed: {list(ASSET_THUMBNAIL_SIZES)}")
+        if not entry["media_type"].startswith("image/"):
+            raise HTTPException(400, f"Asset {name} cannot be resized")
+
+    etag = f'"{entry["version"]}-{size}"' if size else f'"{entry["version"]}"'
+    headers = {"ETag": etag}
+    if v and v == entry["version"]:
+        headers["Cache-Control"] = f"public, max-age={ASSET_CACHE_MAX_AGE}, immutable"
+    else:
+        headers["Cache-Control"] = "no-cache"
+
+    touch_storage(job_id)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    store = get_store()
+    if entry.get("key") and size is None and store.redirects:
+        # Bytes come from object storage; the presigned URL expires, so never cache the redirect long
+        url = store.url(entry["key"], entry["media_type"], filename)  # local signing, no I/O
+        return RedirectResponse(url, status_code=307, headers={**headers, "Cache-Control": "no-cache"})
+
+    if size is not None:
+        content, media_type = await run_in_thread(get_resized_asset, entry, size)
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    return FileResponse(entry["path"], media_type=entry["media_type"], filename=filename, headers=headers)
 
-def _cleanup_retexture_temp(job_id: str) -> None:
-    job_output_dir = OUTPUTS_DIR / job_id
-    for name in ["retexture_temp.glb", "model.obj"]:
-        path = job_output_dir / name
-        if path.exists():
-            try:
-                path.unlink()
-            except Exception:
-                pass
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["jobs"])
@@ -233,6 +241,7 @@ router = APIRouter(prefix="/api", tags=["jobs"])
 
 @router.post("/upload", response_model=JobCreatedResponse)
 async def upload_image(
+    request: Request,
     files: List[UploadFile] = File(...),
     remove_bg: bool = Form(True),
     ai_model: str = Form("meshy-6"),
@@ -241,6 +250,7 @@ async def upload_image(
     model_type: str = Form("standard"),
     symmetry_mode: str = Form("auto"),
     api_key: str = Depends(verify_api_key),
+    _: None = Depends(rate_limit("upload")),
 ):
     # Validate file count (1 source + up to 3 multi-view)
     if len(files) < 1 or len(files) > 4:
@@ -258,17 +268,24 @@ async def upload_image(
 
     job_id = str(uuid.uuid4())
     job_dir = UPLOADS_DIR / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
+
+    # Stage spans are buffered until the job record exists
+    spans: List[Dict[str, Any]] = []
 
     # Save all uploaded files
     all_raw_paths = []
+    uploads = []
+    upload_started = time.time()
+    upload_bytes = 0
     for idx, file in enumerate(files):
         ext = Path(file.filename or "image.png").suffix or ".png"
         raw_path = str(job_dir / f"original_{idx}{ext}")
-        with open(raw_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        content = await file.read()
+        uploads.append((raw_path, content))
+        upload_bytes += len(content)
         all_raw_paths.append(raw_path)
+    await run_io(_write_uploads, job_dir, uploads)
+    spans.append(make_span("upload", upload_started, time.time(), bytes=upload_bytes))
 
     # Process all images (background removal if requested)
     all_processed_paths = []
@@ -283,7 +300,9 @@ async def upload_image(
                     update_job_stage(job_id, JobStage.REMBG, overall)
 
                 nobg_path = str(job_dir / f"nobg_{idx}.png")
-                result_path = await run_in_thread(remove_background, raw_path, nobg_path, rembg_progress_callback)
+                result_path = await run_in_thread(
+                    call_traced, spans, job_id, "rembg", remove_background, raw_path, nobg_path, rembg_progress_callback
+                )
                 image_path = result_path
             except Exception as e:
                 logger.warning(f"Background removal failed for image {idx}, using original: {e}")
@@ -310,38 +329,33 @@ async def upload_image(
     }
 
     # Save settings to disk for persistence
-    _persist_settings(job_id, settings)
+    await run_io(_persist_settings, job_id, settings)
 
     create_job(job_id, primary_image_path, settings)
+    append_job_spans(job_id, spans)
 
     # Store processed image path if background was removed
     if remove_bg and primary_image_path != all_raw_paths[0]:
         update_job(job_id, processed_image_path=primary_image_path)
 
-    update_job(job_id, status="pending", stage=JobStage.READY.value)
+    update_job(job_id, status="pending", stage=JobStage.READY.value, tenant=tenant_id(request))
+    await run_io(refresh_asset_manifest, job_id)
 
     return JobCreatedResponse(job_id=job_id)
 
 
-@router.post("/jobs/{job_id}/generate-3d", response_model=JobStatusResponse)
+@router.post("/jobs/{job_id}/generate-3d", response_model=JobStatusWithEta)
 async def trigger_3d(
     request: Request,
     job_id: str,
     body: Optional[Generate3DRequest] = None,
     api_key: str = Depends(verify_api_key),
+    _: None = Depends(rate_limit("generate")),
 ):
     """Trigger 3D generation using Meshy AI (Replacing Local GPU).
 
-    Rate limited to 10 generations per hour per IP.
+    Rate limited per API key + IP (RATE_LIMITS["generate"], default 10/hour).
     """
-    # Rate limit check
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip, limit=10, window_seconds=3600):
-        raise HTTPException(
-            status_code=429,
-            detail="Rate limit exceeded. Max 10 generations per hour per IP."
-        )
-
     job = get_job(job_id)
     if not job:
         # Try to recover job from disk
@@ -361,7 +375,7 @@ async def trigger_3d(
 
             # Find the image file
             image_path = None
-            originals = _get_original_image_paths(job_dir)
+            originals = get_original_image_paths(job_dir)
             if originals:
                 image_path = str(originals[0])
             elif (job_dir / "nobg_0.png").exists():
@@ -389,14 +403,251 @@ async def trigger_3d(
     # Update job status before submitting to ensure frontend sees it
     update_job(job_id, status="queued")
 
-    # Submit job to Meshy AI
+    # Queue for Meshy AI (sent when upstream capacity allows)
     try:
         await meshy_service.submit_job(job_id)
     except Exception as e:
         logger.error(f"Meshy submission failed: {e}")
         raise HTTPException(500, f"Failed to submit job to Meshy: {str(e)}")
 
-    logger.info(f"Job {job_id} submitted to Meshy AI")
+    logger.info(f"Job {job_id} queued for Meshy AI")
+    return _job_status(job_id)
+
+
+def _batch_settings(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one batch item's settings and fill the defaults /upload uses."""
+    try:
+        settings = Generate3DRequest(**values).dict(exclude_none=True)
+    except ValidationError as e:
+        raise HTTPException(400, f"Invalid batch settings: {e.errors()[0].get('msg')}")
+    settings.setdefault("remove_bg", True)
+    settings.setdefault("ai_model", "meshy-6")
+    settings.setdefault("should_texture", True)
+    settings.setdefault("enable_pbr", False)
+    settings.setdefault("model_type", "standard")
+    settings.setdefault("symmetry_mode", "auto")
+    if settings["model_type"] not in ("standard", "lowpoly"):
+        raise HTTPException(400, f"Invalid model_type: {settings['model_type']}")
+    if settings["symmetry_mode"] not in ("off", "auto", "on"):
+        raise HTTPException(400, f"Invalid symmetry_mode: {settings['symmetry_mode']}")
+    if not settings["should_texture"]:
+        settings["enable_pbr"] = False
+    settings["quality_preset"] = _quality_preset_from_ai_model(settings["ai_model"])
+    return settings
+
+
+def _resolve_batch_settings(manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Settings of every item (defaults + item overrides); identical combinations are validated once."""
+    defaults = manifest.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise HTTPException(400, "Manifest 'defaults' must be an object")
+    validated: Dict[str, Dict[str, Any]] = {}
+    result = []
+    for index, item in enumerate(manifest["items"]):
+        overrides = item.get("settings") if isinstance(item, dict) else None
+        if not isinstance(item, dict) or not isinstance(overrides or {}, dict):
+            raise HTTPException(400, f"Item {index}: expected {{\"ref\": ..., \"settings\": {{...}}}}")
+        values = {**defaults, **(overrides or {})}
+        key = json.dumps(values, sort_keys=True)
+        if key not in validated:
+            validated[key] = _batch_settings(values)
+        result.append(validated[key])
+    return result
+
+
+def _persist_batch(job_ids: List[str], settings: List[Dict[str, Any]], record: Dict[str, Any]):
+    for job_id, item_settings in zip(job_ids, settings):
+        _persist_settings(job_id, item_settings)
+    batches.save_batch(record)
+
+
+_batch_tasks: set = set()
+
+
+async def _submit_batch(batch_id: str, job_ids: List[str]):
+    """Queue a batch's jobs with Meshy: jobs without background removal first, then the rest after rembg."""
+    job_ids = sorted(job_ids, key=lambda job_id: bool((get_job(job_id) or {}).get("settings", {}).get("remove_bg")))
+    submitted = 0
+    for job_id in job_ids:
+        job = get_job(job_id)
+        if not job or job.get("status") != "queued":
+            continue  # cancelled or deleted meanwhile
+        try:
+            if job["settings"].get("remove_bg"):
+                update_job_stage(job_id, JobStage.REMBG, 0)
+                paths = await _resolve_generate_image_paths(job_id, True)
+                settings = {**job["settings"], "all_image_paths": paths}
+                await run_io(_persist_settings, job_id, settings)
+                update_job(job_id, settings=settings, all_image_paths=paths, image_path=paths[0],
+                           processed_image_path=paths[0], stage=JobStage.READY.value, progress=0)
+            await run_io(refresh_asset_manifest, job_id)
+            if (get_job(job_id) or {}).get("status") != "queued":
+                continue
+            await meshy_service.submit_job(job_id)
+            submitted += 1
+        except Exception as e:
+            logger.error(f"Batch {batch_id}: submission of {job_id} failed: {e}")
+            update_job(job_id, status="failed", error=f"Batch submission failed: {e}")
+    logger.info(f"Batch {batch_id}: {submitted}/{len(job_ids)} job(s) queued for Meshy AI")
+
+
+@router.post("/batches")
+async def create_batch(request: Request, api_key: str = Depends(verify_api_key)):
+    """Create and queue many jobs from one streamed multipart request.
+
+    Parts: a JSON `manifest` first (`{"defaults": {...}, "items": [{"ref": ..., "settings": {...}}]}`),
+    then 1-4 images per item as `item{i}` parts. Rate limited per item
+    (RATE_LIMITS["batch"]), charged when the manifest arrives so an
+    over-limit batch is refused before its images are read, and refunded if
+    the upload then fails. Returns the job ids at once; background removal
+    and Meshy submission continue in the background.
+    """
+    charged: Dict[str, str] = {}
+    resolved: List[Dict[str, Any]] = []
+
+    def validate(manifest: Dict[str, Any]):
+        resolved.extend(_resolve_batch_settings(manifest))
+        charged.update(charge_rate_limit(request, "batch", len(resolved)))
+
+    def refund():
+        # Malformed or aborted upload: no job was created, so its items are not counted
+        if charged:
+            refund_rate_limit(request, "batch", len(resolved))
+
+    try:
+        received = await receive_batch(request, validate)
+    except BatchUploadError as e:
+        refund()
+        raise HTTPException(400, str(e))
+    except BaseException:
+        refund()
+        raise
+
+    batch_id = str(uuid.uuid4())
+    tenant = tenant_id(request)
+    specs = []
+    item_settings = []
+    for job_id, paths, settings in zip(received.job_ids, received.images, resolved):
+        settings = {**settings, "all_image_paths": paths}
+        item_settings.append(settings)
+        specs.append({
+            "job_id": job_id,
+            "image_path": paths[0],
+            "settings": settings,
+            "status": "queued",
+            "stage": JobStage.READY.value,
+            "tenant": tenant,
+            "batch_id": batch_id,
+        })
+    record = batches.create_batch(batch_id, received.job_ids, tenant)
+    await run_io(_persist_batch, received.job_ids, item_settings, record)
+    create_jobs(specs)
+
+    task = asyncio.create_task(_submit_batch(batch_id, received.job_ids))
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+
+    items = received.manifest["items"]
+    logger.info(f"Batch {batch_id}: created {len(specs)} job(s)")
+    return JSONResponse({
+        "batch_id": batch_id,
+        "jobs": [{"index": index, "ref": items[index].get("ref"), "job_id": job_id}
+                 for index, job_id in enumerate(received.job_ids)],
+        "status_url": f"/api/batches/{batch_id}",
+        "stream_url": f"/api/batches/{batch_id}/stream",
+    }, status_code=202, headers=charged)
+
+
+def _add_etas(states: Dict[str, Dict[str, Any]]):
+    """Fill in eta_seconds of a batch's unfinished jobs."""
+    active = [job for job in map(jobs.get, states) if job is not None]
+    for job_id, seconds in meshy_service.estimate_remaining(active).items():
+        states[job_id]["eta_seconds"] = seconds
+
+
+@router.get("/batches/{batch_id}")
+async def batch_status(batch_id: str):
+    """Aggregate progress of a batch and the state of each of its jobs."""
+    record = await run_io(batches.get_batch, batch_id)
+    if record is None:
+        raise HTTPException(404, "Batch not found")
+    states = await run_io(batches.batch_states, record)
+    _add_etas(states)
+    return {
+        "batch_id": batch_id,
+        "created_at": record["created_at"],
+        **batches.aggregate(states),
+        "jobs": [{"job_id": job_id, **state} for job_id, state in states.items()],
+    }
+
+
+@router.get("/batches/{batch_id}/stream")
+async def batch_stream(batch_id: str):
+    """SSE of a batch's aggregate progress; each event also lists the jobs that changed."""
+    record = await run_io(batches.get_batch, batch_id)
+    if record is None:
+        raise HTTPException(404, "Batch not found")
+
+    async def event_generator():
+        queue = subscribe_job_events(batch_channel(batch_id))
+        try:
+            # Subscribed first, so no change between the snapshot and the stream is lost
+            states = await run_io(batches.batch_states, record)
+            _add_etas(states)
+            summary = batches.aggregate(states)
+            yield f"data: {json.dumps({'type': 'batch_update', 'batch_id': batch_id, **summary})}\n\n"
+            while not summary["finished"]:
+                try:
+                    events = [await asyncio.wait_for(queue.get(), timeout=30.0)]
+                except asyncio.TimeoutError:
+                    # Deleted jobs send no event; re-read the snapshots now and then
+                    states = await run_io(batches.batch_states, record)
+                    _add_etas(states)
+                    summary = batches.aggregate(states)
+                    if summary["finished"]:
+                        yield f"data: {json.dumps({'type': 'batch_update', 'batch_id': batch_id, **summary})}\n\n"
+                    else:
+                        yield ": keepalive\n\n"
+                    continue
+                # Coalesce bursts (many jobs moving at once) into one update
+                while not queue.empty():
+                    events.append(queue.get_nowait())
+                changed = {}
+                for event in events:
+                    if event["job_id"] in states and event.get("status"):
+                        states[event["job_id"]] = changed[event["job_id"]] = {
+                            "status": event["status"], "stage": event.get("stage"), "progress": event.get("progress", 0),
+                            "eta_seconds": None}
+                if not changed:
+                    continue
+                # Every unfinished job's estimate moves as others progress
+                _add_etas(states)
+                summary = batches.aggregate(states)
+                update = {"type": "batch_update", "batch_id": batch_id, **summary,
+                          "jobs": [{"job_id": job_id, **state} for job_id, state in changed.items()]}
+                yield f"data: {json.dumps(update)}\n\n"
+        finally:
+            unsubscribe_job_events(batch_channel(batch_id), queue)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatusWithEta)
+async def cancel_job(job_id: str, api_key: str = Depends(verify_api_key)):
+    """Cancel a queued/processing generation and its Meshy task."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    if not await meshy_service.cancel_job(job_id):
+        raise HTTPException(409, f"Job is not generating (status: {job.get('status')})")
     return _job_status(job_id)
 
 
@@ -406,12 +657,65 @@ async def get_gpu_metrics():
     return get_pipeline_metrics()
 
 
-@router.get("/jobs/{job_id}/status", response_model=JobStatusResponse)
-async def job_status(job_id: str):
+def _status_etag(job) -> str:
+    # Weak: eta_seconds is recomputed per request, everything else only changes with the version
+    return f'W/"{job.get("version") or 0}"'
+
+
+def _etag_version(value: Optional[str]) -> Optional[int]:
+    """Job version named by an If-None-Match header (as sent back from _status_etag)."""
+    if not value:
+        return None
+    tag = value.split(",")[0].strip().removeprefix("W/").strip('"')
+    return int(tag) if tag.isdigit() else None
+
+
+async def _wait_for_change(job_id: str, version: int, timeout: float):
+    """The job once its version differs from `version`, or after `timeout` seconds."""
+    queue = subscribe_job_events(job_id)
+    try:
+        # Checked after subscribing, so an update in between is not missed
+        job = get_job(job_id)
+        if job is not None and (job.get("version") or 0) == version:
+            try:
+                await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            job = get_job(job_id)
+        return job
+    finally:
+        unsubscribe_job_events(job_id, queue)
+
+
+@router.get("/jobs/{job_id}/status", response_model=JobStatusWithEta)
+async def job_status(job_id: str, request: Request, response: Response,
+                     since: Optional[int] = None, wait: float = 0):
+    """Job status, with the job version as ETag.
+
+    `If-None-Match` with the current ETag gets 304. With `wait` (seconds, at
+    most STATUS_MAX_WAIT) the request is held while the job is still at the
+    version given by `since` (or If-None-Match), and answered as soon as it
+    changes; 304 if it did not change in time.
+    """
     job = get_job(job_id)
     if not job:
         raise HTTPException(404, "Job not found")
-    return _job_status(job_id)
+    known = since if since is not None else _etag_version(request.headers.get("if-none-match"))
+    mode = "poll"
+    if wait > 0 and known is not None:
+        mode = "long_poll"
+        job = await _wait_for_change(job_id, known, min(wait, STATUS_MAX_WAIT))
+        if job is None:
+            raise HTTPException(404, "Job not found")
+
+    etag = _status_etag(job)
+    if known is not None and (job.get("version") or 0) == known:
+        STATUS_REQUESTS.inc(mode=mode, code="304")
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    STATUS_REQUESTS.inc(mode=mode, code="200")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return _job_status(job_id, job)
 
 
 @router.get("/jobs/{job_id}/stream")
@@ -421,6 +725,10 @@ async def job_stream(job_id: str):
     if not job:
         raise HTTPException(404, "Job not found")
 
+    if job.get("status") == "completed" and job.get("views_pending"):
+        # Render was dropped (e.g. restart); requeue so the stream gets its assets_updated
+        schedule_view_render(job_id)
+
     async def event_generator():
         queue = subscribe_job_events(job_id)
         try:
@@ -429,18 +737,33 @@ async def job_stream(job_id: str):
                 "type": "stage_update",
                 "stage": job.get("stage"),
                 "progress": job.get("progress", 0),
-                "status": job.get("status")
+                "status": job.get("status"),
+                "eta_seconds": _eta_seconds(job),
+                "version": job.get("version"),
             }
+            if job.get("retexture_status"):
+                initial["retexture"] = retexture_state(job)
             yield f"data: {json.dumps(initial)}\n\n"
 
             # Stream updates
             while True:
                 try:
                     event = await asyncio.wait_for(queue.get(), timeout=30.0)
+                    current = get_job(job_id)
+                    if current is not None:
+                        # The event dict is shared by all subscribers; add the estimate to a copy
+                        event = {**event, "eta_seconds": _eta_seconds(current)}
                     yield f"data: {json.dumps(event)}\n\n"
 
-                    # Stop streaming when job completes or fails
-                    if event.get("status") in ("completed", "failed"):
+                    # Stop when the job fails, or completes with its views rendered
+                    # (a completed job then sends one assets_updated event), unless a
+                    # retexture is still running (its retexture_update events follow)
+                    current = get_job(job_id) or {}
+                    if current.get("retexture_status") in RETEXTURE_ACTIVE_STATUSES:
+                        continue
+                    if event.get("type") == "assets_updated" or event.get("status") == "failed":
+                        break
+                    if event.get("status") == "completed" and not current.get("views_pending"):
                         break
                 except asyncio.TimeoutError:
                     # Send keepalive
@@ -459,28 +782,141 @@ async def job_stream(job_id: str):
     )
 
 
+@router.get("/jobs/{job_id}/timeline")
+async def job_timeline(job_id: str, profiles: bool = False):
+    """Stage spans (upload, rembg, meshy_queue, generation, download, render).
+
+    With `profiles=true`, spans that captured a cProfile (PROFILE_STAGES) include
+    the stats text.
+    """
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+
+    spans = [dict(span) for span in job.get("timeline", ())]
+    if profiles:
+        for span in spans:
+            if span.get("profile"):
+                span["profile_text"] = await run_io(read_profile, job_id, span["profile"])
+    return {
+        "job_id": job_id,
+        "status": job.get("status"),
+        "stage": job.get("stage"),
+        "timeline": spans,
+    }
+
+
 @router.get("/jobs/{job_id}/result/{asset}")
-async def job_result(job_id: str, asset: str):
+async def job_result(request: Request, job_id: str, asset: str, v: Optional[str] = None):
     if asset == "model.glb":
-        # First try in-memory job state
-        job = get_job(job_id)
-        if job:
-            model_path = job.get("model_path")
-            if model_path and Path(model_path).exists():
-                return FileResponse(model_path, media_type="model/gltf-binary", filename="model.glb")
+        return await _serve_asset(request, job_id, asset, v=v, filename="model.glb",
+                                  missing_detail="Model not ready")
+    return await _serve_asset(request, job_id, asset, v=v)
 
-        # Fallback: check filesystem directly (for history/previous sessions)
-        disk_path = OUTPUTS_DIR / job_id / "model.glb"
-        if disk_path.exists():
-            return FileResponse(disk_path, media_type="model/gltf-binary", filename="model.glb")
 
+@router.get("/jobs/{job_id}/assets")
+async def job_assets(job_id: str):
+    """List servable assets with versioned (immutable-cacheable) URLs."""
+    manifest = await run_io(get_asset_manifest, job_id)
+    if manifest is None:
+        raise HTTPException(404, "Job not found")
+    return {
+        "job_id": job_id,
+        "thumbnail": manifest.get("thumbnail"),
+        "model_thumbnail": manifest.get("model_thumbnail"),
+        "assets": [
+            {
+                "name": name,
+                "media_type": entry["media_type"],
+                "size": entry["size"],
+                "version": entry["version"],
+                "url": f"/api/jobs/{job_id}/assets/{name}?v={entry['version']}",
+            }
+            for name, entry in manifest["files"].items()
+        ],
+    }
+
+
+@router.get("/jobs/{job_id}/assets/{name}")
+async def job_asset(request: Request, job_id: str, name: str, v: Optional[str] = None, size: Optional[int] = None):
+    """Serve one asset from the job manifest; `size` returns a resized image."""
+    return await _serve_asset(request, job_id, name, v=v, size=size)
+
+
+@router.get("/jobs/{job_id}/print/{fmt}")
+async def job_print(
+    request: Request,
+    job_id: str,
+    fmt: str,
+    size_mm: Optional[float] = None,
+    axis: str = "max",
+    repair: bool = False,
+    api_key: str = Depends(verify_api_key),
+    _: None = Depends(rate_limit("print")),
+):
+    """Model as a print-ready STL, 3MF or OBJ (zip): Z-up, millimetres, on the build plate.
+
+    `size_mm` scales the model uniformly so `axis` (x, y, z or the largest
+    dimension) measures that many millimetres, rounded to whole millimetres;
+    without it the modelled size is kept. `repair` welds seams, fixes winding
+    and fills holes.
+    """
+    if fmt not in print_export.FORMATS:
+        raise HTTPException(400, f"Invalid format: {fmt}. Allowed: {list(print_export.FORMATS)}")
+    if axis not in print_export.AXES:
+        raise HTTPException(400, f"Invalid axis: {axis}. Allowed: {list(print_export.AXES)}")
+    if size_mm is not None:
+        if not 0 < size_mm <= PRINT_MAX_SIZE_MM:
+            raise HTTPException(400, f"size_mm must be between 0 and {PRINT_MAX_SIZE_MM:g}")
+        # Whole millimetres, so near-identical sizes share one cached conversion
+        size_mm = float(max(1, round(size_mm)))
+
+    entry = await run_io(_lookup_asset, job_id, "model.glb")
+    if not entry:
         raise HTTPException(404, "Model not ready")
+    touch_storage(job_id)
 
-    raise HTTPException(400, f"Unknown asset: {asset}")
+    media_type, ext = print_export.FORMATS[fmt]
+    etag = f'"{print_export.print_name(entry["version"], fmt, size_mm, axis, repair)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path, info, cached = await print_export.get_print(job_id, entry, fmt, size_mm, axis, repair)
+    except print_export.ConversionQueueFull:
+        raise HTTPException(503, "Too many conversions in progress", headers={"Retry-After": "10"})
+    except ValueError as e:
+        raise HTTPException(422, f"Model cannot be converted: {e}")
+    except Exception as e:
+        logger.error(f"Print conversion failed for {job_id} ({fmt}): {e}")
+        raise HTTPException(500, "Conversion failed")
+
+    headers.update({
+        "X-Print-Cache": "hit" if cached else "miss",
+        "X-Print-Extents-Mm": ",".join(f"{v:g}" for v in info["extents_mm"]),
+        "X-Print-Watertight": str(info["watertight"]).lower(),
+    })
+    name = f"model-{size_mm:g}mm.{ext}" if size_mm is not None else f"model.{ext}"
+    return FileResponse(path, media_type=media_type, filename=name, headers=headers)
 
 
-@router.get("/jobs", response_model=list[JobListItem])
+@router.get("/jobs", response_model=list[JobHistoryItem])
 async def list_jobs():
+    """Completed jobs, newest first, each with a versioned (immutable-cacheable) thumbnail_url."""
+    return await run_io(_scan_job_history, True)
+
+
+def _thumbnail_url(job_id: str) -> Optional[str]:
+    # Straight from disk: listing history must not load job state or rebuild manifests
+    path = gallery_thumbnail_path(job_id)
+    try:
+        return f"/api/jobs/{job_id}/thumbnail?v={asset_version(path.stat())}" if path else None
+    except OSError:
+        return None
+
+
+def _scan_job_history(thumbnails: bool = False) -> List[JobHistoryItem]:
     items = []
     if OUTPUTS_DIR.exists():
         for d in OUTPUTS_DIR.iterdir():
@@ -510,58 +946,133 @@ async def list_jobs():
             # Check if job is deprecated (v2.0)
             deprecated = (model_version == "v2.0") if model_version else False
 
-            items.append(JobListItem(
+            items.append(JobHistoryItem(
                 job_id=d.name,
                 has_model=True,
                 created_at=created_at,
                 model_version=model_version,
                 deprecated=deprecated,
-                quality_preset=quality_preset
+                quality_preset=quality_preset,
+                thumbnail_url=_thumbnail_url(d.name) if thumbnails else None,
             ))
     items.sort(key=lambda x: x.created_at, reverse=True)
     return items
 
 
+def _local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    # History timestamps are naive local time
+    return value.astimezone().replace(tzinfo=None) if value and value.tzinfo else value
+
+
+async def _export_job_ids(body: ExportRequest) -> List[str]:
+    limit = min(body.limit or EXPORT_MAX_JOBS, EXPORT_MAX_JOBS)
+    if body.job_ids:
+        job_ids = list(dict.fromkeys(body.job_ids))
+        for job_id in job_ids:
+            try:
+                uuid.UUID(job_id)
+            except ValueError:
+                raise HTTPException(400, f"Invalid job id: {job_id}")
+        if len(job_ids) > limit:
+            raise HTTPException(400, f"At most {limit} jobs per export")
+        return job_ids
+
+    since, until = _local_naive(body.since), _local_naive(body.until)
+    job_ids = []
+    for item in await run_io(_scan_job_history):
+        created_at = datetime.fromisoformat(item.created_at)
+        if (since and created_at < since) or (until and created_at >= until):
+            continue
+        if body.quality_preset and item.quality_preset != body.quality_preset:
+            continue
+        job_ids.append(item.job_id)
+    return job_ids[:limit]
+
+
+async def _export_response(body: ExportRequest, response: Response) -> StreamingResponse:
+    if body.include not in INCLUDE_OPTIONS:
+        raise HTTPException(400, f"Invalid include: {body.include}. Allowed: {list(INCLUDE_OPTIONS)}")
+    job_ids = await _export_job_ids(body)
+    if not job_ids:
+        raise HTTPException(404, "No jobs to export")
+    filename = f"protoscale-export-{datetime.now():%Y%m%d-%H%M%S}.zip"
+    return StreamingResponse(
+        stream_export(job_ids, body.include),
+        media_type="application/zip",
+        headers={
+            # A returned response replaces the injected one, so carry over its X-RateLimit-* headers
+            **{k: v for k, v in response.headers.items() if k.startswith("x-ratelimit-")},
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get("/jobs/export")
+async def export_jobs(
+    response: Response,
+    ids: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    quality_preset: Optional[str] = None,
+    include: str = "model",
+    limit: Optional[int] = None,
+    api_key: str = Depends(verify_api_key),
+    _: None = Depends(rate_limit("export")),
+):
+    """Stream a ZIP of the given jobs (`ids`, comma-separated) or of the filtered history."""
+    job_ids = [job_id.strip() for job_id in ids.split(",") if job_id.strip()] if ids else None
+    return await _export_response(ExportRequest(
+        job_ids=job_ids, since=since, until=until, quality_preset=quality_preset, include=include, limit=limit),
+        response)
+
+
+@router.post("/jobs/export")
+async def export_jobs_post(
+    body: ExportRequest,
+    response: Response,
+    api_key: str = Depends(verify_api_key),
+    _: None = Depends(rate_limit("export")),
+):
+    """Same as GET, for id lists too long for a URL."""
+    return await _export_response(body, response)
+
+
 @router.delete("/jobs/{job_id}")
 async def delete_job(job_id: str):
     upload_dir = UPLOADS_DIR / job_id
     output_dir = OUTPUTS_DIR / job_id
-    found = upload_dir.exists() or output_dir.exists() or job_id in jobs
+    found = job_id in jobs or await run_io(lambda: upload_dir.exists() or output_dir.exists())
 
     if not found:
         raise HTTPException(404, "Job not found")
 
-    if upload_dir.exists():
-        shutil.rmtree(upload_dir)
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
-    jobs.pop(job_id, None)
+    # Drop from memory first so pending state writes skip the job
+    remove_job(job_id)
+    await run_io(delete_job_storage, job_id, upload_dir, output_dir)
+    forget_job(job_id)
 
     return {"status": "deleted", "job_id": job_id}
 
 
 @router.get("/jobs/{job_id}/thumbnail")
-async def job_thumbnail(job_id: str):
-    upload_dir = UPLOADS_DIR / job_id
-    if not upload_dir.exists():
+async def job_thumbnail(request: Request, job_id: str, size: Optional[int] = None, v: Optional[str] = None):
+    """The job's thumbnail; `v` is the version from the job list's thumbnail_url."""
+    manifest = await run_io(get_asset_manifest, job_id)
+    if manifest is None:
         raise HTTPException(404, "Job not found")
-
-    for nobg_name in ("nobg_0.png", "nobg.png"):
-        nobg = upload_dir / nobg_name
-        if nobg.exists():
-            return FileResponse(nobg, media_type="image/png")
-
-    originals = _get_original_image_paths(upload_dir)
-    if originals:
-        ext = originals[0].suffix.lower()
-        media = "image/png" if ext == ".png" else ("image/webp" if ext == ".webp" else "image/jpeg")
-        return FileResponse(originals[0], media_type=media)
-
-    raise HTTPException(404, "No thumbnail found")
+    if not manifest.get("thumbnail"):
+        raise HTTPException(404, "No thumbnail found")
+    return await _serve_asset(request, job_id, manifest["thumbnail"], v=v, size=size)
 
 
 @router.post("/jobs/{job_id}/retexture")
-async def retexture_job(job_id: str, body: RetextureRequest, api_key: str = Depends(verify_api_key)):
+async def retexture_job(
+    job_id: str,
+    body: RetextureRequest,
+    api_key: str = Depends(verify_api_key),
+    _: None = Depends(rate_limit("retexture")),
+):
     """Apply texture to existing 3D model using Meshy AI text-to-texture."""
     job = get_job(job_id)
     if not job:
@@ -572,75 +1083,117 @@ async def retexture_job(job_id: str, body: RetextureRequest, api_key: str = Depe
         raise HTTPException(404, "Model not found. Generate 3D model first.")
 
     # Check if another retexture is already running
-    if _retexture_status.get(job_id, {}).get("status") == "processing":
+    if job.get("retexture_status") in RETEXTURE_ACTIVE_STATUSES:
         raise HTTPException(409, "Retexture already in progress")
 
-    # Initialize retexture status
-    _retexture_status[job_id] = {
-        "status": "processing",
-        "progress": 0,
-        "error": None
-    }
+    # Retexture state lives on the job: persisted, indexed for the poller, streamed over SSE
+    update_job(
+        job_id,
+        event_type="retexture_update",
+        retexture_status="processing",
+        retexture_progress=0,
+        retexture_error=None,
+        retexture_task_id=None,
+    )
 
-    # Submit retexture job to Meshy
+    # Identical requests against the same base model are served from the variant store
+    settings = body.dict()
     try:
-        await meshy_service.submit_retexture_job(job_id, body.dict())
-        return {"status": "processing", "message": "Retexture job submitted"}
+        variant_id, cached = await run_io(variants.lookup, job_id, settings)
+        if cached:
+            model = await run_io(variants.activate, job_id, variant_id)
+    except Exception as e:
+        logger.error(f"Variant lookup failed for {job_id}: {e}")
+        update_job(job_id, event_type="retexture_update", retexture_status="failed", retexture_error=str(e))
+        raise HTTPException(500, f"Failed to submit retexture job: {str(e)}")
+    if cached and model:
+        RETEXTURE_REQUESTS.inc(source="cache")
+        update_job(
+            job_id,
+            event_type="retexture_update",
+            model_path=str(model),
+            asset_manifest=await run_io(build_asset_manifest, job_id),
+            retexture_status="completed",
+            retexture_progress=100,
+            retexture_variant=variant_id,
+        )
+        schedule_repackage(job_id)
+        return {"status": "completed", "message": "Retexture served from variant cache", "variant_id": variant_id}
+
+    # Submit retexture job to Meshy (marks the retexture failed on error)
+    RETEXTURE_REQUESTS.inc(source="meshy")
+    update_job(job_id, event_type="retexture_update", retexture_variant=variant_id)
+    try:
+        await meshy_service.submit_retexture_job(job_id, settings)
+        return {"status": "processing", "message": "Retexture job submitted", "variant_id": variant_id}
     except Exception as e:
         logger.error(f"Failed to submit retexture job: {e}")
-        _retexture_status[job_id] = {
-            "status": "failed",
-            "progress": 0,
-            "error": str(e)
-        }
         raise HTTPException(500, f"Failed to submit retexture job: {str(e)}")
 
 
 @router.get("/jobs/{job_id}/retexture/status")
 async def retexture_status(job_id: str):
-    """Get retexture status for a job."""
-    status = _retexture_status.get(job_id)
-    if not status:
+    """Get retexture status for a job (also pushed as `retexture_update` events on /stream)."""
+    job = get_job(job_id)
+    if not job:
         return {"status": "idle", "progress": 0, "error": None}
-    return status
+    return retexture_state(job)
 
 
 @router.post("/jobs/{job_id}/retexture/cancel")
 async def cancel_retexture(job_id: str):
-    """Cancel a running retexture job and restore previous model."""
-    status = _retexture_status.get(job_id)
-    if not status or status.get("status") not in ("processing", "cancelling"):
+    """Cancel a running retexture job; the current model is kept."""
+    if not await meshy_service.cancel_retexture(job_id):
         raise HTTPException(409, "No retexture job in progress.")
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")  # deleted while cancelling
+    return retexture_state(job)
 
-    _retexture_cancel[job_id] = True
-    _retexture_status[job_id]["status"] = "cancelling"
 
-    task = _retexture_tasks.get(job_id)
-    if task:
-        task.cancel()
+@router.get("/jobs/{job_id}/variants")
+async def list_variants(job_id: str):
+    """Texture variants stored for a job (the generated base model and each retexture)."""
+    if not get_job(job_id):
+        raise HTTPException(404, "Job not found")
+    return {"job_id": job_id, "variants": await run_io(variants.list_variants, job_id)}
+
 
-    _restore_model_glb(job_id)
-    _cleanup_retexture_temp(job_id)
+@router.post("/jobs/{job_id}/variants/{variant_id}/activate")
+async def activate_variant(job_id: str, variant_id: str, api_key: str = Depends(verify_api_key)):
+    """Switch model.glb to a stored variant without contacting Meshy."""
     job = get_job(job_id)
-    if job:
-        output_glb = OUTPUTS_DIR / job_id / "model.glb"
-        if output_glb.exists():
-            update_job(job_id, model_path=str(output_glb))
-
-    _retexture_status[job_id] = {
-        "status": "cancelled",
-        "progress": 0,
-        "error": None,
-    }
-    return _retexture_status[job_id]
+    if not job:
+        raise HTTPException(404, "Job not found")
+    if job.get("retexture_status") in RETEXTURE_ACTIVE_STATUSES:
+        raise HTTPException(409, "Retexture in progress")
+    model = await run_io(variants.activate, job_id, variant_id)
+    if model is None:
+        raise HTTPException(404, "Variant not found")
+    update_job(
+        job_id,
+        event_type="assets_updated",
+        model_path=str(model),
+        asset_manifest=await run_io(build_asset_manifest, job_id),
+    )
+    schedule_repackage(job_id)
+    return {"job_id": job_id, "variant_id": variant_id, "active": True}
 
 
-def _job_status(job_id: str) -> JobStatusResponse:
-    job = get_job(job_id)
-    return JobStatusResponse(
+def _eta_seconds(job) -> Optional[int]:
+    """Estimated seconds until the job completes (None once it is finished)."""
+    return meshy_service.estimate_remaining([job]).get(job["job_id"])
+
+
+def _job_status(job_id: str, job=None) -> JobStatusWithEta:
+    if job is None:
+        job = get_job(job_id)
+    return JobStatusWithEta(
         job_id=job["job_id"],
         status=JobStatus(job["status"]),
         progress=job.get("progress", 0),
         stage=job.get("stage"),
         error=job.get("error"),
+        eta_seconds=_eta_seconds(job),
+        version=job.get("version") or 0,
     )
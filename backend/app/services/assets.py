@@ -0,0 +1,277 @@
+import io
+import re
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.config import UPLOADS_DIR, OUTPUTS_DIR, ASSET_THUMBNAIL_CACHE_MB
+from app.workers.task_queue import get_job, update_job
+from app.workers.storage_gc import record_job
+from app.services.object_store import get_store, object_key
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".glb": "model/gltf-binary",
+    ".gltf": "model/gltf+json",
+    ".bin": "application/octet-stream",
+}
+
+# Output files produced by the finalize stage (preview.png is Meshy's own
+# thumbnail; the views are rendered later by the render queue).
+# model_preview.glb is the low-poly model of progressive jobs until model.glb lands.
+_OUTPUT_ASSETS = ["model.glb", "model_preview.glb", "preview.png", "view_0.png", "view_1.png", "view_2.png", "view_3.png"]
+
+# Split-asset glTF of model.glb (see gltf_split); every file in it is served under its own name
+SPLIT_DIR_NAME = "gltf"
+
+
+def get_original_image_paths(job_dir: Path) -> List[Path]:
+    indexed_files = []
+    for path in job_dir.glob("original_*"):
+        if not path.is_file():
+            continue
+        match = re.match(r"original_(\d+)$", path.stem)
+        index = int(match.group(1)) if match else 999_999
+        indexed_files.append((index, path))
+
+    indexed_files.sort(key=lambda item: item[0])
+    originals = [path for _, path in indexed_files]
+    if originals:
+        return originals
+
+    # Legacy fallback: original.png / original.jpg / original.jpeg
+    for ext in (".png", ".jpg", ".jpeg", ".webp"):
+        legacy = job_dir / f"original{ext}"
+        if legacy.exists():
+            return [legacy]
+
+    return []
+
+
+def asset_version(st) -> str:
+    # Changes whenever the file is rewritten (e.g. retexture replaces model.glb)
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def _asset_entry(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return {
+        "path": str(path),
+        "media_type": MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream"),
+        "size": st.st_size,
+        "version": asset_version(st),
+    }
+
+
+def _publish(files: Dict[str, Dict[str, Any]], previous) -> None:
+    """Upload new or changed assets to object storage (no-op for local storage).
+
+    Uploaded entries get their object ``key`` and are served by redirect;
+    an entry whose upload failed is served from local disk.
+    """
+    store = get_store()
+    if not store.redirects:
+        return
+    for name, entry in files.items():
+        key = object_key(entry["path"])
+        old = previous.get(name) or {}
+        if old.get("key") != key or old.get("version") != entry["version"]:
+            try:
+                store.put_file(key, entry["path"], entry["media_type"])
+            except Exception as e:
+                logger.error(f"Failed to upload {key}: {e}")
+                continue
+        entry["key"] = key
+    removed = [old["key"] for name, old in previous.items() if old.get("key") and name not in files]
+    if removed:
+        try:
+            store.delete(removed)
+        except Exception as e:
+            logger.warning(f"Failed to delete stale objects {removed}: {e}")
+
+
+def _nobg_paths(upload_dir: Path) -> List[Path]:
+    return sorted(upload_dir.glob("nobg_*.png")) or [p for p in [upload_dir / "nobg.png"] if p.exists()]
+
+
+def gallery_thumbnail_path(job_id: str) -> Optional[Path]:
+    """The job's gallery thumbnail on disk (background-removed source first, then the raw upload)."""
+    upload_dir = UPLOADS_DIR / job_id
+    if not upload_dir.is_dir():
+        return None
+    return next(iter(_nobg_paths(upload_dir)[:1] + get_original_image_paths(upload_dir)[:1]), None)
+
+
+def _newest_mtime(files: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Modification time of the most recently written asset (from the entry versions)."""
+    newest = max((int(entry["version"].split("-")[0], 16) for entry in files.values()), default=None)
+    return datetime.fromtimestamp(newest / 1e9).isoformat() if newest is not None else None
+
+
+def scan_asset_manifest(job_id: str) -> Optional[Dict[str, Any]]:
+    """Scan upload/output dirs once and describe every servable asset of a job.
+
+    Compute only: nothing is recorded or uploaded (see build_asset_manifest).
+    Returns None when neither directory exists.
+    """
+    upload_dir = UPLOADS_DIR / job_id
+    output_dir = OUTPUTS_DIR / job_id
+    if not upload_dir.exists() and not output_dir.exists():
+        return None
+
+    files: Dict[str, Dict[str, Any]] = {}
+    originals: List[Path] = []
+    nobg: List[Path] = []
+
+    if upload_dir.exists():
+        originals = get_original_image_paths(upload_dir)
+        nobg = _nobg_paths(upload_dir)
+        for path in originals + nobg:
+            entry = _asset_entry(path)
+            if entry:
+                files[path.name] = entry
+
+    for name in _OUTPUT_ASSETS:
+        entry = _asset_entry(output_dir / name)
+        if entry:
+            files[name] = entry
+    split_dir = output_dir / SPLIT_DIR_NAME
+    if split_dir.is_dir():
+        for path in sorted(split_dir.iterdir()):
+            entry = _asset_entry(path)
+            if entry and not path.name.startswith("."):
+                files[path.name] = entry
+
+    # Gallery thumbnail: background-removed source first, then the raw upload
+    thumbnail = None
+    for path in nobg[:1] + originals[:1]:
+        if path.name in files:
+            thumbnail = path.name
+            break
+
+    # Model thumbnail: first rendered view once available, Meshy's preview until then
+    model_thumbnail = next((name for name in ("view_0.png", "preview.png") if name in files), None)
+
+    return {
+        "files": files,
+        "thumbnail": thumbnail,
+        "model_thumbnail": model_thumbnail,
+        # From the files, not the clock: an unchanged rebuild equals the stored
+        # manifest, so update_job skips it (no version bump, event or new ETag)
+        "built_at": _newest_mtime(files),
+    }
+
+
+def build_asset_manifest(job_id: str) -> Optional[Dict[str, Any]]:
+    """scan_asset_manifest, also updating the usage ledger and object storage."""
+    manifest = scan_asset_manifest(job_id)
+    if manifest is None:
+        return None
+    # Files changed with every manifest rebuild, so the usage ledger follows here
+    record_job(job_id)
+    job = get_job(job_id)
+    if job is not None:
+        # Transient manifests of history jobs without state are served from disk
+        _publish(manifest["files"], (job.get("asset_manifest") or {}).get("files") or {})
+    return manifest
+
+
+def refresh_asset_manifest(job_id: str) -> Optional[Dict[str, Any]]:
+    """Rebuild the manifest and store it on the job (called when a stage finishes)."""
+    manifest = build_asset_manifest(job_id)
+    if manifest is not None:
+        update_job(job_id, asset_manifest=manifest)
+    return manifest
+
+
+def get_asset_manifest(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the stored manifest, building it once for jobs that predate manifests."""
+    job = get_job(job_id)
+    if job and job.get("asset_manifest"):
+        return job["asset_manifest"]
+    if job:
+        return refresh_asset_manifest(job_id)
+    # History job without job_state.json: serve from a transient manifest
+    return build_asset_manifest(job_id)
+
+
+class ThumbnailCache:
+    """Bounded LRU of resized image bytes, keyed by (path, version, size)."""
+
+    def __init__(self, max_bytes: int):
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Tuple[str, str, int], Tuple[bytes, str]]" = OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: Tuple[str, str, int], item: Tuple[bytes, str]):
+        size = len(item[0])
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._items[key] = item
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "max_bytes": self._max_bytes}
+
+
+thumbnail_cache = ThumbnailCache(ASSET_THUMBNAIL_CACHE_MB * 1024 * 1024)
+
+
+def get_resized_asset(entry: Dict[str, Any], size: int) -> Tuple[bytes, str]:
+    """Return (bytes, media_type) of an image asset fitted into size x size.
+
+    Runs PIL decode/resize, so callers on the event loop should use run_in_thread.
+    """
+    key = (entry["path"], entry["version"], size)
+    cached = thumbnail_cache.get(key)
+    if cached is not None:
+        return cached
+
+    from PIL import Image
+
+    if entry.get("key") and not Path(entry["path"]).exists():
+        # Uploaded from another host; keep a local copy to resize from
+        get_store().fetch(entry["key"], entry["path"])
+
+    with Image.open(entry["path"]) as img:
+        # JPEG: let the decoder downscale by 1/2..1/8 instead of decoding full-res
+        img.draft("RGB", (size, size))
+        img.thumbnail((size, size))
+        buf = io.BytesIO()
+        if img.mode in ("RGBA", "LA", "P"):
+            img.save(buf, format="PNG", optimize=True)
+            media_type = "image/png"
+        else:
+            img.convert("RGB").save(buf, format="JPEG", quality=85)
+            media_type = "image/jpeg"
+
+    item = (buf.getvalue(), media_type)
+    thumbnail_cache.put(key, item)
+    return item
@@ -0,0 +1,190 @@
+"""Streaming reader for batch submissions (POST /api/batches).
+
+The request is multipart/form-data, parsed incrementally as it arrives:
+
+    manifest       JSON, first part: {"defaults": {...}, "items": [{"ref": ..., "settings": {...}}, ...]}
+    item{i}        1-4 image parts per item (source first), i = index in "items"
+
+Job ids are assigned when the manifest arrives, and each image part is
+written straight to ``uploads/{job_id}/original_{n}{ext}`` in chunks as it is
+received, so nothing is spooled to a temp file or held whole in memory. On
+any error the directories written so far are removed.
+"""
+import json
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, NamedTuple, Optional
+
+from fastapi import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from app.config import UPLOADS_DIR, BATCH_MAX_ITEMS, BATCH_MAX_IMAGE_MB
+from app.workers.task_queue import run_io
+
+MAX_IMAGES_PER_ITEM = 4
+_MAX_MANIFEST_BYTES = 1024 * 1024
+_MAX_IMAGE_BYTES = BATCH_MAX_IMAGE_MB * 1024 * 1024
+_WRITE_CHUNK = 1024 * 1024
+_PART_NAME_RE = re.compile(r"^item(\d+)$")
+_SUFFIX_RE = re.compile(r"^\.[a-z0-9]{1,5}$")
+
+
+class BatchUploadError(ValueError):
+    pass
+
+
+class ReceivedBatch(NamedTuple):
+    manifest: Dict[str, Any]
+    job_ids: List[str]
+    images: List[List[str]]  # per item, image paths in part order
+
+
+class _Collector:
+    """Parser callbacks recorded as (event, payload) pairs, processed after each write()."""
+
+    def __init__(self):
+        self.events: List[tuple] = []
+        self._field = bytearray()
+        self._value = bytearray()
+        self._headers: Dict[str, bytes] = {}
+
+    def callbacks(self) -> Dict[str, Callable]:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": lambda data, start, end: self._field.extend(data[start:end]),
+            "on_header_value": lambda data, start, end: self._value.extend(data[start:end]),
+            "on_header_end": self._header_end,
+            "on_headers_finished": lambda: self.events.append(("headers", self._headers)),
+            "on_part_data": lambda data, start, end: self.events.append(("data", bytes(data[start:end]))),
+            "on_part_end": lambda: self.events.append(("end", None)),
+        }
+
+    def _part_begin(self):
+        self._headers = {}
+
+    def _header_end(self):
+        self._headers[bytes(self._field).decode("latin-1").lower()] = bytes(self._value)
+        self._field.clear()
+        self._value.clear()
+
+    def drain(self) -> List[tuple]:
+        events, self.events = self.events, []
+        return events
+
+
+def _image_suffix(filename: str) -> str:
+    suffix = Path(filename or "image.png").suffix.lower()
+    return suffix if _SUFFIX_RE.match(suffix) else ".png"
+
+
+def _open_image(path: Path) -> BinaryIO:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return open(path, "wb")
+
+
+def _remove_dirs(job_ids: List[str]):
+    for job_id in job_ids:
+        shutil.rmtree(UPLOADS_DIR / job_id, ignore_errors=True)
+
+
+async def receive_batch(request: Request, validate_manifest: Callable[[Dict[str, Any]], None]) -> ReceivedBatch:
+    """Read a batch request, writing its images into new job upload dirs.
+
+    `validate_manifest` is called as soon as the manifest part is parsed
+    (before any image is read) and may raise to reject the request.
+    Raises BatchUploadError for malformed requests.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise BatchUploadError("Expected multipart/form-data")
+
+    collector = _Collector()
+    parser = MultipartParser(options[b"boundary"], collector.callbacks())
+    manifest: Optional[Dict[str, Any]] = None
+    job_ids: List[str] = []
+    images: List[List[str]] = []
+    manifest_buf: Optional[bytearray] = None
+    out: Optional[BinaryIO] = None
+    pending = bytearray()
+    part_bytes = 0
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for event, payload in collector.drain():
+                if event == "headers":
+                    _, disposition = parse_options_header(payload.get("content-disposition", b""))
+                    name = disposition.get(b"name", b"").decode()
+                    part_bytes = 0
+                    if manifest is None:
+                        if name != "manifest":
+                            raise BatchUploadError("The first part must be the JSON manifest")
+                        manifest_buf = bytearray()
+                        continue
+                    match = _PART_NAME_RE.match(name)
+                    index = int(match.group(1)) if match else -1
+                    if not 0 <= index < len(job_ids):
+                        raise BatchUploadError(f"Unexpected part: {name!r} (image parts are item0..item{len(job_ids) - 1})")
+                    part_type = payload.get("content-type", b"").decode()
+                    if not part_type.startswith("image/"):
+                        raise BatchUploadError(f"Only image files are accepted, got: {part_type or 'no type'} ({name})")
+                    if len(images[index]) >= MAX_IMAGES_PER_ITEM:
+                        raise BatchUploadError(f"{name}: at most {MAX_IMAGES_PER_ITEM} images per item")
+                    filename = disposition.get(b"filename", b"").decode(errors="replace")
+                    path = UPLOADS_DIR / job_ids[index] / f"original_{len(images[index])}{_image_suffix(filename)}"
+                    images[index].append(str(path))
+                    out = await run_io(_open_image, path)
+                elif event == "data":
+                    part_bytes += len(payload)
+                    if manifest_buf is not None:
+                        if part_bytes > _MAX_MANIFEST_BYTES:
+                            raise BatchUploadError("Manifest is too large")
+                        manifest_buf.extend(payload)
+                    elif out is not None:
+                        if part_bytes > _MAX_IMAGE_BYTES:
+                            raise BatchUploadError(f"Image larger than {BATCH_MAX_IMAGE_MB} MB")
+                        pending.extend(payload)
+                        if len(pending) >= _WRITE_CHUNK:
+                            await run_io(out.write, bytes(pending))
+                            pending.clear()
+                elif event == "end":
+                    if manifest_buf is not None:
+                        try:
+                            manifest = json.loads(manifest_buf)
+                        except ValueError as e:
+                            raise BatchUploadError(f"Invalid manifest JSON: {e}")
+                        manifest_buf = None
+                        items = manifest.get("items") if isinstance(manifest, dict) else None
+                        if not isinstance(items, list) or not items:
+                            raise BatchUploadError("Manifest needs a non-empty 'items' list")
+                        if len(items) > BATCH_MAX_ITEMS:
+                            raise BatchUploadError(f"At most {BATCH_MAX_ITEMS} items per batch")
+                        validate_manifest(manifest)
+                        job_ids = [str(uuid.uuid4()) for _ in items]
+                        images = [[] for _ in items]
+                    elif out is not None:
+                        if pending:
+                            await run_io(out.write, bytes(pending))
+                            pending.clear()
+                        await run_io(out.close)
+                        out = None
+        parser.finalize()
+
+        if manifest is None:
+            raise BatchUploadError("Missing manifest part")
+        empty = [index for index, paths in enumerate(images) if not paths]
+        if empty:
+            raise BatchUploadError(f"Items without images: {empty[:20]}")
+        return ReceivedBatch(manifest, job_ids, images)
+    except BaseException:
+        # Client errors and disconnects alike: leave nothing behind
+        if out is not None:
+            out.close()
+        await run_io(_remove_dirs, job_ids)
+        raise
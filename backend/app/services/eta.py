@@ -0,0 +1,165 @@
+"""Time-remaining estimates learned from finished stage durations.
+
+Every finished ``meshy_queue``, ``generation`` and ``download`` span (see
+tracing.record_span) updates an exponentially decayed mean/variance for its
+stage, both overall and for the job's settings combination (ai_model,
+model_type, texturing, PBR, image count). That is three floats per key, so
+memory stays bounded by the number of combinations in use, and old samples
+fade out as Meshy gets faster or slower. A combination with little history
+is pulled towards the stage-wide figures, and a stage without any history
+falls back to a fixed prior (QUALITY_PRESETS for generation).
+
+MeshyService.estimate_remaining combines these expectations with the job's
+position in the submission queue and its generation progress.
+"""
+import logging
+import math
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from app.config import STORAGE_DIR, QUALITY_PRESETS, DEFAULT_QUALITY_PRESET, ETA_DECAY, ETA_PRIOR_SAMPLES
+from app.workers.task_queue import get_job
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("meshy_queue", "generation", "download")
+_PRIORS = {
+    "meshy_queue": 15.0,
+    "generation": QUALITY_PRESETS[DEFAULT_QUALITY_PRESET]["estimated_time_min"] * 60.0,
+    "download": 5.0,
+}
+_STATS_PATH = STORAGE_DIR / "eta_stats.json"
+_ALL = "*"  # key of the stage-wide statistics
+
+
+class DecayedStats:
+    """Exponentially weighted mean and variance: each sample scales older ones by `decay`."""
+
+    __slots__ = ("weight", "mean", "var")
+
+    def __init__(self, weight: float = 0.0, mean: float = 0.0, var: float = 0.0):
+        self.weight = weight
+        self.mean = mean
+        self.var = var
+
+    def observe(self, value: float, decay: float):
+        self.weight = self.weight * decay + 1.0
+        alpha = 1.0 / self.weight
+        delta = value - self.mean
+        self.mean += alpha * delta
+        self.var = (1.0 - alpha) * (self.var + alpha * delta * delta)
+
+
+def job_key(job) -> str:
+    """Settings combination a job's stage durations are learned under."""
+    settings = job.get("settings") or {}
+    textured = settings.get("should_texture", True)
+    return "/".join((
+        settings.get("ai_model") or "meshy-6",
+        settings.get("model_type") or "standard",
+        "textured" if textured else "untextured",
+        "pbr" if textured and settings.get("enable_pbr") else "nopbr",
+        f"{len(job.get('all_image_paths') or ()) or 1}img",
+    ))
+
+
+class Estimator:
+    def __init__(self, decay: float = ETA_DECAY, prior_samples: float = ETA_PRIOR_SAMPLES):
+        self.decay = decay
+        self.prior_samples = prior_samples
+        self._stats: Dict[Tuple[str, str], DecayedStats] = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def observe(self, stage: str, key: str, seconds: float):
+        with self._lock:
+            for k in ((stage, _ALL), (stage, key)):
+                stats = self._stats.get(k)
+                if stats is None:
+                    stats = self._stats[k] = DecayedStats()
+                stats.observe(seconds, self.decay)
+            self.dirty = True
+
+    def expected(self, stage: str, key: str) -> Tuple[float, float]:
+        """(mean, standard deviation) of the stage's duration for `key`."""
+        overall = self._stats.get((stage, _ALL))
+        if overall is None:
+            return _PRIORS[stage], 0.0
+        own = self._stats.get((stage, key))
+        if own is None:
+            return overall.mean, math.sqrt(overall.var)
+        # Shrink towards the stage-wide figures while the combination has few samples
+        total = own.weight + self.prior_samples
+        mean = (own.weight * own.mean + self.prior_samples * overall.mean) / total
+        var = (own.weight * own.var + self.prior_samples * overall.var) / total
+        return mean, math.sqrt(var)
+
+    def remaining(self, stage: str, key: str, elapsed: float = 0.0, fraction: Optional[float] = None) -> float:
+        """Seconds left in a stage running for `elapsed` seconds, `fraction` done if known.
+
+        Without progress the learned mean is counted down (a stage past its
+        mean is given another standard deviation). With progress, the pace so
+        far is extrapolated and trusted more the further the stage is along.
+        """
+        mean, std = self.expected(stage, key)
+        prior = max(mean - elapsed, std)
+        if not fraction or fraction <= 0 or elapsed <= 0:
+            return prior
+        fraction = min(fraction, 1.0)
+        projected = elapsed * (1.0 - fraction) / fraction
+        return fraction * projected + (1.0 - fraction) * prior
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            self.dirty = False
+            return {f"{stage}|{key}": [s.weight, s.mean, s.var] for (stage, key), s in self._stats.items()}
+
+    def load(self, data: Dict[str, Any]):
+        with self._lock:
+            for name, (weight, mean, var) in data.items():
+                stage, _, key = name.partition("|")
+                if stage in STAGES:
+                    self._stats[(stage, key)] = DecayedStats(weight, mean, var)
+
+    def key_count(self) -> int:
+        return len(self._stats)
+
+
+estimator = Estimator()
+
+
+def record(job_id: str, stage: str, seconds: float):
+    """Learn from a job's finished stage (stages outside STAGES are ignored)."""
+    if stage not in STAGES:
+        return
+    job = get_job(job_id)
+    if job is not None:
+        estimator.observe(stage, job_key(job), seconds)
+
+
+def load_stats() -> bool:
+    """Restore learned durations from the last run (blocking). False when there are none."""
+    try:
+        estimator.load(orjson.loads(_STATS_PATH.read_bytes()))
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable ETA statistics: {e}")
+        return False
+    return True
+
+
+def save_stats():
+    """Persist learned durations if they changed (blocking; call via run_io)."""
+    if not estimator.dirty:
+        return
+    try:
+        _STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _STATS_PATH.with_suffix(".tmp")
+        tmp_path.write_bytes(orjson.dumps(estimator.to_dict()))
+        os.replace(tmp_path, _STATS_PATH)
+    except Exception as e:
+        logger.warning(f"Failed to save ETA statistics: {e}")
@@ -0,0 +1,159 @@
+"""Streaming ZIP export of many jobs.
+
+The archive is produced while it is sent: zipfile writes into an unseekable
+sink, so entries carry data descriptors and nothing is spooled to disk. Each
+step reads one EXPORT_CHUNK_KB chunk of one file and compresses/checksums it
+on the I/O executor; the response only holds the bytes of that step, so
+memory stays constant whatever the archive size. Already-compressed assets
+(GLB, PNG, JPEG, WebP) are stored; JSON and other files are deflated.
+
+Layout::
+
+    {job_id}/model.glb        (or every asset with include="all")
+    {job_id}/metadata.json    job status, settings, the exported files and
+                              any listed files that could not be read
+    export.json               jobs exported and job ids that were not found
+"""
+import io
+import logging
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.config import UPLOADS_DIR, EXPORT_CHUNK_KB
+from app.services.assets import scan_asset_manifest
+from app.services.object_store import get_store
+from app.workers.task_queue import get_job, run_io
+
+logger = logging.getLogger(__name__)
+
+INCLUDE_OPTIONS = ("model", "all")
+
+_STORED_TYPES = frozenset(("model/gltf-binary", "image/png", "image/jpeg", "image/webp"))
+_CHUNK_SIZE = EXPORT_CHUNK_KB * 1024
+
+
+class _Sink(io.RawIOBase):
+    """Unseekable write target; the bytes written since the last drain() are sent next."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _settings(job_id: str, job) -> Dict[str, Any]:
+    settings = dict(job.get("settings") or {}) if job else {}
+    if not settings:
+        try:
+            settings = orjson.loads((UPLOADS_DIR / job_id / "settings.json").read_bytes())
+        except (OSError, ValueError):
+            pass
+    settings.pop("all_image_paths", None)  # server paths
+    return settings
+
+
+def _job_export(job_id: str, include: str) -> Tuple[List[Tuple[str, dict]], Optional[dict]]:
+    """(name, manifest entry) pairs to archive and the job's metadata; (.., None) if unknown.
+
+    Read-only: jobs without a stored manifest get a transient scan, which is
+    not saved, recorded in the usage ledger or uploaded.
+    """
+    job = get_job(job_id)
+    manifest = (job.get("asset_manifest") if job else None) or scan_asset_manifest(job_id)
+    if manifest is None:
+        return [], None
+    files = manifest["files"]
+    names = ["model.glb"] if include == "model" else sorted(files)
+    selected = [(name, files[name]) for name in names if name in files]
+    metadata = {
+        "job_id": job_id,
+        "status": job.get("status") if job else "completed",
+        "created_at": job.get("created_at") if job else None,
+        "settings": _settings(job_id, job),
+        "files": {name: {"size": entry["size"], "version": entry["version"], "media_type": entry["media_type"]}
+                  for name, entry in selected},
+    }
+    return selected, metadata
+
+
+def _open(entry) -> Optional[io.RawIOBase]:
+    """Reader of a manifest entry, or None if the file is gone (e.g. deleted since the manifest was built)."""
+    path = Path(entry["path"])
+    try:
+        if entry.get("key") and not path.exists():
+            return get_store().open(entry["key"])
+        return open(path, "rb")
+    except Exception as e:
+        logger.warning(f"Skipping unreadable export file {entry['path']}: {e}")
+        return None
+
+
+def _copy_chunk(src, dest) -> bool:
+    chunk = src.read(_CHUNK_SIZE)
+    if chunk:
+        dest.write(chunk)
+    return bool(chunk)
+
+
+def _entry_info(name: str, compress: bool, size: int = 0) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    info.file_size = size  # only decides whether the entry needs zip64 fields
+    info.external_attr = 0o644 << 16
+    return info
+
+
+async def stream_export(job_ids: List[str], include: str = "model") -> AsyncIterator[bytes]:
+    """Yield the ZIP archive of `job_ids` chunk by chunk."""
+    sink = _Sink()
+    archive = zipfile.ZipFile(sink, "w", allowZip64=True)
+    exported: List[str] = []
+    missing: List[str] = []
+
+    for job_id in job_ids:
+        selected, metadata = await run_io(_job_export, job_id, include)
+        if metadata is None:
+            missing.append(job_id)
+            continue
+        for name, entry in selected:
+            src = await run_io(_open, entry)
+            if src is None:
+                # Nothing of the entry is written yet, so the archive stays valid without it
+                metadata["files"].pop(name, None)
+                metadata.setdefault("missing_files", []).append(name)
+                continue
+            info = _entry_info(f"{job_id}/{name}", entry["media_type"] not in _STORED_TYPES, entry["size"])
+            try:
+                dest = archive.open(info, "w")
+                while await run_io(_copy_chunk, src, dest):
+                    if data := sink.drain():  # empty while the compressor buffers
+                        yield data
+                # Flushes the compressor and writes the data descriptor
+                await run_io(dest.close)
+            finally:
+                src.close()
+            yield sink.drain()
+        archive.writestr(_entry_info(f"{job_id}/metadata.json", True),
+                         orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        exported.append(job_id)
+        yield sink.drain()
+
+    index = {"exported_at": datetime.now().isoformat(), "include": include, "jobs": exported, "missing": missing}
+    archive.writestr(_entry_info("export.json", True), orjson.dumps(index, option=orjson.OPT_INDENT_2))
+    archive.close()
+    yield sink.drain()
+    logger.info(f"Exported {len(exported)} job(s) ({len(missing)} missing)")
@@ -0,0 +1,137 @@
+"""Repackage a GLB as split-asset glTF for parallel, progressive loading.
+
+``model.glb`` has to be downloaded completely before a viewer can show
+anything. The split form is:
+
+    model.gltf          JSON; references the files below with ``?v=`` URIs
+    model.bin           geometry (every buffer view that is not an image)
+    model_tex{i}.{ext}  each texture image, as stored in the GLB
+    model_tex{i}_lo.*   a PLACEHOLDER_SIZE px placeholder of each texture
+    model_lo.gltf       same as model.gltf with the placeholders as images
+
+A viewer can render model_lo.gltf (geometry plus a few KB of textures), then
+swap to model.gltf; model.bin is shared and cached between the two. Each
+image in model.gltf also names its placeholder in ``extras.placeholder``.
+"""
+import io
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import orjson
+
+from app.services.assets import asset_version
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_SIZE = 64
+
+_IMAGE_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+# Extensions that point at buffer views outside accessors/images; left as GLB-only
+_UNSUPPORTED_EXTENSIONS = frozenset(("KHR_draco_mesh_compression", "EXT_meshopt_compression"))
+
+
+def _write(path: Path, data: bytes):
+    """Replace `path` atomically, so a viewer fetching during a re-split never sees a partial file."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _versioned_uri(path: Path) -> str:
+    return f"{path.name}?v={asset_version(path.stat())}"
+
+
+def _placeholder(data: bytes, ext: str) -> bytes:
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data))
+    img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    buf = io.BytesIO()
+    if ext == "jpg":
+        img.convert("RGB").save(buf, format="JPEG", quality=70)
+    else:
+        img.save(buf, format="WEBP" if ext == "webp" else "PNG")
+    return buf.getvalue()
+
+
+def split_glb(glb_path: Path, out_dir: Path) -> Optional[List[str]]:
+    """Write the split form of `glb_path` into `out_dir`. Returns the file names,
+    or None when the GLB layout is not supported (the GLB stays the only form).
+    """
+    from pygltflib import GLTF2, Buffer
+
+    gltf = GLTF2().load_binary(str(glb_path))
+    blob = gltf.binary_blob() or b""
+    if len(gltf.buffers) != 1 or gltf.buffers[0].uri or _UNSUPPORTED_EXTENSIONS & set(gltf.extensionsUsed or ()):
+        logger.info(f"Not splitting {glb_path}: unsupported buffer layout")
+        return None
+
+    def view_bytes(view) -> bytes:
+        start = view.byteOffset or 0
+        return blob[start:start + view.byteLength]
+
+    embedded = [image for image in gltf.images if image.bufferView is not None]
+    unsupported = sorted({str(image.mimeType) for image in embedded if image.mimeType not in _IMAGE_EXTENSIONS})
+    if unsupported:
+        # Checked up front so a rejected model leaves no partial split behind
+        logger.info(f"Not splitting {glb_path}: unsupported image type(s) {unsupported}")
+        return None
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    names = []
+
+    # Images: one file each (+ placeholder), no longer in the buffer
+    image_views = set()
+    placeholders = {}
+    for i, image in enumerate(gltf.images):
+        if image.bufferView is None:
+            continue  # already external/data URI
+        ext = _IMAGE_EXTENSIONS[image.mimeType]
+        data = view_bytes(gltf.bufferViews[image.bufferView])
+        path = out_dir / f"model_tex{i}.{ext}"
+        _write(path, data)
+        lo_path = out_dir / f"model_tex{i}_lo.{ext}"
+        _write(lo_path, _placeholder(data, ext))
+        names += [path.name, lo_path.name]
+        image_views.add(image.bufferView)
+        image.bufferView = None
+        image.uri = _versioned_uri(path)
+        placeholders[i] = _versioned_uri(lo_path)
+        image.extras = {**(image.extras or {}), "placeholder": placeholders[i]}
+
+    # Geometry: remaining views packed into model.bin (4-byte aligned), indices remapped
+    remap = {}
+    views = []
+    geometry = bytearray()
+    for index, view in enumerate(gltf.bufferViews):
+        if index in image_views:
+            continue
+        geometry += b"\0" * (-len(geometry) % 4)
+        data = view_bytes(view)
+        view.byteOffset = len(geometry)
+        view.buffer = 0
+        geometry += data
+        remap[index] = len(views)
+        views.append(view)
+    gltf.bufferViews = views
+    for accessor in gltf.accessors:
+        if accessor.bufferView is not None:
+            accessor.bufferView = remap[accessor.bufferView]
+        if accessor.sparse:
+            accessor.sparse.indices.bufferView = remap[accessor.sparse.indices.bufferView]
+            accessor.sparse.values.bufferView = remap[accessor.sparse.values.bufferView]
+
+    bin_path = out_dir / "model.bin"
+    _write(bin_path, bytes(geometry))
+    names.append(bin_path.name)
+    gltf.buffers = [Buffer(byteLength=len(geometry), uri=_versioned_uri(bin_path))] if geometry else []
+
+    doc = orjson.loads(gltf.gltf_to_json())
+    _write(out_dir / "model.gltf", orjson.dumps(doc))
+    for i, uri in placeholders.items():
+        doc["images"][i]["uri"] = uri
+    _write(out_dir / "model_lo.gltf", orjson.dumps(doc))
+    names += ["model.gltf", "model_lo.gltf"]
+    return names
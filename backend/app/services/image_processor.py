@@ -1,14 +1,135 @@
 import logging
+import threading
 from pathlib import Path
 from typing import Optional, Callable
 
+from app.config import REMBG_MODEL, REMBG_MODE, REMBG_MASK_SIZE, REMBG_MAX_OUTPUT_SIDE
+
 logger = logging.getLogger(__name__)
 
+# Guided-filter window (pixels at mask resolution) and regularization
+_REFINE_RADIUS = 4
+_REFINE_EPS = 1e-3
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def preload():
+    """Import rembg/onnxruntime ahead of the first upload (warmup task)."""
+    import rembg  # noqa: F401
+    from PIL import Image  # noqa: F401
+
+
+def _get_session():
+    """One rembg session per process (rembg.remove would reload the model per call)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from rembg import new_session
+                _session = new_session(REMBG_MODEL)
+    return _session
+
+
+def _open_scaled(input_path: str, max_side: int):
+    """Open an image, letting the JPEG decoder downscale by 1/2..1/8 while
+    staying at least `max_side` on the long edge (no-op for other formats)."""
+    from PIL import Image
+
+    img = Image.open(input_path)
+    if max_side and img.format == "JPEG":
+        long_edge = max(img.size)
+        if long_edge > max_side:
+            # draft() keeps each edge >= the requested size, so scale the box by aspect
+            scale = max_side / long_edge
+            img.draft("RGB", (max(1, int(img.width * scale)), max(1, int(img.height * scale))))
+    img.load()
+    return img
+
+
+def _fit(img, max_side: int):
+    from PIL import Image
+
+    if max_side and max(img.size) > max_side:
+        scale = max_side / max(img.size)
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    return img
+
+
+def _box(x, r: int):
+    """Mean over a (2r+1)^2 window, clipped at the borders (integral image)."""
+    import numpy as np
+
+    padded = np.pad(x, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    h, w = x.shape
+    y0 = np.clip(np.arange(h) - r, 0, h)
+    y1 = np.clip(np.arange(h) + r + 1, 0, h)
+    x0 = np.clip(np.arange(w) - r, 0, w)
+    x1 = np.clip(np.arange(w) + r + 1, 0, w)
+    total = (padded[y1][:, x1] - padded[y0][:, x1] - padded[y1][:, x0] + padded[y0][:, x0])
+    return total / ((y1 - y0)[:, None] * (x1 - x0)[None, :])
+
+
+def _refine_mask(mask, image):
+    """Upscale a low-resolution alpha mask to `image` size along its edges.
+
+    Fast guided filter (He & Sun): the local linear model alpha = a * I + b
+    is fitted at mask resolution against the image luminance, then a and b
+    are upsampled and applied to the full-resolution luminance, so edges
+    follow the image instead of the blurry bicubic mask.
+    """
+    import numpy as np
+    from PIL import Image
+
+    guide = image.convert("L")
+    guide_small = np.asarray(guide.resize(mask.size, Image.Resampling.BOX), dtype=np.float32) / 255
+    p = np.asarray(mask.convert("L"), dtype=np.float32) / 255
+
+    mean_i = _box(guide_small, _REFINE_RADIUS)
+    mean_p = _box(p, _REFINE_RADIUS)
+    cov_ip = _box(guide_small * p, _REFINE_RADIUS) - mean_i * mean_p
+    var_i = _box(guide_small * guide_small, _REFINE_RADIUS) - mean_i * mean_i
+    a = cov_ip / (var_i + _REFINE_EPS)
+    b = mean_p - a * mean_i
+
+    def upsample(values):
+        field = Image.fromarray(_box(values, _REFINE_RADIUS).astype(np.float32), mode="F")
+        return np.asarray(field.resize(image.size, Image.Resampling.BILINEAR))
+
+    alpha = upsample(a) * (np.asarray(guide, dtype=np.float32) / 255) + upsample(b)
+    return Image.fromarray((np.clip(alpha, 0, 1) * 255).astype(np.uint8), mode="L")
+
+
+def _cutout(image, alpha):
+    """Same compositing as rembg's default output: RGBA, background fully transparent."""
+    from PIL import Image
+
+    rgba = image.convert("RGBA")
+    return Image.composite(rgba, Image.new("RGBA", rgba.size, 0), alpha)
+
+
+def adaptive_remove(img, session=None):
+    """Mask at REMBG_MASK_SIZE, refined onto `img` (already normalized)."""
+    from rembg import remove
+
+    small = _fit(img, REMBG_MASK_SIZE)
+    mask = remove(small.convert("RGB"), session=session or _get_session(), only_mask=True)
+    if small.size != img.size:
+        mask = _refine_mask(mask, img)
+    return _cutout(img, mask)
+
 
 def remove_background(input_path: str, output_path: str, progress_callback: Optional[Callable[[int], None]] = None) -> str:
     """Remove background from image using rembg.
     Always saves as PNG to support RGBA transparency.
 
+    REMBG_MODE=adaptive (default) decodes large JPEGs at reduced scale,
+    caps the output at REMBG_MAX_OUTPUT_SIDE, infers the mask at
+    REMBG_MASK_SIZE and upscales it with edge refinement; "full" runs
+    rembg on the full-resolution image.
+
     Args:
         input_path: Path to input image
         output_path: Path to save output image
@@ -18,7 +139,6 @@ def remove_background(input_path: str, output_path: str, progress_callback: Opti
         Path to the processed image
     """
     from rembg import remove
-    from PIL import Image
 
     logger.info(f"Removing background: {input_path}")
 
@@ -26,13 +146,19 @@ def remove_background(input_path: str, output_path: str, progress_callback: Opti
     if progress_callback:
         progress_callback(0)
 
-    inp = Image.open(input_path)
+    if REMBG_MODE == "full":
+        inp = _open_scaled(input_path, 0)
+    else:
+        inp = _fit(_open_scaled(input_path, REMBG_MAX_OUTPUT_SIDE), REMBG_MAX_OUTPUT_SIDE)
 
     if progress_callback:
         progress_callback(25)
 
     # Report processing (25-75%)
-    out = remove(inp)
+    if REMBG_MODE == "full":
+        out = remove(inp, session=_get_session())
+    else:
+        out = adaptive_remove(inp)
 
     if progress_callback:
         progress_callback(75)
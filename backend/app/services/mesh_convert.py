@@ -0,0 +1,149 @@
+"""Convert a GLB into print formats at a physical size.
+
+The model is moved from glTF's Y-up metres into the Z-up millimetre frame
+slicers expect, uniformly scaled so one axis measures `size_mm`, centred on
+the build plate and dropped onto Z=0. All of it is one affine transform per
+mesh (a signed axis permutation, a scale and a translation), applied to the
+vertex arrays in a single matrix product. Blocking and CPU-bound; print_export
+runs it in worker processes, so numpy and trimesh are imported there on
+first use rather than when the API starts.
+"""
+import io
+import os
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# (x, y, z) in glTF -> (x, -z, y): +Y up becomes +Z up, glTF front (+Z) faces -Y
+_Y_UP_TO_Z_UP = ((1.0, 0.0, 0.0), (0.0, 0.0, -1.0), (0.0, 1.0, 0.0))
+_AXIS_INDEX = {"x": 0, "y": 1, "z": 2}
+_METRES_TO_MM = 1000.0
+
+
+def _load_meshes(glb_path: str, keep_visuals: bool) -> List[Any]:
+    import trimesh
+
+    scene = trimesh.load(glb_path, force="scene")
+    # dump() bakes the node transforms into copies of each geometry
+    meshes = [m for m in scene.dump() if isinstance(m, trimesh.Trimesh) and len(m.faces)]
+    if not meshes:
+        raise ValueError("Model has no triangle geometry")
+    if keep_visuals:
+        return meshes
+    return [trimesh.Trimesh(vertices=m.vertices, faces=m.faces, process=False) for m in meshes]
+
+
+def _concatenate(meshes: List[Any]):
+    """One geometry-only mesh (vertex stack plus offset faces)."""
+    import numpy as np
+    import trimesh
+
+    if len(meshes) == 1:
+        return meshes[0]
+    offsets = np.cumsum([0] + [len(m.vertices) for m in meshes[:-1]])
+    return trimesh.Trimesh(
+        vertices=np.vstack([m.vertices for m in meshes]),
+        faces=np.vstack([m.faces + offset for m, offset in zip(meshes, offsets)]),
+        process=False,
+    )
+
+
+def placement(bounds: "np.ndarray", size_mm: Optional[float], axis: str = "max") -> "np.ndarray":
+    """4x4 transform from glTF (Y-up, metres) to the print frame for a model with these bounds.
+
+    Without `size_mm` the model keeps its modelled size (metres -> mm).
+    """
+    import numpy as np
+
+    y_up_to_z_up = np.array(_Y_UP_TO_Z_UP)
+    # A signed permutation maps the bounding box corners exactly
+    corners = bounds @ y_up_to_z_up.T
+    lower, upper = corners.min(axis=0), corners.max(axis=0)
+    extents = upper - lower
+    if size_mm is None:
+        scale = _METRES_TO_MM
+    else:
+        extent = extents.max() if axis == "max" else extents[_AXIS_INDEX[axis]]
+        if extent <= 0:
+            raise ValueError(f"Model has no extent along {axis}")
+        scale = size_mm / extent
+    matrix = np.eye(4)
+    matrix[:3, :3] = y_up_to_z_up * scale
+    # Centre X/Y on the origin and rest the lowest point on Z=0
+    matrix[:3, 3] = -scale * np.array([(lower[0] + upper[0]) / 2, (lower[1] + upper[1]) / 2, lower[2]])
+    return matrix
+
+
+def repair(mesh):
+    """Weld seams, drop degenerate/duplicate faces, make winding consistent and fill small holes."""
+    import trimesh
+
+    mesh.merge_vertices()
+    mesh.update_faces(mesh.nondegenerate_faces())
+    mesh.update_faces(mesh.unique_faces())
+    mesh.remove_unreferenced_vertices()
+    trimesh.repair.fix_normals(mesh)
+    trimesh.repair.fill_holes(mesh)
+
+
+def _obj_bundle(mesh) -> bytes:
+    """model.obj with its material and texture files, zipped."""
+    from trimesh.exchange.obj import export_obj
+
+    # Millimetres: 5 decimals is 10 nm. Normals are left to the slicer/viewer.
+    text, files = export_obj(mesh, include_normals=False, return_texture=True, mtl_name="model.mtl", digits=5)
+    buf = io.BytesIO()
+    # Level 1 keeps most of the gain on OBJ text at a fraction of the default level's time
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        archive.writestr("model.obj", text)
+        for name, data in files.items():
+            # Textures are already compressed images
+            compress = zipfile.ZIP_DEFLATED if name.endswith(".mtl") else zipfile.ZIP_STORED
+            archive.writestr(name, data, compress_type=compress)
+    return buf.getvalue()
+
+
+def convert(glb_path: str, out_path: str, fmt: str, size_mm: Optional[float] = None,
+            axis: str = "max", fix: bool = False) -> Dict[str, Any]:
+    """Write `glb_path` as `fmt` (stl, 3mf or obj) to `out_path`. Returns mesh facts for the response."""
+    import numpy as np
+    import trimesh
+
+    started = time.perf_counter()
+    # Only OBJ carries UVs and textures; STL and 3MF are geometry
+    meshes = _load_meshes(glb_path, keep_visuals=fmt == "obj")
+    bounds = np.array([np.min([m.bounds[0] for m in meshes], axis=0),
+                       np.max([m.bounds[1] for m in meshes], axis=0)])
+    matrix = placement(bounds, size_mm, axis)
+    for m in meshes:
+        m.apply_transform(matrix)
+
+    if fmt == "obj":
+        mesh = meshes[0] if len(meshes) == 1 else trimesh.util.concatenate(meshes)
+    else:
+        mesh = _concatenate(meshes)
+    if fix:
+        repair(mesh)
+
+    if fmt == "stl":
+        data = mesh.export(file_type="stl")  # binary
+    elif fmt == "3mf":
+        # Unit defaults to millimetre; level 1 deflate is ~30% faster than trimesh's default for ~15% more bytes
+        data = trimesh.exchange.threemf.export_3MF(mesh, compresslevel=1)
+    elif fmt == "obj":
+        data = _obj_bundle(mesh)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f".{out_path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, out_path)
+    return {
+        "faces": int(len(mesh.faces)),
+        "extents_mm": [round(float(v), 2) for v in mesh.extents],
+        "watertight": bool(mesh.is_watertight),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -1,20 +1,33 @@
 import logging
-import trimesh
-import numpy as np
 from pathlib import Path
-import matplotlib
-# Use Agg backend for headless rendering
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from PIL import Image
+
+# trimesh, matplotlib and PIL are imported on first use (or by preload()) so
+# API processes that only serve status/SSE don't pay for the scientific stack.
 
 logger = logging.getLogger(__name__)
 
+
+def _load_matplotlib():
+    import matplotlib
+    # Use Agg backend for headless rendering
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    return plt, Poly3DCollection
+
+
+def preload():
+    """Import the rendering stack ahead of the first render (warmup task)."""
+    import trimesh  # noqa: F401
+    _load_matplotlib()
+
+
 def render_views_from_glb(glb_path: str, output_dir: str) -> list[str]:
     """
     Load a GLB file and render 4 views using matplotlib.
     """
+    import trimesh
+
     try:
         # Load mesh
         loaded = trimesh.load(glb_path)
@@ -35,7 +48,9 @@ def render_views_from_glb(glb_path: str, output_dir: str) -> list[str]:
 
 def render_views_from_mesh(mesh, output_dir: str) -> list[str]:
     """Render 4 views from a trimesh mesh using matplotlib (headless)."""
-    
+    plt, Poly3DCollection = _load_matplotlib()
+    from PIL import Image
+
     views = []
     # Camera angles: (elevation, azimuth)
     camera_angles = [(20, -60), (20, 30), (20, 120), (20, 210)]
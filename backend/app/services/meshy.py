@@ -1,17 +1,88 @@
+import time
 import asyncio
 import base64
 import logging
 import httpx
-import json
+import os
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Optional
-
-from app.config import MESHY_API_KEY, MESHY_API_URL, OUTPUTS_DIR, JobStage
-from app.workers.task_queue import jobs, update_job, update_job_stage, get_job
-from app.services.mesh_renderer import render_views_from_glb
+from typing import Dict, List, Optional
+
+from app.config import (
+    MESHY_API_KEY, MESHY_API_URL, OUTPUTS_DIR, JobStage,
+    JOB_QUEUE_DEADLINE, JOB_GENERATION_DEADLINE, JOB_POLL_FAILURE_DEADLINE, JOB_STUCK_RETRIES, REAPER_INTERVAL,
+)
+from app.workers.task_queue import (
+    jobs, update_job, update_job_stage, get_job, run_io, active_jobs, ACTIVE_STATUSES,
+    retexture_jobs, RETEXTURE_ACTIVE_STATUSES,
+)
+from app.services.assets import build_asset_manifest
+from app.services.metrics import record_meshy_call, REGISTRY, Gauge, JOBS_REAPED, JOBS_CANCELLED
+from app.services.submission import SubmissionController, SubmitOutcome
+from app.services.tracing import record_span
+from app.services.eta import estimator, job_key, save_stats as save_eta_stats
+from app.services import variants
+from app.services.object_store import get_store, object_key
+from app.workers.render_queue import schedule_view_render, schedule_repackage
+from app.workers.storage_gc import collect_intermediates
 
 logger = logging.getLogger(__name__)
 
+
+def _input_url(path, media_type: str) -> str:
+    """URL Meshy fetches an input file from: presigned from object storage, else a data URI."""
+    store = get_store()
+    if store.redirects:
+        # Inputs are never rewritten under the same name (variant blobs are
+        # content-addressed), so an existing object is this file
+        key = object_key(path)
+        if not store.exists(key):
+            store.put_file(key, path, media_type)
+        return store.url(key, media_type)
+    return f"data:{media_type};base64,{_read_base64(path)}"
+
+
+def _read_base64(path: str) -> str:
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode('utf-8')
+
+
+def _write_bytes(path: Path, content: bytes) -> None:
+    # Replace rather than rewrite: model.glb may be a hardlink into the variant store
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After in seconds (delta-seconds or HTTP-date form)."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _image_paths(job: dict) -> list:
+    all_paths = job.get("all_image_paths", [])
+    if not all_paths:
+        # Fallback for old jobs: use processed or original image
+        image_path = job.get("processed_image_path") or job.get("image_path")
+        if not image_path or not Path(image_path).exists():
+            image_path = job.get("image_path")
+        if not image_path:
+            raise ValueError("No image path found for job")
+        all_paths = [image_path]
+    return all_paths
+
+
 class MeshyService:
     def __init__(self):
         if not MESHY_API_KEY:
@@ -19,37 +90,131 @@ class MeshyService:
         self.api_key = MESHY_API_KEY
         self.base_url = MESHY_API_URL
         self.polling_task: Optional[asyncio.Task] = None
+        self.reaper_task: Optional[asyncio.Task] = None
+        self.dispatch_task: Optional[asyncio.Task] = None
+        self.submissions = SubmissionController(self._create_task, self._fail_submission, self._generating_count)
         self.is_running = False
+        # Timestamps for queue-wait / generation spans and stage deadlines (in-flight jobs only;
+        # after a restart deadlines restart from the first time the reaper sees the job)
+        self._submitted_at: dict[str, float] = {}
+        self._generation_started_at: dict[str, float] = {}
+        self._poll_failures: dict[str, int] = {}
+        self._last_poll_ok: dict[str, float] = {}
+        self._preview_submitted_at: dict[str, float] = {}
+        # Jobs still waiting in the local submission queue (reaper bookkeeping only, no spans)
+        self._queued_at: dict[str, float] = {}
         
     def start_polling(self):
         if self.is_running:
             return
         self.is_running = True
         self.polling_task = asyncio.create_task(self._poll_loop())
+        self.reaper_task = asyncio.create_task(self._reaper_loop())
+        self.dispatch_task = asyncio.create_task(self.submissions.run())
+        # Jobs restored as queued never reached Meshy; resume their submission
+        for job in active_jobs():
+            if job.get("status") == "queued" and not job.get("meshy_task_id"):
+                self.submissions.enqueue(job["job_id"])
+        # Retextures restored without a task id died mid-submission
+        for job in retexture_jobs():
+            if not job.get("retexture_task_id"):
+                self._fail_retexture(job["job_id"], "Retexture was interrupted before it reached Meshy")
         logger.info("✓ Meshy AI polling service started")
 
     def stop_polling(self):
         self.is_running = False
         if self.polling_task:
             self.polling_task.cancel()
+        if self.reaper_task:
+            self.reaper_task.cancel()
+        if self.dispatch_task:
+            self.dispatch_task.cancel()
             
     async def _image_to_data_uri(self, image_path: str) -> str:
         try:
-            with open(image_path, "rb") as img_file:
-                encoded_string = base64.b64encode(img_file.read()).decode('utf-8')
-                # Determine mime type based on extension
-                ext = Path(image_path).suffix.lower()
-                mime = "image/png" if ext == ".png" else "image/jpeg"
-                return f"data:{mime};base64,{encoded_string}"
+            # Determine mime type based on extension
+            ext = Path(image_path).suffix.lower()
+            mime = "image/png" if ext == ".png" else "image/jpeg"
+            return await run_io(_input_url, image_path, mime)
         except Exception as e:
             logger.error(f"Failed to encode image: {e}")
             raise
 
     async def submit_job(self, job_id: str):
-        """Submit a job to Meshy AI."""
+        """Queue a job for submission to Meshy AI.
+
+        The job must already be "queued"; the submission controller sends it
+        when upstream capacity allows and retries throttled/transient errors.
+        """
         job = get_job(job_id)
         if not job:
             raise ValueError(f"Job {job_id} not found")
+        _image_paths(job)
+        self.submissions.enqueue(job_id)
+
+    def _generating_count(self) -> int:
+        """Generations accepted by Meshy and not yet finished."""
+        count = 0
+        for job in active_jobs():
+            if job.get("status") != "processing":
+                continue
+            if job.get("meshy_task_id") and job.get("stage") != JobStage.POSTPROCESS.value:
+                count += 1
+            if job.get("preview_status") == "processing":
+                count += 1
+        return count
+
+    def estimate_remaining(self, job_list: List[dict]) -> Dict[str, int]:
+        """Estimated seconds until each queued/processing job of `job_list` completes.
+
+        Queued jobs wait for a submission slot: slots free up one window of
+        jobs per Meshy queue + generation time, the first round about half
+        done. Jobs at Meshy count down the learned stage durations, and a
+        generating job extrapolates its progress.
+        """
+        now = time.time()
+        queue = None
+        estimates = {}
+        for job in job_list:
+            if job.get("status") not in ACTIVE_STATUSES:
+                continue
+            job_id = job["job_id"]
+            key = job_key(job)
+            seconds = estimator.remaining("download", key)
+            if job.get("stage") == JobStage.POSTPROCESS.value:
+                pass
+            elif job.get("status") == "processing":
+                generation_started = self._generation_started_at.get(job_id)
+                if generation_started is not None:
+                    # IN_PROGRESS maps Meshy's 0-100 to job progress 10-95
+                    fraction = max(0, job.get("progress", 0) - 10) / 85
+                    seconds += estimator.remaining("generation", key, now - generation_started, fraction)
+                else:
+                    waited = now - self._submitted_at.get(job_id, now)
+                    seconds += estimator.remaining("meshy_queue", key, waited) + estimator.expected("generation", key)[0]
+            else:
+                if queue is None:
+                    window = self.submissions.limit.window
+                    queue = (self.submissions.queue_ranks(), max(0, window - self.submissions.in_flight), window)
+                ranks, free, window = queue
+                # Not in the submission queue yet (e.g. background removal): behind everyone
+                rank = ranks.get(job_id, len(ranks))
+                cycle = estimator.expected("meshy_queue", key)[0] + estimator.expected("generation", key)[0]
+                if rank >= free:
+                    seconds += ((rank - free) // window + 0.5) * cycle
+                seconds += cycle
+            estimates[job_id] = round(seconds)
+        return estimates
+
+    def _fail_submission(self, job_id: str, error: str):
+        logger.error(f"Failed to submit job {job_id} to Meshy: {error}")
+        update_job(job_id, status="failed", error=error)
+
+    async def _create_task(self, job_id: str) -> Optional[SubmitOutcome]:
+        """One create call for a queued job. Returns None if it is no longer queued."""
+        job = get_job(job_id)
+        if not job or job.get("status") != "queued":
+            return None
 
         # Get settings from job
         settings = job.get("settings", {})
@@ -58,50 +223,41 @@ class MeshyService:
         enable_pbr = settings.get("enable_pbr", False)
 
         # Resolve all image paths (multi-image or single)
-        all_paths = job.get("all_image_paths", [])
-        if not all_paths:
-            # Fallback for old jobs: use processed or original image
-            image_path = job.get("processed_image_path") or job.get("image_path")
-            if not image_path or not Path(image_path).exists():
-                image_path = job.get("image_path")
-            if not image_path:
-                raise ValueError("No image path found for job")
-            all_paths = [image_path]
-
+        all_paths = _image_paths(job)
         is_multi = len(all_paths) > 1
 
         logger.info(f"Submitting job {job_id} to Meshy AI (model={ai_model}, images={len(all_paths)}, multi={is_multi})...")
 
-        try:
-            # Convert all images to data URIs
-            image_data_uris = [await self._image_to_data_uri(p) for p in all_paths]
+        # Convert all images to data URIs
+        image_data_uris = [await self._image_to_data_uri(p) for p in all_paths]
 
-            headers = {
-                "Authorization": f"Bearer {self.api_key}"
-            }
+        headers = {
+            "Authorization": f"Bearer {self.api_key}"
+        }
 
-            payload = {
-                "ai_model": ai_model,
-                "should_texture": should_texture,
-                "symmetry_mode": settings.get("symmetry_mode", "auto"),
-            }
+        payload = {
+            "ai_model": ai_model,
+            "should_texture": should_texture,
+            "symmetry_mode": settings.get("symmetry_mode", "auto"),
+        }
 
-            if should_texture:
-                payload["enable_pbr"] = enable_pbr
+        if should_texture:
+            payload["enable_pbr"] = enable_pbr
 
-            model_type = settings.get("model_type", "standard")
-            if model_type == "lowpoly":
-                payload["model_type"] = "lowpoly"
+        model_type = settings.get("model_type", "standard")
+        if model_type == "lowpoly":
+            payload["model_type"] = "lowpoly"
 
-            if is_multi:
-                payload["image_urls"] = image_data_uris
-                endpoint = f"{self.base_url}/multi-image-to-3d"
-            else:
-                payload["image_url"] = image_data_uris[0]
-                endpoint = f"{self.base_url}/image-to-3d"
+        if is_multi:
+            payload["image_urls"] = image_data_uris
+            endpoint = f"{self.base_url}/multi-image-to-3d"
+        else:
+            payload["image_url"] = image_data_uris[0]
+            endpoint = f"{self.base_url}/image-to-3d"
 
-            endpoint_type = "multi-image-to-3d" if is_multi else "image-to-3d"
+        endpoint_type = "multi-image-to-3d" if is_multi else "image-to-3d"
 
+        try:
             async with httpx.AsyncClient() as client:
                 response = await client.post(
                     endpoint,
@@ -109,66 +265,91 @@ class MeshyService:
                     headers=headers,
                     timeout=30.0
                 )
-
-                if response.status_code != 202:
-                    error_msg = f"Meshy API Error: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    update_job(job_id, status="failed", error=error_msg)
-                    return
-
-                data = response.json()
-                meshy_task_id = data.get("result")
-
-                update_job(
-                    job_id,
-                    status="processing",
-                    stage=JobStage.GEOMETRY.value,
-                    progress=10,
-                    meshy_task_id=meshy_task_id,
-                    meshy_endpoint_type=endpoint_type
-                )
-                logger.info(f"Job {job_id} submitted to Meshy ({endpoint_type}). Task ID: {meshy_task_id}")
-
-        except Exception as e:
-            logger.error(f"Failed to submit job to Meshy: {e}")
-            update_job(job_id, status="failed", error=str(e))
+        except httpx.TransportError as e:
+            record_meshy_call("create", None)
+            return SubmitOutcome(None, error=f"Meshy API unreachable: {e!r}")
+        record_meshy_call("create", response.status_code)
+
+        if response.status_code != 202:
+            error_msg = f"Meshy API Error: {response.status_code} - {response.text}"
+            return SubmitOutcome(response.status_code, _retry_after(response), error_msg)
+
+        data = response.json()
+        meshy_task_id = data.get("result")
+        if (get_job(job_id) or {}).get("status") != "queued":
+            # Cancelled while the create request was in flight
+            await self._cancel_remote_task({"meshy_task_id": meshy_task_id, "meshy_endpoint_type": endpoint_type})
+            return SubmitOutcome(response.status_code)
+        self._submitted_at[job_id] = time.time()
+
+        preview_task_id = None
+        if settings.get("progressive"):
+            preview_payload = {**payload, "model_type": "lowpoly", "should_texture": False}
+            preview_payload.pop("enable_pbr", None)
+            preview_task_id = await self._create_preview_task(job_id, endpoint, preview_payload, headers)
+            if (get_job(job_id) or {}).get("status") != "queued":
+                # Cancelled while the preview was being created: neither task is wanted
+                self._submitted_at.pop(job_id, None)
+                for task_id in (meshy_task_id, preview_task_id):
+                    await self._cancel_remote_task({"meshy_task_id": task_id, "meshy_endpoint_type": endpoint_type})
+                return SubmitOutcome(response.status_code)
+            if preview_task_id:
+                self._preview_submitted_at[job_id] = time.time()
+
+        update_job(
+            job_id,
+            status="processing",
+            stage=JobStage.GEOMETRY.value,
+            progress=10,
+            meshy_task_id=meshy_task_id,
+            meshy_endpoint_type=endpoint_type,
+            preview_task_id=preview_task_id,
+            preview_status="processing" if preview_task_id else None,
+        )
+        logger.info(f"Job {job_id} submitted to Meshy ({endpoint_type}). Task ID: {meshy_task_id}")
+        return SubmitOutcome(response.status_code)
+
+    async def _create_preview_task(self, job_id: str, endpoint: str, payload: dict, headers: dict) -> Optional[str]:
+        """Best-effort low-poly, untextured task for progressive jobs (no retries)."""
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(endpoint, json=payload, headers=headers, timeout=30.0)
+        except httpx.TransportError as e:
+            record_meshy_call("preview_create", None)
+            logger.warning(f"Preview submission for {job_id} failed: {e!r}")
+            return None
+        record_meshy_call("preview_create", response.status_code)
+        if response.status_code != 202:
+            logger.warning(f"Preview submission for {job_id} failed: {response.status_code}")
+            return None
+        return response.json().get("result")
 
     async def _poll_loop(self):
         """Background loop to check job status."""
         while self.is_running:
             try:
-                # Find active jobs that have a Meshy Task ID
-                active_meshy_jobs = []
-                # Iterate over a copy of items to avoid modification issues
-                current_jobs = list(jobs.values())
-                
-                for job in current_jobs:
-                    if (job.get("status") == "processing" and 
-                        job.get("meshy_task_id") and 
-                        job.get("stage") != JobStage.COMPLETED.value):
-                        active_meshy_jobs.append(job)
-
-                if not active_meshy_jobs:
+                # Find active jobs that have a Meshy Task ID (from the job store's indexes)
+                active_meshy_jobs = [
+                    job for job in active_jobs()
+                    if job.get("status") == "processing"
+                    and job.get("meshy_task_id")
+                    and job.get("stage") != JobStage.COMPLETED.value
+                ]
+                active_retexture_jobs = retexture_jobs()
+
+                if not active_meshy_jobs and not active_retexture_jobs:
                     await asyncio.sleep(2) # Short sleep if empty
                     continue
 
                 async with httpx.AsyncClient() as client:
                     for job in active_meshy_jobs:
+                        if job.get("preview_status") == "processing":
+                            await self._check_preview_status(client, job)
                         await self._check_job_status(client, job)
-
-                # Also check for active retexture jobs
-                active_retexture_jobs = []
-                for job in current_jobs:
-                    if job.get("retexture_task_id"):
-                        # Import to check status
-                        from app.routers.jobs import _retexture_status
-                        retex_status = _retexture_status.get(job["job_id"], {}).get("status")
-                        if retex_status == "processing":
-                            active_retexture_jobs.append(job)
-
-                async with httpx.AsyncClient() as client:
                     for job in active_retexture_jobs:
                         await self._check_retexture_status(client, job)
+                # Finished generations free submission slots
+                self.submissions.notify()
 
                 await asyncio.sleep(2) # Poll interval
                 
@@ -189,10 +370,16 @@ class MeshyService:
                 f"{self.base_url}/{endpoint_type}/{task_id}",
                 headers=headers
             )
+            record_meshy_call("poll", response.status_code)
 
             if response.status_code != 200:
                 logger.warning(f"Failed to poll task {task_id}: {response.status_code}")
+                self._poll_failures[job_id] = self._poll_failures.get(job_id, 0) + 1
                 return
+            self._last_poll_ok[job_id] = time.time()
+
+            if not self._is_current_task(job_id, task_id):
+                return  # cancelled or reaped while the request was in flight
 
             data = response.json()
             status = data.get("status")
@@ -209,6 +396,7 @@ class MeshyService:
                 update_job_stage(job_id, JobStage.GEOMETRY, 5)
 
             elif status == "IN_PROGRESS":
+                self._mark_generation_started(job_id)
                 # Map Meshy's 0-100 progress to our 10-95% range (geometry stage)
                 # Ensure progress strictly increases
                 new_progress = max(current_progress, 10 + int(progress * 0.85))
@@ -216,58 +404,317 @@ class MeshyService:
 
             elif status == "SUCCEEDED":
                 logger.info(f"Meshy task {task_id} succeeded. Downloading model...")
+                self._mark_generation_finished(job_id)
                 model_urls = data.get("model_urls", {})
                 glb_url = model_urls.get("glb")
                 
                 if glb_url:
-                    await self._download_and_finalize(client, job_id, glb_url)
+                    await self._download_and_finalize(client, job_id, glb_url, data.get("thumbnail_url"))
                 else:
                     update_job(job_id, status="failed", error="No GLB URL in response")
                     
             elif status == "FAILED":
                 error_msg = data.get("task_error", {}).get("message", "Unknown error")
+                self._mark_generation_finished(job_id, error=error_msg)
+                current = get_job(job_id)
+                if current and current.get("preview_status") == "processing":
+                    update_job(job_id, preview_status=await self._retire_preview(current))
                 update_job(job_id, status="failed", error=f"Meshy Failed: {error_msg}")
                 
         except Exception as e:
             logger.error(f"Error checking job {job_id}: {e}")
+            self._poll_failures[job_id] = self._poll_failures.get(job_id, 0) + 1
 
-    async def _download_and_finalize(self, client: httpx.AsyncClient, job_id: str, url: str):
+    async def _check_preview_status(self, client: httpx.AsyncClient, job: dict):
+        """Poll the low-poly preview task of a progressive job and publish its GLB."""
+        job_id = job["job_id"]
+        task_id = job["preview_task_id"]
+        endpoint_type = job.get("meshy_endpoint_type", "image-to-3d")
+        try:
+            response = await client.get(
+                f"{self.base_url}/{endpoint_type}/{task_id}",
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            record_meshy_call("preview_poll", response.status_code)
+            if response.status_code != 200:
+                return
+
+            data = response.json()
+            status = data.get("status")
+            if status == "FAILED":
+                update_job(job_id, preview_status="failed")
+                return
+            glb_url = data.get("model_urls", {}).get("glb")
+            if status != "SUCCEEDED" or not glb_url:
+                return
+
+            response = await client.get(glb_url)
+            record_meshy_call("preview_download", response.status_code)
+            if response.status_code != 200:
+                update_job(job_id, preview_status="failed")
+                return
+            preview_path = OUTPUTS_DIR / job_id / "model_preview.glb"
+            await run_io(_write_bytes, preview_path, response.content)
+
+            current = get_job(job_id)
+            if not current or current.get("preview_task_id") != task_id or current.get("preview_status") != "processing":
+                # The full model landed (or the job ended) while downloading
+                await run_io(preview_path.unlink, True)
+                return
+            submitted_at = self._preview_submitted_at.pop(job_id, None)
+            if submitted_at is not None:
+                record_span(job_id, "preview", submitted_at, bytes=len(response.content))
+            update_job(
+                job_id,
+                event_type="preview_ready",
+                preview_status="completed",
+                asset_manifest=await run_io(build_asset_manifest, job_id),
+            )
+            logger.info(f"Preview model ready for {job_id}")
+        except Exception as e:
+            logger.error(f"Error checking preview of job {job_id}: {e}")
+
+    async def _retire_preview(self, job: dict) -> Optional[str]:
+        """Cancel a running preview task and drop its GLB. Returns the new preview_status."""
+        preview_status = job.get("preview_status")
+        self._preview_submitted_at.pop(job["job_id"], None)
+        if preview_status in (None, "failed"):
+            return preview_status
+        if preview_status == "processing":
+            await self._cancel_remote_task({
+                "meshy_task_id": job.get("preview_task_id"),
+                "meshy_endpoint_type": job.get("meshy_endpoint_type"),
+            })
+        await run_io((OUTPUTS_DIR / job["job_id"] / "model_preview.glb").unlink, True)
+        return "replaced"
+
+    def _mark_generation_started(self, job_id: str):
+        if job_id in self._generation_started_at:
+            return
+        now = time.time()
+        self._generation_started_at[job_id] = now
+        submitted_at = self._submitted_at.pop(job_id, None)
+        if submitted_at is not None:
+            record_span(job_id, "meshy_queue", submitted_at, now)
+
+    def _mark_generation_finished(self, job_id: str, error: Optional[str] = None):
+        started_at = self._generation_started_at.pop(job_id, None) or self._submitted_at.pop(job_id, None)
+        self._submitted_at.pop(job_id, None)
+        retries = self._poll_failures.pop(job_id, 0)
+        self._last_poll_ok.pop(job_id, None)
+        self.submissions.notify()
+        if started_at is not None:
+            record_span(job_id, "generation", started_at, retries=retries, error=error)
+
+    def _is_current_task(self, job_id: str, task_id: str) -> bool:
+        job = get_job(job_id)
+        return bool(job) and job.get("status") == "processing" and job.get("meshy_task_id") == task_id
+
+    async def _cancel_remote_task(self, job: dict):
+        """Best-effort DELETE of the Meshy task so it stops consuming quota."""
+        task_id = job.get("meshy_task_id")
+        if not task_id:
+            return
+        endpoint_type = job.get("meshy_endpoint_type", "image-to-3d")
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.delete(
+                    f"{self.base_url}/{endpoint_type}/{task_id}",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    timeout=10.0,
+                )
+            record_meshy_call("cancel", response.status_code)
+            if response.status_code not in (200, 204, 404):
+                logger.warning(f"Failed to cancel Meshy task {task_id}: {response.status_code}")
+        except httpx.HTTPError as e:
+            record_meshy_call("cancel", None)
+            logger.warning(f"Failed to cancel Meshy task {task_id}: {e}")
+
+    async def cancel_job(self, job_id: str, reason: str = "Cancelled by user") -> bool:
+        """Stop polling a queued/processing job and cancel its Meshy task.
+
+        Returns False when the job is not in flight.
+        """
+        job = get_job(job_id)
+        if not job or job.get("status") not in ACTIVE_STATUSES:
+            return False
+        # Fail first so in-flight polls and downloads see the job is gone
+        update_job(job_id, status="failed", error=reason)
+        self.submissions.discard(job_id)
+        self._mark_generation_finished(job_id, error=reason)
+        await self._cancel_remote_task(job)
+        if job.get("preview_status") == "processing":
+            update_job(job_id, preview_status=await self._retire_preview(job))
+        JOBS_CANCELLED.inc()
+        logger.info(f"Job {job_id} cancelled")
+        return True
+
+    def _stuck_reason(self, job: dict, now: float) -> Optional[str]:
+        job_id = job["job_id"]
+        if job.get("stage") == JobStage.POSTPROCESS.value:
+            return None  # generation done; download/render are bounded by HTTP timeouts
+        if not job.get("meshy_task_id"):
+            return None  # not at Meshy yet; see _queue_expired
+        generation_started = self._generation_started_at.get(job_id)
+        if generation_started is not None:
+            if now - generation_started > JOB_GENERATION_DEADLINE:
+                return f"generation exceeded {JOB_GENERATION_DEADLINE}s"
+        elif now - self._submitted_at.setdefault(job_id, now) > JOB_QUEUE_DEADLINE:
+            return f"still queued at Meshy after {JOB_QUEUE_DEADLINE}s"
+        if now - self._last_poll_ok.setdefault(job_id, now) > JOB_POLL_FAILURE_DEADLINE:
+            return f"no successful status poll for {JOB_POLL_FAILURE_DEADLINE}s"
+        return None
+
+    def _queue_expired(self, job: dict, now: float) -> bool:
+        """Whether a job waiting in the local submission queue has passed JOB_QUEUE_DEADLINE.
+
+        The clock starts when the job enters the submission queue, so batch
+        items still waiting for background removal are not counted.
+        """
+        job_id = job["job_id"]
+        if job.get("status") != "queued" or job.get("meshy_task_id"):
+            self._queued_at.pop(job_id, None)
+            return False
+        if job_id not in self._queued_at:
+            if not self.submissions.is_queued(job_id):
+                return False
+            self._queued_at[job_id] = now
+        return now - self._queued_at[job_id] > JOB_QUEUE_DEADLINE
+
+    async def reap_stuck_jobs(self) -> int:
+        """Resubmit or fail jobs past their stage deadline. Returns jobs reaped."""
+        now = time.time()
+        # Drop deadline state of jobs that finished or were deleted
+        for tracked in (self._submitted_at, self._generation_started_at, self._poll_failures, self._last_poll_ok,
+                        self._preview_submitted_at, self._queued_at):
+            for job_id in [j for j in tracked if (jobs.get(j) or {}).get("status") not in ACTIVE_STATUSES]:
+                tracked.pop(job_id, None)
+
+        reaped = 0
+        for job in active_jobs():
+            if job.get("status") not in ACTIVE_STATUSES:
+                continue
+            if self._queue_expired(job, now):
+                # Still behind the concurrency limit: resubmitting would only requeue it,
+                # so it fails without using a retry or recording a span
+                reaped += 1
+                job_id = job["job_id"]
+                logger.warning(f"Job {job_id} not submitted to Meshy within {JOB_QUEUE_DEADLINE}s; failing")
+                JOBS_REAPED.inc(action="failed")
+                self.submissions.discard(job_id)
+                self._queued_at.pop(job_id, None)
+                update_job(job_id, status="failed",
+                           error=f"Job timed out: not submitted to Meshy within {JOB_QUEUE_DEADLINE}s")
+                continue
+            reason = self._stuck_reason(job, now)
+            if not reason:
+                continue
+            reaped += 1
+            job_id = job["job_id"]
+            retries = job.get("stuck_retries", 0)
+            await self._cancel_remote_task(job)
+            if job.get("preview_status") == "processing":
+                update_job(job_id, preview_status=await self._retire_preview(job))
+            self._mark_generation_finished(job_id, error=reason)
+            if retries < JOB_STUCK_RETRIES:
+                logger.warning(f"Job {job_id} stuck ({reason}); resubmitting ({retries + 1}/{JOB_STUCK_RETRIES})")
+                JOBS_REAPED.inc(action="retried")
+                update_job(job_id, status="queued", meshy_task_id=None, stuck_retries=retries + 1)
+                await self.submit_job(job_id)
+            else:
+                logger.warning(f"Job {job_id} stuck ({reason}); failing")
+                JOBS_REAPED.inc(action="failed")
+                update_job(job_id, status="failed", error=f"Job timed out: {reason}")
+        return reaped
+
+    async def _reaper_loop(self):
+        while self.is_running:
+            try:
+                await asyncio.sleep(REAPER_INTERVAL)
+                await self.reap_stuck_jobs()
+                await run_io(save_eta_stats)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in stuck-job reaper: {e}")
+
+    async def _download_preview(self, client: httpx.AsyncClient, job_id: str, url: str, output_path: Path) -> bool:
+        """Store Meshy's preview image as the model thumbnail until views are rendered."""
+        try:
+            response = await client.get(url)
+            record_meshy_call("preview_download", response.status_code)
+            if response.status_code != 200:
+                logger.warning(f"Failed to download preview for {job_id}: {response.status_code}")
+                return False
+            await run_io(_write_bytes, output_path, response.content)
+            return True
+        except httpx.HTTPError as e:
+            record_meshy_call("preview_download", None)
+            logger.warning(f"Failed to download preview for {job_id}: {e}")
+            return False
+
+    async def _download_and_finalize(self, client: httpx.AsyncClient, job_id: str, url: str,
+                                     thumbnail_url: Optional[str] = None):
         try:
             update_job_stage(job_id, JobStage.POSTPROCESS, 95)
             
             # Download
+            download_started = time.time()
             response = await client.get(url)
+            record_meshy_call("download", response.status_code)
             if response.status_code != 200:
                 raise Exception(f"Failed to download GLB: {response.status_code}")
             
             job_output_dir = OUTPUTS_DIR / job_id
-            job_output_dir.mkdir(parents=True, exist_ok=True)
             output_path = job_output_dir / "model.glb"
-            
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-                
+            preview_path = job_output_dir / "preview.png"
+            # Downloaded beside the live files, which are only replaced if the job was not cancelled
+            staged = [(job_output_dir / ".model.glb.download", output_path)]
+            await run_io(_write_bytes, staged[0][0], response.content)
+            record_span(job_id, "download", download_started, bytes=len(response.content))
+            if thumbnail_url:
+                staged_preview = job_output_dir / ".preview.png.download"
+                if await self._download_preview(client, job_id, thumbnail_url, staged_preview):
+                    staged.append((staged_preview, preview_path))
+
+            if (get_job(job_id) or {}).get("status") != "processing":
+                logger.info(f"Job {job_id} was cancelled during download; not finalizing")
+                for tmp_path, _ in staged:
+                    await run_io(tmp_path.unlink, True)
+                return
+            # Renames only, with no await since the check, so a cancel cannot land in between
+            # and leave the job cancelled with the new files in place
+            for tmp_path, path in staged:
+                os.replace(tmp_path, path)
             logger.info(f"Model saved to {output_path}")
-            
-            # Render thumbnails
-            # Run in thread to avoid blocking loop
-            loop = asyncio.get_running_loop()
-            views = await loop.run_in_executor(None, render_views_from_glb, str(output_path), str(job_output_dir))
-            
-            # Finalize
+
+            # The full model replaces a progressive job's low-poly preview
+            preview_status = await self._retire_preview(get_job(job_id))
+            await run_io(collect_intermediates, job_id)
+
+            # Finalize now; the four local views are rendered in the background
+            manifest = await run_io(build_asset_manifest, job_id)
+            if (get_job(job_id) or {}).get("status") != "processing":
+                # Cancelled or reaped during the awaits above; keep that outcome
+                logger.info(f"Job {job_id} was cancelled while finalizing; not completing")
+                return
             update_job(
                 job_id,
                 status="completed",
                 stage=JobStage.COMPLETED.value,
                 progress=100,
                 model_path=str(output_path),
-                multi_angle_paths=views
+                multi_angle_paths=[],
+                asset_manifest=manifest,
+                views_pending=True,
+                preview_status=preview_status,
             )
+            schedule_view_render(job_id)
             logger.info(f"Job {job_id} fully completed.")
             
         except Exception as e:
             logger.error(f"Finalization failed for {job_id}: {e}")
-            update_job(job_id, status="failed", error=f"Download/Render failed: {str(e)}")
+            update_job(job_id, status="failed", error=f"Download failed: {str(e)}")
 
     async def submit_retexture_job(self, job_id: str, settings: dict):
         """Submit a retexture job to Meshy AI text-to-texture API."""
@@ -275,17 +722,15 @@ class MeshyService:
         if not job:
             raise ValueError(f"Job {job_id} not found")
 
-        model_path = job.get("model_path")
+        # Always texture the generated model, not a previous retexture of it
+        model_path = await run_io(variants.base_model_path, job_id) or job.get("model_path")
         if not model_path:
             raise ValueError("No model path found for job")
 
         logger.info(f"Submitting retexture job {job_id} to Meshy AI...")
 
         try:
-            # Read the GLB file and convert to base64
-            with open(model_path, "rb") as f:
-                model_data = base64.b64encode(f.read()).decode('utf-8')
-                model_url = f"data:model/gltf-binary;base64,{model_data}"
+            model_url = await run_io(_input_url, model_path, "model/gltf-binary")
 
             headers = {
                 "Authorization": f"Bearer {self.api_key}"
@@ -316,32 +761,54 @@ class MeshyService:
                     headers=headers,
                     timeout=30.0
                 )
+                record_meshy_call("retexture_create", response.status_code)
 
                 if response.status_code != 202:
-                    error_msg = f"Meshy API Error: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    update_job(job_id, retexture_error=error_msg)
-                    return
+                    raise RuntimeError(f"Meshy API Error: {response.status_code} - {response.text}")
 
                 data = response.json()
                 retexture_task_id = data.get("result")
 
-                # Store retexture task ID in job
-                update_job(job_id, retexture_task_id=retexture_task_id)
+                # Store retexture task ID in job (the poller picks it up from the retexture index)
+                update_job(job_id, event_type="retexture_update", retexture_task_id=retexture_task_id, retexture_progress=5)
                 logger.info(f"Retexture job {job_id} submitted. Task ID: {retexture_task_id}")
 
         except Exception as e:
             logger.error(f"Failed to submit retexture job: {e}")
-            update_job(job_id, retexture_error=str(e))
+            self._fail_retexture(job_id, str(e))
             raise
 
+    def _fail_retexture(self, job_id: str, error: str):
+        update_job(job_id, event_type="retexture_update", retexture_status="failed", retexture_progress=0, retexture_error=error)
+
+    def _is_current_retexture(self, job_id: str, task_id: str) -> bool:
+        job = get_job(job_id)
+        return bool(job) and job.get("retexture_status") == "processing" and job.get("retexture_task_id") == task_id
+
+    async def cancel_retexture(self, job_id: str) -> bool:
+        """Stop tracking a running retexture and cancel its Meshy task; the model is left untouched.
+
+        Returns False when no retexture is in flight.
+        """
+        job = get_job(job_id)
+        if not job or job.get("retexture_status") not in RETEXTURE_ACTIVE_STATUSES:
+            return False
+        # Leave the index first so the poller/download stop before the DELETE round trip
+        update_job(job_id, event_type="retexture_update", retexture_status="cancelled", retexture_progress=0, retexture_error=None)
+        await self._cancel_remote_task({
+            "meshy_task_id": job.get("retexture_task_id"),
+            "meshy_endpoint_type": "text-to-texture",
+        })
+        logger.info(f"Retexture of {job_id} cancelled")
+        return True
+
     async def _check_retexture_status(self, client: httpx.AsyncClient, job: dict):
         """Check retexture job status."""
         job_id = job["job_id"]
         task_id = job.get("retexture_task_id")
 
         if not task_id:
-            return
+            return  # create request still in flight
 
         try:
             headers = {"Authorization": f"Bearer {self.api_key}"}
@@ -349,24 +816,24 @@ class MeshyService:
                 f"{self.base_url}/text-to-texture/{task_id}",
                 headers=headers
             )
+            record_meshy_call("retexture_poll", response.status_code)
 
             if response.status_code != 200:
                 logger.warning(f"Failed to poll retexture task {task_id}: {response.status_code}")
                 return
 
+            if not self._is_current_retexture(job_id, task_id):
+                return  # cancelled while the request was in flight
+
             data = response.json()
             status = data.get("status")
             progress = data.get("progress", 0)
 
-            # Import retexture status tracking from jobs.py
-            from app.routers.jobs import _retexture_status
-
-            if status == "PENDING":
-                _retexture_status[job_id] = {"status": "processing", "progress": 5, "error": None}
-
-            elif status == "IN_PROGRESS":
-                current_progress = max(10, 10 + int(progress * 0.8))
-                _retexture_status[job_id] = {"status": "processing", "progress": current_progress, "error": None}
+            if status in ("PENDING", "IN_PROGRESS"):
+                current_progress = 5 if status == "PENDING" else max(10, 10 + int(progress * 0.8))
+                # Only publish changes; the poller sees every job every cycle
+                if current_progress != job.get("retexture_progress"):
+                    update_job(job_id, event_type="retexture_update", retexture_progress=current_progress)
 
             elif status == "SUCCEEDED":
                 logger.info(f"Retexture task {task_id} succeeded. Downloading model...")
@@ -374,56 +841,72 @@ class MeshyService:
 
                 if texture_urls:
                     # Download the first textured model
-                    await self._download_retextured_model(client, job_id, texture_urls[0].get("glb_url"))
+                    await self._download_retextured_model(client, job_id, task_id, texture_urls[0].get("glb_url"))
                 else:
-                    error = "No texture URLs in response"
-                    _retexture_status[job_id] = {"status": "failed", "progress": 0, "error": error}
+                    self._fail_retexture(job_id, "No texture URLs in response")
 
             elif status == "FAILED":
                 error_msg = data.get("task_error", {}).get("message", "Unknown error")
-                _retexture_status[job_id] = {"status": "failed", "progress": 0, "error": f"Meshy Failed: {error_msg}"}
+                self._fail_retexture(job_id, f"Meshy Failed: {error_msg}")
 
         except Exception as e:
             logger.error(f"Error checking retexture job {job_id}: {e}")
 
-    async def _download_retextured_model(self, client: httpx.AsyncClient, job_id: str, url: str):
+    async def _download_retextured_model(self, client: httpx.AsyncClient, job_id: str, task_id: str, url: str):
         """Download retextured model and replace the original."""
         try:
-            from app.routers.jobs import _retexture_status
-
-            _retexture_status[job_id] = {"status": "processing", "progress": 95, "error": None}
+            update_job(job_id, event_type="retexture_update", retexture_progress=95)
 
             # Download
             response = await client.get(url)
+            record_meshy_call("retexture_download", response.status_code)
             if response.status_code != 200:
                 raise Exception(f"Failed to download retextured GLB: {response.status_code}")
 
-            job_output_dir = OUTPUTS_DIR / job_id
-            output_path = job_output_dir / "model.glb"
-
-            # Backup original model
-            backup_path = job_output_dir / "model_original.glb"
-            if output_path.exists() and not backup_path.exists():
-                import shutil
-                shutil.copy2(output_path, backup_path)
-
-            # Save retextured model
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-
-            logger.info(f"Retextured model saved to {output_path}")
+            if not self._is_current_retexture(job_id, task_id):
+                return  # cancelled during the download; keep the current model
+
+            # File it in the variant store, then point model.glb at the new blob
+            variant_id = (get_job(job_id) or {}).get("retexture_variant") or f"task-{task_id[:16]}"
+            await run_io(variants.store, job_id, variant_id, response.content)
+            if not self._is_current_retexture(job_id, task_id):
+                await run_io(variants.discard, job_id, variant_id)
+                return  # cancelled while storing
+            previous = await run_io(variants.active_variant, job_id)
+            output_path = await run_io(variants.activate, job_id, variant_id)
+            manifest = await run_io(build_asset_manifest, job_id)
+            if not self._is_current_retexture(job_id, task_id):
+                # Cancelled while activating: cancelling leaves the model untouched, so put it back
+                if previous:
+                    await run_io(variants.activate, job_id, previous)
+                await run_io(variants.discard, job_id, variant_id)
+                return
 
-            # Update job
-            update_job(job_id, model_path=str(output_path))
+            logger.info(f"Retextured model saved as variant {variant_id} of {job_id}")
 
-            # Mark retexture as completed
-            _retexture_status[job_id] = {"status": "completed", "progress": 100, "error": None}
+            # Update job and mark retexture as completed (no await since the check)
+            update_job(
+                job_id,
+                event_type="retexture_update",
+                model_path=str(output_path),
+                asset_manifest=manifest,
+                retexture_status="completed",
+                retexture_progress=100,
+                retexture_error=None,
+            )
+            schedule_repackage(job_id)
             logger.info(f"Retexture job {job_id} completed.")
 
         except Exception as e:
             logger.error(f"Retexture download failed for {job_id}: {e}")
-            from app.routers.jobs import _retexture_status
-            _retexture_status[job_id] = {"status": "failed", "progress": 0, "error": f"Download failed: {str(e)}"}
+            self._fail_retexture(job_id, f"Download failed: {str(e)}")
 
 # Global instance
 meshy_service = MeshyService()
+
+REGISTRY.register(Gauge(
+    "protoscale_meshy_submit_limit", "Current AIMD limit on generations in flight at Meshy",
+    lambda: meshy_service.submissions.limit.window))
+REGISTRY.register(Gauge(
+    "protoscale_meshy_in_flight", "Generations submitted to Meshy and not yet finished",
+    lambda: meshy_service.submissions.in_flight))
@@ -0,0 +1,250 @@
+"""Constant-memory metrics with Prometheus text exposition.
+
+Histograms use fixed buckets, so memory depends only on the number of label
+combinations (a small, fixed set of stages/operations), never on traffic.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.workers.task_queue import active_job_count, queued_job_count, subscriber_count
+
+# Seconds; covers sub-second rembg up to multi-minute Meshy generations
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200)
+# Seconds; event loop stalls worth seeing start around a millisecond
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Gauge read from a callback at scrape time (no bookkeeping on hot paths)."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        super().__init__(name, documentation)
+        self._callback = callback
+
+    def value(self) -> float:
+        return self._callback()
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.value())}"]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = STAGE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self, **labels: str) -> Dict[str, float]:
+        """Count, mean and bucket-interpolated p50/p95/p99 for one label set."""
+        key = self._key(labels)
+        with self._lock:
+            counts = list(self._counts.get(key, ()))
+            total_sum = self._sums.get(key, 0.0)
+        count = sum(counts)
+        if not count:
+            return {"count": 0, "avg": 0, "p50": 0, "p95": 0, "p99": 0}
+        return {
+            "count": count,
+            "avg": total_sum / count,
+            "p50": self._quantile(counts, count, 0.50),
+            "p95": self._quantile(counts, count, 0.95),
+            "p99": self._quantile(counts, count, 0.99),
+        }
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def label_sets(self) -> List[LabelValues]:
+        with self._lock:
+            return sorted(self._counts)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v), self._sums[k]) for k, v in self._counts.items())
+        lines = []
+        for key, counts, total_sum in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Stages: upload, rembg, meshy_queue, generation, download, render
+STAGE_DURATION: Histogram = REGISTRY.register(Histogram(
+    "protoscale_stage_duration_seconds", "Duration of pipeline stages", ["stage"]))
+MESHY_API_REQUESTS: Counter = REGISTRY.register(Counter(
+    "protoscale_meshy_api_requests_total", "Meshy API calls by operation and HTTP status",
+    ["operation", "status"]))
+LOOP_LAG: Histogram = REGISTRY.register(Histogram(
+    "protoscale_event_loop_lag_seconds", "Delay of event loop wakeups beyond their schedule",
+    buckets=LOOP_LAG_BUCKETS))
+LOOP_BLOCKS: Counter = REGISTRY.register(Counter(
+    "protoscale_event_loop_blocks_total", "Event loop stalls longer than LOOP_BLOCK_THRESHOLD"))
+JOBS_REAPED: Counter = REGISTRY.register(Counter(
+    "protoscale_jobs_reaped_total", "Stuck jobs handled by the reaper", ["action"]))
+JOBS_CANCELLED: Counter = REGISTRY.register(Counter(
+    "protoscale_jobs_cancelled_total", "Generations cancelled by users"))
+SUBMISSION_RETRIES: Counter = REGISTRY.register(Counter(
+    "protoscale_meshy_submit_retries_total",
+    "Meshy submissions requeued (throttled, transient) or failed after retries (exhausted)", ["reason"]))
+SUBMISSION_LATENCY: Histogram = REGISTRY.register(Histogram(
+    "protoscale_meshy_submit_latency_seconds", "Latency of Meshy create calls"))
+RETEXTURE_REQUESTS: Counter = REGISTRY.register(Counter(
+    "protoscale_retexture_requests_total",
+    "Retexture requests by source (cached variant or new Meshy task)", ["source"]))
+STORAGE_RECLAIMED: Counter = REGISTRY.register(Counter(
+    "protoscale_storage_reclaimed_bytes_total",
+    "Bytes freed by intermediate cleanup and by retention/quota evictions", ["reason"]))
+PRINT_EXPORTS: Counter = REGISTRY.register(Counter(
+    "protoscale_print_exports_total", "Print exports by format and source (cache or conversion)",
+    ["format", "source"]))
+PRINT_CONVERSION: Histogram = REGISTRY.register(Histogram(
+    "protoscale_print_conversion_seconds", "Time to convert a model to a print format", ["format"]))
+STATUS_REQUESTS: Counter = REGISTRY.register(Counter(
+    "protoscale_status_requests_total",
+    "Job status requests by mode (poll, long_poll) and response (200, 304)", ["mode", "code"]))
+REGISTRY.register(Gauge(
+    "protoscale_active_jobs", "Jobs queued or processing", active_job_count))
+REGISTRY.register(Gauge(
+    "protoscale_queue_depth", "Jobs queued and not yet accepted by Meshy", queued_job_count))
+REGISTRY.register(Gauge(
+    "protoscale_sse_subscribers", "Open job event subscriptions (SSE streams and status long-polls)",
+    subscriber_count))
+
+
+def record_meshy_call(operation: str, status: Optional[int]):
+    MESHY_API_REQUESTS.inc(operation=operation, status=str(status) if status is not None else "error")
+
+
+def stage_summaries() -> Dict[str, Dict[str, float]]:
+    return {key[0]: STAGE_DURATION.summary(stage=key[0]) for key in STAGE_DURATION.label_sets()}
+
+
+def get_pipeline_metrics() -> Dict[str, object]:
+    """JSON summary for GET /api/jobs/metrics/gpu (full data is on /metrics)."""
+    return {
+        "status": "cloud_mode",
+        "provider": "Meshy AI",
+        "active_jobs": active_job_count(),
+        "queue_depth": queued_job_count(),
+        "sse_subscribers": subscriber_count(),
+        "stage_durations_seconds": stage_summaries(),
+        "event_loop_lag_seconds": LOOP_LAG.summary(),
+        "event_loop_blocks": LOOP_BLOCKS.value(),
+    }
@@ -0,0 +1,177 @@
+"""Object storage for job artifacts: local disk or an S3-compatible bucket.
+
+Keys mirror the layout under STORAGE_DIR (``uploads/{job_id}/...``,
+``outputs/{job_id}/...``). The local store is that directory itself, so
+with STORAGE_BACKEND=local nothing is copied and the API serves files as
+before. With STORAGE_BACKEND=s3 local files are a working copy: each asset
+is uploaded (multipart, streamed from disk) when the job's manifest is
+rebuilt, served by redirect to a presigned URL, and fetched back on hosts
+that do not have it. S3_ENDPOINT_URL points at MinIO or moto for local runs.
+All methods block; call them via run_io.
+"""
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional
+
+from app.config import (
+    STORAGE_DIR, STORAGE_BACKEND, S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL, S3_REGION,
+    S3_PRESIGN_EXPIRY, S3_MULTIPART_CHUNK_MB,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def object_key(path) -> str:
+    """Key of a file under STORAGE_DIR (e.g. ``outputs/{job_id}/model.glb``)."""
+    return Path(path).relative_to(STORAGE_DIR).as_posix()
+
+
+class LocalObjectStore:
+    """Objects are files under `root`; nothing to redirect to."""
+
+    redirects = False
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def put_file(self, key: str, path, media_type: Optional[str] = None):
+        target = self._path(key)
+        if target.exists() and os.path.samefile(path, target):
+            return  # working copy is the object
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def fetch(self, key: str, path) -> bool:
+        source = self._path(key)
+        if not source.is_file():
+            return False
+        if Path(path).exists() and os.path.samefile(source, path):
+            return True
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, path)
+        return True
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, keys: Iterable[str]):
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    def delete_prefix(self, prefix: str):
+        shutil.rmtree(self._path(prefix), ignore_errors=True)
+
+    def url(self, key: str, media_type: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+        return None
+
+
+class S3ObjectStore:
+    """S3 protocol via boto3 (AWS, MinIO, moto)."""
+
+    redirects = True
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: str = "us-east-1", presign_expiry: int = 3600, chunk_mb: int = 8):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.presign_expiry = presign_expiry
+        self._client = boto3.client(
+            "s3", endpoint_url=endpoint_url or None, region_name=region,
+            config=Config(signature_version="s3v4", retries={"mode": "standard"}))
+        chunk = chunk_mb * 1024 * 1024
+        self._transfer = TransferConfig(multipart_threshold=chunk, multipart_chunksize=chunk)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def put_file(self, key: str, path, media_type: Optional[str] = None):
+        # Files above the chunk size go up as a parallel multipart upload, read part by part
+        extra = {"ContentType": media_type} if media_type else None
+        self._client.upload_file(str(path), self.bucket, self._key(key), ExtraArgs=extra, Config=self._transfer)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def fetch(self, key: str, path) -> bool:
+        from botocore.exceptions import ClientError
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            self._client.download_file(self.bucket, self._key(key), str(tmp_path), Config=self._transfer)
+        except ClientError as e:
+            tmp_path.unlink(missing_ok=True)
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        os.replace(tmp_path, path)
+        return True
+
+    def open(self, key: str) -> BinaryIO:
+        """Streaming reader of an object (read(n) / close())."""
+        return self._client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+
+    def delete(self, keys: Iterable[str]):
+        keys = [{"Key": self._key(key)} for key in keys]
+        for start in range(0, len(keys), 1000):
+            self._client.delete_objects(Bucket=self.bucket, Delete={"Objects": keys[start:start + 1000], "Quiet": True})
+
+    def delete_prefix(self, prefix: str):
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            keys = [{"Key": item["Key"]} for item in page.get("Contents", ())]
+            if keys:
+                self._client.delete_objects(Bucket=self.bucket, Delete={"Objects": keys, "Quiet": True})
+
+    def url(self, key: str, media_type: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if media_type:
+            params["ResponseContentType"] = media_type
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        return self._client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.presign_expiry)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The configured store (created on first use; boto3 is only imported for s3)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if STORAGE_BACKEND == "s3":
+                    if not S3_BUCKET:
+                        raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+                    _store = S3ObjectStore(S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL, S3_REGION,
+                                           S3_PRESIGN_EXPIRY, S3_MULTIPART_CHUNK_MB)
+                    logger.info(f"Object storage: s3://{S3_BUCKET}/{S3_PREFIX} ({S3_ENDPOINT_URL or 'AWS'})")
+                else:
+                    _store = LocalObjectStore(STORAGE_DIR)
+    return _store
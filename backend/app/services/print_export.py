@@ -0,0 +1,163 @@
+"""Print-ready STL/3MF/OBJ exports of a job's model, converted once and cached.
+
+Files live under ``outputs/{job_id}/prints``, named by the model.glb version
+and the request options, so a repeated request is a plain file response and
+a new model (retexture, variant switch) never serves an old conversion.
+Conversions run in a process pool: trimesh loading, repair and the 3MF/OBJ
+writers are CPU-bound Python that would otherwise hold the GIL against the
+event loop. Concurrent requests for the same file share one conversion.
+Converted files stay on local disk (also with object storage); another host
+converts again on its first request.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from app.config import OUTPUTS_DIR, PRINT_WORKERS, PRINT_MAX_PENDING, PRINT_CACHE_FILES
+from app.services.mesh_convert import convert
+from app.services.metrics import PRINT_EXPORTS, PRINT_CONVERSION
+from app.services.object_store import get_store
+from app.workers.storage_gc import record_job
+from app.workers.task_queue import run_io
+
+logger = logging.getLogger(__name__)
+
+# format -> (media type, download extension); OBJ comes zipped with its material and textures
+FORMATS = {
+    "stl": ("model/stl", "stl"),
+    "3mf": ("model/3mf", "3mf"),
+    "obj": ("application/zip", "zip"),
+}
+AXES = ("max", "x", "y", "z")
+PRINTS_DIR_NAME = "prints"
+
+
+class ConversionQueueFull(Exception):
+    pass
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_inflight: Dict[Path, "asyncio.Task"] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Created on first conversion; spawn keeps forked copies of the server's threads out of the workers
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=PRINT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def print_name(version: str, fmt: str, size_mm: Optional[float], axis: str, fix: bool) -> str:
+    """Cache file name; also the ETag of the download (the content only depends on it)."""
+    scale = f"{size_mm:g}mm-{axis}" if size_mm is not None else "native"
+    return f"{version}-{scale}{'-repaired' if fix else ''}.{fmt}"
+
+
+def _cached_info(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        info = orjson.loads(path.with_name(f"{path.name}.json").read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not path.exists():
+        return None
+    os.utime(path)  # mtime orders the per-job eviction
+    return info
+
+
+def _local_model(entry: Dict[str, Any]) -> str:
+    if entry.get("key") and not Path(entry["path"]).exists():
+        # Uploaded from another host; keep a local copy to convert from
+        get_store().fetch(entry["key"], entry["path"])
+    return entry["path"]
+
+
+def _store_info(path: Path, info: Dict[str, Any], version: str):
+    path.with_name(f"{path.name}.json").write_bytes(orjson.dumps(info))
+    # Drop conversions of older models, then the least recently used beyond PRINT_CACHE_FILES
+    files = []
+    for other in path.parent.iterdir():
+        if other.suffix == ".json" or other.name.startswith("."):
+            continue
+        if not other.name.startswith(f"{version}-"):
+            _remove(other)
+        else:
+            files.append((other.stat().st_mtime, other))
+    files.sort(reverse=True)
+    for _, other in files[PRINT_CACHE_FILES:]:
+        _remove(other)
+
+
+def _remove(path: Path):
+    path.unlink(missing_ok=True)
+    path.with_name(f"{path.name}.json").unlink(missing_ok=True)
+
+
+async def _convert(job_id: str, entry: Dict[str, Any], path: Path, fmt: str,
+                   size_mm: Optional[float], axis: str, fix: bool) -> Dict[str, Any]:
+    glb_path = await run_io(_local_model, entry)
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    pool = _get_pool()
+    try:
+        info = await loop.run_in_executor(pool, convert, glb_path, str(path), fmt, size_mm, axis, fix)
+    except BrokenProcessPool:
+        _reset_pool(pool)  # a worker died (e.g. OOM on a huge mesh); the next request gets a fresh pool
+        raise
+    elapsed = time.perf_counter() - started
+    PRINT_CONVERSION.observe(elapsed, format=fmt)
+    await run_io(_store_info, path, info, entry["version"])
+    await run_io(record_job, job_id)
+    logger.info(f"Converted {job_id} to {path.name} in {elapsed:.2f}s ({info['faces']} faces)")
+    return info
+
+
+async def get_print(job_id: str, entry: Dict[str, Any], fmt: str, size_mm: Optional[float] = None,
+                    axis: str = "max", fix: bool = False) -> Tuple[Path, Dict[str, Any], bool]:
+    """(file, mesh info, cache hit) for model.glb's manifest `entry` in `fmt`.
+
+    Raises ConversionQueueFull when PRINT_MAX_PENDING conversions are already
+    queued, and ValueError for models that cannot be converted.
+    """
+    path = OUTPUTS_DIR / job_id / PRINTS_DIR_NAME / print_name(entry["version"], fmt, size_mm, axis, fix)
+    info = await run_io(_cached_info, path)
+    if info is not None:
+        PRINT_EXPORTS.inc(format=fmt, source="cache")
+        return path, info, True
+
+    task = _inflight.get(path)
+    if task is None:
+        if len(_inflight) >= PRINT_MAX_PENDING:
+            raise ConversionQueueFull()
+        task = asyncio.create_task(_convert(job_id, entry, path, fmt, size_mm, axis, fix))
+        _inflight[path] = task
+        task.add_done_callback(lambda _: _inflight.pop(path, None))
+        PRINT_EXPORTS.inc(format=fmt, source="convert")
+    # A client disconnecting must not cancel a conversion others may be waiting for
+    return path, await asyncio.shield(task), False
+
+
+def shutdown_print_pool():
+    """Stop the converter processes (queued conversions are dropped)."""
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
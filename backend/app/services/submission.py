@@ -0,0 +1,303 @@
+"""Adaptive concurrency control for Meshy task submissions.
+
+Jobs wait in a local queue (their status stays "queued") and are dispatched
+while fewer than `limit` generations are in flight upstream. The limit
+follows AIMD: it starts in slow start (+1 per accepted submission) until the
+first congestion signal, then grows by 1/limit per accepted submission. It is
+multiplied by 0.7 on a 429, on a create call slower than the latency target,
+or when the recent 5xx/network error rate passes _ERROR_RATE_THRESHOLD
+(isolated errors alone do not shrink it).
+
+- 429: dispatch pauses for Retry-After (without one, a jittered backoff that
+  doubles with each 429 since the last accepted submission) and the job
+  keeps its queue position;
+  throttling never fails a job (JOB_QUEUE_DEADLINE still bounds the wait).
+  After the pause a single probe request goes out; the rest follow once it
+  is accepted, so the queue does not stampede back into the rate limit.
+- 5xx / network errors: retried with full-jitter exponential backoff while
+  the job has attempts left and the retry budget has tokens, then failed.
+- Other errors fail the job immediately.
+"""
+import asyncio
+import heapq
+import logging
+import random
+import time
+from collections import deque
+from itertools import count
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.config import (
+    MESHY_INITIAL_IN_FLIGHT, MESHY_MAX_IN_FLIGHT, MESHY_SUBMIT_LATENCY_TARGET, MESHY_SUBMIT_MAX_ATTEMPTS,
+    MESHY_RETRY_BUDGET_RATIO, MESHY_RETRY_BUDGET_MIN, MESHY_RETRY_BUDGET_WINDOW, MESHY_RETRY_BACKOFF_BASE, MESHY_RETRY_BACKOFF_MAX,
+)
+from app.services.metrics import SUBMISSION_RETRIES, SUBMISSION_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Re-check the window this often even without a wakeup (in-flight count is derived)
+_IDLE_RECHECK = 1.0
+# Decay of the 5xx/network error rate (EWMA over create calls) and the rate
+# above which it counts as congestion
+_ERROR_RATE_ALPHA = 0.1
+_ERROR_RATE_THRESHOLD = 0.3
+
+
+class SubmitOutcome(NamedTuple):
+    status: Optional[int]               # HTTP status; None for network errors
+    retry_after: Optional[float] = None
+    error: str = ""
+
+    @property
+    def accepted(self) -> bool:
+        return self.status is not None and 200 <= self.status < 300
+
+    @property
+    def throttled(self) -> bool:
+        return self.status == 429
+
+    @property
+    def transient(self) -> bool:
+        return self.status is None or self.status == 408 or self.status >= 500
+
+
+class AIMDLimit:
+    """Additive-increase / multiplicative-decrease concurrency limit."""
+
+    def __init__(self, initial: float, min_limit: float = 1, max_limit: float = MESHY_MAX_IN_FLIGHT,
+                 backoff: float = 0.7, cooldown: float = 2.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        # One decrease per congestion event, not one per request that saw it
+        self.cooldown = cooldown
+        self._last_decrease = float("-inf")
+        self.slow_start = True
+
+    def increase(self):
+        step = 1 if self.slow_start else 1 / self.limit
+        self.limit = min(self.max_limit, self.limit + step)
+
+    def decrease(self, now: float):
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.slow_start = False
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    @property
+    def window(self) -> int:
+        return max(1, int(self.limit))
+
+
+class RetryBudget:
+    """Retries in the last `window` seconds may number `ratio` x successes in that window plus `reserve`."""
+
+    def __init__(self, ratio: float = MESHY_RETRY_BUDGET_RATIO, reserve: float = MESHY_RETRY_BUDGET_MIN,
+                 window: float = MESHY_RETRY_BUDGET_WINDOW, clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.window = window
+        self.clock = clock
+        self._successes: deque = deque()
+        self._retries: deque = deque()
+
+    def _expire(self, now: float):
+        cutoff = now - self.window
+        for events in (self._successes, self._retries):
+            while events and events[0] <= cutoff:
+                events.popleft()
+
+    @property
+    def tokens(self) -> float:
+        self._expire(self.clock())
+        return self.reserve + self.ratio * len(self._successes) - len(self._retries)
+
+    def deposit(self):
+        now = self.clock()
+        self._expire(now)
+        self._successes.append(now)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self._retries.append(self.clock())
+        return True
+
+
+class SubmissionController:
+    """Local submission queue drained at the adaptive upstream concurrency.
+
+    `submit(job_id)` performs one create call and returns a SubmitOutcome, or
+    None when the job is no longer queued. `fail(job_id, error)` marks a job
+    failed. `in_flight()` counts generations accepted upstream and not yet
+    finished; create calls in progress are added on top.
+    """
+
+    def __init__(self,
+                 submit: Callable[[str], Awaitable[Optional[SubmitOutcome]]],
+                 fail: Callable[[str, str], None],
+                 in_flight: Callable[[], int],
+                 limit: Optional[AIMDLimit] = None,
+                 budget: Optional[RetryBudget] = None,
+                 latency_target: float = MESHY_SUBMIT_LATENCY_TARGET,
+                 max_attempts: int = MESHY_SUBMIT_MAX_ATTEMPTS,
+                 clock: Callable[[], float] = time.monotonic):
+        self._submit = submit
+        self._fail = fail
+        self._in_flight = in_flight
+        self.limit = limit or AIMDLimit(MESHY_INITIAL_IN_FLIGHT)
+        self.budget = budget or RetryBudget(clock=clock)
+        self.latency_target = latency_target
+        self.max_attempts = max_attempts
+        self.clock = clock
+        # (ready_at, seq, job_id); entries of discarded jobs are skipped lazily
+        self._queue: List[Tuple[float, int, str]] = []
+        self._queued: Dict[str, Tuple[float, int]] = {}
+        self._seq = count()
+        self._attempts: Dict[str, int] = {}
+        self._creating = 0
+        self._tasks: set = set()
+        self._paused_until = 0.0
+        # 429s since the last accepted submission (backoff when Retry-After is missing)
+        self._throttles = 0
+        self.error_rate = 0.0
+        self._probing = False
+        self._wakeup = asyncio.Event()
+
+    def enqueue(self, job_id: str):
+        if job_id in self._queued:
+            return
+        self._push(job_id, self.clock(), next(self._seq))
+
+    def is_queued(self, job_id: str) -> bool:
+        """Whether the job waits in the local queue (a create call in progress is not queued)."""
+        return job_id in self._queued
+
+    def discard(self, job_id: str):
+        self._queued.pop(job_id, None)
+        self._attempts.pop(job_id, None)
+
+    def notify(self):
+        """Wake the dispatcher (e.g. a generation finished and freed a slot)."""
+        self._wakeup.set()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queued)
+
+    def queue_ranks(self) -> Dict[str, int]:
+        """Dispatch order of the queued jobs (0 = next)."""
+        return {job_id: rank for rank, job_id in enumerate(sorted(self._queued, key=self._queued.__getitem__))}
+
+    @property
+    def in_flight(self) -> int:
+        return self._creating + self._in_flight()
+
+    def _push(self, job_id: str, ready_at: float, seq: int):
+        self._queued[job_id] = (ready_at, seq)
+        heapq.heappush(self._queue, (ready_at, seq, job_id))
+        self._wakeup.set()
+
+    def _head(self) -> Optional[Tuple[float, int, str]]:
+        while self._queue:
+            ready_at, seq, job_id = self._queue[0]
+            if self._queued.get(job_id) == (ready_at, seq):
+                return self._queue[0]
+            heapq.heappop(self._queue)
+        return None
+
+    def _next_delay(self) -> Optional[float]:
+        """Seconds until the head job may be dispatched (None: queue empty)."""
+        head = self._head()
+        if head is None:
+            return None
+        if self.in_flight >= self.limit.window or (self._probing and self._creating):
+            return _IDLE_RECHECK
+        return max(head[0], self._paused_until) - self.clock()
+
+    async def run(self):
+        """Dispatcher loop; run as a background task."""
+        while True:
+            delay = self._next_delay()
+            if delay is None or delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            ready_at, seq, job_id = heapq.heappop(self._queue)
+            self._queued.pop(job_id, None)
+            self._creating += 1
+            task = asyncio.create_task(self._attempt(job_id, ready_at, seq))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _attempt(self, job_id: str, ready_at: float, seq: int):
+        started = self.clock()
+        try:
+            outcome = await self._submit(job_id)
+        except Exception as e:
+            outcome = SubmitOutcome(0, error=str(e))  # not an HTTP error: permanent
+        finally:
+            self._creating -= 1
+            self._wakeup.set()
+        now = self.clock()
+
+        if outcome is None:
+            self._attempts.pop(job_id, None)
+            return
+        if outcome.status:
+            SUBMISSION_LATENCY.observe(now - started)
+        if not outcome.throttled:
+            self.error_rate += _ERROR_RATE_ALPHA * (outcome.transient - self.error_rate)
+
+        if outcome.accepted:
+            self._probing = False
+            self._throttles = 0
+            self._attempts.pop(job_id, None)
+            self.budget.deposit()
+            if now - started > self.latency_target:
+                self.limit.decrease(now)
+            else:
+                self.limit.increase()
+            return
+
+        if outcome.throttled:
+            self.limit.decrease(now)
+            self._throttles += 1
+            pause = outcome.retry_after
+            if pause is None:
+                pause = self._backoff(self._throttles)
+            self._paused_until = max(self._paused_until, now + pause)
+            self._probing = True
+            SUBMISSION_RETRIES.inc(reason="throttled")
+            logger.info(f"Meshy throttled submission of {job_id}; pausing {pause:.1f}s "
+                        f"(window {self.limit.window})")
+            # Keep the job's place in line; the pause applies to everyone
+            self._push(job_id, ready_at, seq)
+            return
+
+        if outcome.transient:
+            if self.error_rate > _ERROR_RATE_THRESHOLD:
+                self.limit.decrease(now)
+            attempts = self._attempts.get(job_id, 0) + 1
+            if attempts < self.max_attempts and self.budget.withdraw():
+                self._attempts[job_id] = attempts
+                delay = self._backoff(attempts)
+                SUBMISSION_RETRIES.inc(reason="transient")
+                logger.warning(f"Submission of {job_id} failed ({outcome.error}); "
+                               f"retry {attempts}/{self.max_attempts - 1} in {delay:.1f}s")
+                self._push(job_id, now + delay, seq)
+                return
+            SUBMISSION_RETRIES.inc(reason="exhausted")
+
+        self._attempts.pop(job_id, None)
+        self._fail(job_id, outcome.error)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Full jitter: uniform(0, min(max, base * 2**attempt))."""
+        return random.uniform(0, min(MESHY_RETRY_BACKOFF_MAX, MESHY_RETRY_BACKOFF_BASE * 2 ** attempt))
@@ -0,0 +1,103 @@
+"""Per-job stage timeline spans, with an opt-in cProfile hook for slow stages.
+
+Each span is persisted on the job (``timeline``) and also feeds the stage
+latency histogram (and, for Meshy stages, the ETA estimator), so call sites
+record a stage once for all of them.
+"""
+import cProfile
+import io
+import logging
+import pstats
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import OUTPUTS_DIR, PROFILE_STAGES, PROFILE_SAMPLE_RATE, PROFILE_SLOW_SECONDS
+from app.services import eta
+from app.services.metrics import STAGE_DURATION
+from app.workers.task_queue import append_job_spans
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR_NAME = "profiles"
+
+
+def make_span(stage: str, started_at: float, ended_at: float, **attrs: Any) -> Dict[str, Any]:
+    """Build a span (epoch seconds) and observe its duration in the stage histogram."""
+    duration = max(0.0, ended_at - started_at)
+    STAGE_DURATION.observe(duration, stage=stage)
+    span = {
+        "stage": stage,
+        "start": round(started_at, 3),
+        "end": round(ended_at, 3),
+        "duration": round(duration, 3),
+    }
+    span.update({k: v for k, v in attrs.items() if v is not None})
+    return span
+
+
+def record_span(job_id: str, stage: str, started_at: float, ended_at: Optional[float] = None, **attrs: Any):
+    """Record a finished stage directly on the job's timeline."""
+    span = make_span(stage, started_at, ended_at if ended_at is not None else time.time(), **attrs)
+    append_job_spans(job_id, [span])
+    if "error" not in span:
+        eta.record(job_id, stage, span["duration"])
+    return span
+
+
+def _should_profile(stage: str) -> bool:
+    return stage in PROFILE_STAGES and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _dump_profile(job_id: str, stage: str, profiler: cProfile.Profile, started_at: float) -> Optional[str]:
+    try:
+        out_dir = OUTPUTS_DIR / job_id / PROFILE_DIR_NAME
+        out_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{stage}_{int(started_at * 1000)}.txt"
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(40)
+        (out_dir / name).write_text(buf.getvalue())
+        return name
+    except Exception as e:
+        logger.warning(f"Failed to write {stage} profile for {job_id}: {e}")
+        return None
+
+
+def call_traced(spans: List[Dict[str, Any]], job_id: str, stage: str,
+                fn: Callable[..., Any], *args: Any, **attrs: Any) -> Any:
+    """Run fn(*args) as a span appended to `spans` (also on failure).
+
+    Meant to run inside the worker thread doing the CPU work, so that the
+    optional profiler only sees this stage. The caller attaches `spans` to
+    the job with append_job_spans (upload buffers them until the job exists).
+    """
+    profiler = cProfile.Profile() if _should_profile(stage) else None
+    started_at = time.time()
+    error = None
+    if profiler:
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one active profiler (e.g. another concurrent stage)
+            logger.debug(f"Not profiling {stage} for {job_id}: {e}")
+            profiler = None
+    try:
+        return fn(*args)
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+        ended_at = time.time()
+        profile = None
+        if profiler and ended_at - started_at >= PROFILE_SLOW_SECONDS:
+            profile = _dump_profile(job_id, stage, profiler, started_at)
+        spans.append(make_span(stage, started_at, ended_at, error=error, profile=profile, **attrs))
+
+
+def read_profile(job_id: str, name: str) -> Optional[str]:
+    path = OUTPUTS_DIR / job_id / PROFILE_DIR_NAME / name
+    if path.parent.name != PROFILE_DIR_NAME or not path.is_file():
+        return None
+    return path.read_text()
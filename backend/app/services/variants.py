@@ -0,0 +1,267 @@
+"""Per-job store of texture variants of a generated model.
+
+Layout under ``outputs/{job_id}/variants``::
+
+    blobs/{sha256}.glb   content-addressed GLBs (written once, never modified)
+    index.json           {"base": id, "active": id, "variants": {id: {...}}}
+
+``model.glb`` is a hardlink to the active variant's blob, so switching
+variants is a single rename and no variant is ever copied. The base variant
+is the generated model; each retexture request is keyed by the base blob's
+hash plus its texturing parameters, so an identical request is served from
+the store instead of Meshy. All functions block (hashing, file IO); call
+them via run_io.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.config import OUTPUTS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Request parameters that change the texture Meshy produces (with the API defaults)
+KEY_FIELDS = {
+    "object_prompt": "",
+    "style_prompt": "",
+    "negative_prompt": "",
+    "art_style": "realistic",
+    "resolution": 2048,
+    "ai_model": "meshy-6-preview",
+    "enable_pbr": True,
+}
+
+_LOCKS = tuple(threading.Lock() for _ in range(16))
+
+
+def _lock(job_id: str) -> threading.Lock:
+    return _LOCKS[hash(job_id) % len(_LOCKS)]
+
+
+def _store_dir(job_id: str) -> Path:
+    return OUTPUTS_DIR / job_id / "variants"
+
+
+def _blob_path(job_id: str, digest: str) -> Path:
+    return _store_dir(job_id) / "blobs" / f"{digest}.glb"
+
+
+def _load_index(job_id: str) -> Dict[str, Any]:
+    try:
+        return orjson.loads((_store_dir(job_id) / "index.json").read_bytes())
+    except FileNotFoundError:
+        return {"base": None, "active": None, "variants": {}}
+
+
+def _save_index(job_id: str, index: Dict[str, Any]):
+    path = _store_dir(job_id) / "index.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(orjson.dumps(index, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, path)
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link(src: Path, dst: Path):
+    """Atomically point `dst` at `src`'s inode (copy on filesystems without hardlinks)."""
+    try:
+        if os.path.samefile(src, dst):
+            return  # rename() between two links of one inode would be a no-op
+    except FileNotFoundError:
+        pass
+    tmp_path = dst.with_name(f".{dst.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def _is_blob(path: Path, blob: Path, digest: str) -> bool:
+    """Whether `path` holds `blob`: the same inode, or (where _link had to copy) the same bytes."""
+    try:
+        if os.path.samefile(path, blob):
+            return True
+        if path.stat().st_size != blob.stat().st_size:
+            return False
+    except OSError:
+        return False
+    return _hash_file(path) == digest
+
+
+def _adopt(job_id: str, path: Path) -> str:
+    """Move an existing model file into the blob store (by hardlink). Returns its digest."""
+    digest = _hash_file(path)
+    blob = _blob_path(job_id, digest)
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        _link(path, blob)
+    return digest
+
+
+def _add(index: Dict[str, Any], kind: str, digest: str, key: Optional[dict] = None) -> str:
+    variant_id = f"{kind}-{digest[:16]}"
+    index["variants"].setdefault(variant_id, {
+        "blob": digest, "key": key, "created_at": datetime.now().isoformat()})
+    return variant_id
+
+
+def _sync_base(job_id: str) -> Dict[str, Any]:
+    """Load the index, registering model.glb when it is not the active blob.
+
+    That happens on a job's first retexture, after a regeneration (the new
+    model becomes the base) and for jobs retextured before the store existed
+    (model_original.glb becomes the base). Must hold the job's lock.
+    """
+    index = _load_index(job_id)
+    model = OUTPUTS_DIR / job_id / "model.glb"
+    active = index["variants"].get(index["active"] or "")
+    if not model.exists():
+        return index
+    if active and active.get("blob") and _is_blob(model, _blob_path(job_id, active["blob"]), active["blob"]):
+        return index
+
+    legacy_original = model.parent / "model_original.glb"
+    digest = _adopt(job_id, model)
+    if legacy_original.exists():
+        base_digest = _adopt(job_id, legacy_original)
+        index["base"] = _add(index, "base", base_digest)
+        index["active"] = index["base"] if digest == base_digest else _add(index, "legacy", digest)
+        legacy_original.unlink()
+    else:
+        index["base"] = index["active"] = _add(index, "base", digest)
+    # Same inode as the blob from now on (a no-op unless the blob already existed)
+    _link(_blob_path(job_id, digest), model)
+    _save_index(job_id, index)
+    return index
+
+
+def variant_key(index: Dict[str, Any], settings: Dict[str, Any]) -> Tuple[str, dict]:
+    """(variant id, key) of a retexture request against the current base model."""
+    key = {name: settings.get(name) if settings.get(name) is not None else default
+           for name, default in KEY_FIELDS.items()}
+    key["base"] = index["variants"][index["base"]]["blob"]
+    digest = hashlib.sha256(orjson.dumps(key, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return f"tex-{digest[:16]}", key
+
+
+def lookup(job_id: str, settings: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    """Variant id for a retexture request and whether it is already stored.
+
+    Returns (None, False) when the job has no model yet.
+    """
+    with _lock(job_id):
+        index = _sync_base(job_id)
+        if index["base"] is None:
+            return None, False
+        variant_id, key = variant_key(index, settings)
+        variant = index["variants"].get(variant_id)
+        if variant and variant.get("blob") and _blob_path(job_id, variant["blob"]).exists():
+            return variant_id, True
+        # Remember the key so the download can be filed under it (also across restarts)
+        index["variants"][variant_id] = {"blob": None, "key": key, "created_at": datetime.now().isoformat()}
+        _save_index(job_id, index)
+        return variant_id, False
+
+
+def base_model_path(job_id: str) -> Optional[Path]:
+    """The generated (untextured-by-us) model that retexture requests start from."""
+    with _lock(job_id):
+        index = _sync_base(job_id)
+        if index["base"] is None:
+            return None
+        return _blob_path(job_id, index["variants"][index["base"]]["blob"])
+
+
+def store(job_id: str, variant_id: str, content: bytes):
+    """File a downloaded retexture under `variant_id` (activate() makes it the model)."""
+    digest = hashlib.sha256(content).hexdigest()
+    blob = _blob_path(job_id, digest)
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = blob.with_name(f".{blob.name}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, blob)
+    with _lock(job_id):
+        index = _sync_base(job_id)
+        variant = index["variants"].setdefault(variant_id, {"key": None, "created_at": datetime.now().isoformat()})
+        variant["blob"] = digest
+        _save_index(job_id, index)
+
+
+def discard(job_id: str, variant_id: str):
+    """Forget a stored variant (e.g. its retexture was cancelled) and its blob unless shared.
+
+    The base and the active variant are kept.
+    """
+    with _lock(job_id):
+        index = _sync_base(job_id)
+        if variant_id in (index["base"], index["active"]):
+            return
+        variant = index["variants"].pop(variant_id, None)
+        if variant is None:
+            return
+        _save_index(job_id, index)
+        digest = variant.get("blob")
+        if digest and all(other.get("blob") != digest for other in index["variants"].values()):
+            _blob_path(job_id, digest).unlink(missing_ok=True)
+
+
+def active_variant(job_id: str) -> Optional[str]:
+    """Id of the variant model.glb currently points at."""
+    with _lock(job_id):
+        return _sync_base(job_id)["active"]
+
+
+def _activate(job_id: str, index: Dict[str, Any], variant_id: str) -> Path:
+    model = OUTPUTS_DIR / job_id / "model.glb"
+    _link(_blob_path(job_id, index["variants"][variant_id]["blob"]), model)
+    index["active"] = variant_id
+    _save_index(job_id, index)
+    return model
+
+
+def activate(job_id: str, variant_id: str) -> Optional[Path]:
+    """Make a stored variant the job's model.glb (one rename). None if unknown."""
+    with _lock(job_id):
+        index = _sync_base(job_id)
+        variant = index["variants"].get(variant_id)
+        if not variant or not variant.get("blob") or not _blob_path(job_id, variant["blob"]).exists():
+            return None
+        return _activate(job_id, index, variant_id)
+
+
+def list_variants(job_id: str) -> List[Dict[str, Any]]:
+    """Stored variants of a job (base first, then by creation time)."""
+    with _lock(job_id):
+        index = _sync_base(job_id)
+    result = []
+    for variant_id, variant in index["variants"].items():
+        blob = _blob_path(job_id, variant["blob"]) if variant.get("blob") else None
+        if blob is None or not blob.exists():
+            continue  # requested but never downloaded
+        result.append({
+            "variant_id": variant_id,
+            "base": variant_id == index["base"],
+            "active": variant_id == index["active"],
+            "key": variant.get("key"),
+            "size": blob.stat().st_size,
+            "created_at": variant.get("created_at"),
+        })
+    result.sort(key=lambda v: (not v["base"], v["created_at"] or ""))
+    return result
@@ -0,0 +1,114 @@
+"""Batches of jobs submitted together through POST /api/batches.
+
+A batch record is small (id, tenant, creation time, job ids in item order)
+and is kept in memory and in ``STORAGE_DIR/batches/{batch_id}.json``. Job
+state stays on the jobs themselves: each carries its ``batch_id``, and
+update_job republishes its events on the batch channel, so progress is
+aggregated from job snapshots and one SSE stream follows a whole batch.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app.config import STORAGE_DIR
+from app.workers.task_queue import get_job
+
+logger = logging.getLogger(__name__)
+
+_BATCHES_DIR = STORAGE_DIR / "batches"
+TERMINAL_STATUSES = frozenset(("completed", "failed"))
+
+# Recently used batch records; older ones are read back from disk
+_MAX_CACHED = 1000
+_batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache(record: Dict[str, Any]):
+    with _lock:
+        _batches[record["batch_id"]] = record
+        _batches.move_to_end(record["batch_id"])
+        while len(_batches) > _MAX_CACHED:
+            _batches.popitem(last=False)
+
+
+def create_batch(batch_id: str, job_ids: List[str], tenant: Optional[str] = None) -> Dict[str, Any]:
+    record = {
+        "batch_id": batch_id,
+        "tenant": tenant,
+        "created_at": datetime.now().isoformat(),
+        "job_ids": list(job_ids),
+    }
+    _cache(record)
+    return record
+
+
+def save_batch(record: Dict[str, Any]):
+    """Persist a batch record (blocking; call via run_io)."""
+    path = _BATCHES_DIR / f"{record['batch_id']}.json"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(orjson.dumps(record))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to save batch {record['batch_id']}: {e}")
+
+
+def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    """Batch record from memory, else from disk (blocking on a miss)."""
+    with _lock:
+        record = _batches.get(batch_id)
+    if record is not None:
+        return record
+    try:
+        record = orjson.loads((_BATCHES_DIR / f"{batch_id}.json").read_bytes())
+    except (OSError, ValueError):
+        return None
+    _cache(record)
+    return record
+
+
+def job_progress(job) -> Dict[str, Any]:
+    """Per-job entry of a batch summary ("deleted" when the job is gone); eta_seconds is filled in by the caller."""
+    if job is None:
+        return {"status": "deleted", "stage": None, "progress": 100, "eta_seconds": None}
+    return {"status": job.get("status"), "stage": job.get("stage"), "progress": job.get("progress", 0),
+            "eta_seconds": None}
+
+
+def aggregate(states: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Counts per status, overall progress (finished jobs count as 100), whether all are finished
+    and the ETA of the last job to finish."""
+    counts: Dict[str, int] = {}
+    total_progress = 0
+    finished = 0
+    eta_seconds = None
+    for state in states.values():
+        if state.get("eta_seconds") is not None:
+            eta_seconds = max(eta_seconds or 0, state["eta_seconds"])
+        status = state["status"]
+        counts[status] = counts.get(status, 0) + 1
+        if status in TERMINAL_STATUSES or status == "deleted":
+            finished += 1
+            total_progress += 100
+        else:
+            total_progress += state["progress"] or 0
+    total = len(states)
+    return {
+        "total": total,
+        "counts": counts,
+        "progress": round(total_progress / total) if total else 100,
+        "finished": finished == total,
+        "eta_seconds": eta_seconds,
+    }
+
+
+def batch_states(record: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """job_id -> job_progress for every job of the batch, in item order."""
+    return {job_id: job_progress(get_job(job_id)) for job_id in record["job_ids"]}
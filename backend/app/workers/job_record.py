@@ -0,0 +1,177 @@
+"""Typed, immutable job records with a versioned on-disk schema."""
+import sys
+import logging
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Bump when fields are renamed/re-shaped and register a migration below
+SCHEMA_VERSION = 1
+
+# Every field a job may carry. Adding a key here is the only way to add job state;
+# unknown keys are kept in `extra` but logged, so schema drift is visible.
+FIELDS = (
+    "job_id",
+    "status",
+    "progress",
+    "stage",
+    "error",
+    "created_at",
+    "settings",
+    "image_path",
+    "processed_image_path",
+    "all_image_paths",
+    "meshy_task_id",
+    "meshy_endpoint_type",
+    "multi_angle_paths",
+    "model_path",
+    "asset_manifest",
+    "retexture_task_id",
+    "retexture_status",
+    "retexture_progress",
+    "retexture_error",
+    "retexture_variant",
+    "timeline",
+    "stuck_retries",
+    "views_pending",
+    "preview_task_id",
+    "preview_status",
+    "tenant",
+    "batch_id",
+    "version",
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# Low-cardinality strings repeated across every job
+_INTERNED = frozenset(("status", "stage", "meshy_endpoint_type"))
+
+_MUTABLE = (dict, list)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists to read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) if isinstance(v, _MUTABLE) else v for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple([freeze(v) if isinstance(v, _MUTABLE) else v for v in value])
+    return value
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+# --- Migrations: version -> fn(dict) -> dict (upgrades to version + 1) ---
+
+_MIGRATIONS: Dict[int, Callable[[dict], dict]] = {}
+
+
+def migration(from_version: int):
+    """Register a migration that upgrades raw job data from `from_version`."""
+    def decorator(fn: Callable[[dict], dict]) -> Callable[[dict], dict]:
+        _MIGRATIONS[from_version] = fn
+        return fn
+    return decorator
+
+
+@migration(0)
+def _migrate_v0(data: dict) -> dict:
+    # Untyped job_state.json written before records existed
+    if not data.get("all_image_paths") and data.get("image_path"):
+        data["all_image_paths"] = [data["image_path"]]
+    if data.get("meshy_task_id") and not data.get("meshy_endpoint_type"):
+        data["meshy_endpoint_type"] = "image-to-3d"
+    return data
+
+
+def migrate(data: dict) -> dict:
+    version = data.pop("schema_version", 0)
+    while version < SCHEMA_VERSION:
+        upgrade = _MIGRATIONS.get(version)
+        if upgrade is None:
+            raise ValueError(f"No job schema migration from version {version}")
+        data = upgrade(data)
+        version += 1
+    return data
+
+
+class JobRecord(Mapping):
+    """Immutable job snapshot.
+
+    Behaves as a read-only mapping (``job.get("status")``) so callers treat it
+    like the old job dict. Fields set to None count as absent, which keeps the
+    serialized form compact. Use ``replace(**changes)`` to derive a new version.
+    """
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, extra: Optional[Mapping[str, Any]] = None, **values: Any):
+        pop = values.pop
+        set_slot = object.__setattr__
+        for name in FIELDS:
+            value = pop(name, None)
+            if isinstance(value, _MUTABLE):
+                value = freeze(value)
+            elif name in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            set_slot(self, name, value)
+        if values:
+            logger.warning(f"Unknown job field(s) {sorted(values)} for job {self.job_id}")
+            extra = {**(extra or {}), **values}
+        object.__setattr__(self, "_extra", freeze(dict(extra)) if extra else None)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("JobRecord is immutable; use replace()")
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "JobRecord":
+        return cls(**migrate(dict(data)))
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "JobRecord":
+        return cls.from_dict(orjson.loads(raw))
+
+    def replace(self, **changes: Any) -> "JobRecord":
+        values = {name: getattr(self, name) for name in FIELDS}
+        values.update(changes)
+        return JobRecord(extra=self._extra, **values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"schema_version": SCHEMA_VERSION}
+        data.update(self.items())
+        return data
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(self.to_dict(), default=_orjson_default)
+
+    # --- Mapping interface ---
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+        elif self._extra is not None:
+            value = self._extra.get(key)
+        else:
+            value = None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for name in FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        if self._extra is not None:
+            yield from (k for k, v in self._extra.items() if v is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"JobRecord({dict(self.items())!r})"
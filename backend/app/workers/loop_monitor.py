@@ -0,0 +1,61 @@
+"""Event loop lag probe: how late the loop wakes a sleeping task.
+
+A watchdog thread watches the probe's heartbeat; when the loop stalls for
+longer than LOOP_BLOCK_THRESHOLD it logs the loop thread's current stack,
+which names the callback that is blocking it.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.config import LOOP_LAG_INTERVAL, LOOP_BLOCK_THRESHOLD
+from app.services.metrics import LOOP_LAG, LOOP_BLOCKS
+
+logger = logging.getLogger(__name__)
+
+
+class _Watchdog(threading.Thread):
+    def __init__(self, loop_thread_id: int, interval: float, threshold: float):
+        super().__init__(name="protoscale-loop-watchdog", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.threshold = threshold
+        self.heartbeat = time.monotonic()
+        self.stopped = threading.Event()
+
+    def run(self):
+        reported_beat = None
+        while not self.stopped.wait(self.threshold / 2):
+            beat = self.heartbeat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            # One report per stall, taken while the loop is still blocked
+            reported_beat = beat
+            LOOP_BLOCKS.inc()
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>"
+            logger.warning(f"Event loop blocked for {stalled:.2f}s+, loop thread stack:\n{stack}")
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL, threshold: Optional[float] = LOOP_BLOCK_THRESHOLD):
+    """Sleep `interval` repeatedly and record the overshoot as loop lag."""
+    watchdog = None
+    if threshold:
+        watchdog = _Watchdog(threading.get_ident(), interval, threshold)
+        watchdog.start()
+    try:
+        while True:
+            started = time.perf_counter()
+            if watchdog:
+                watchdog.heartbeat = time.monotonic()
+            await asyncio.sleep(interval)
+            lag = time.perf_counter() - started - interval
+            LOOP_LAG.observe(max(lag, 0.0))
+    finally:
+        if watchdog:
+            watchdog.stopped.set()
@@ -0,0 +1,182 @@
+"""Low-priority background rendering of the four local preview views.
+
+Jobs are marked completed as soon as their GLB is stored (with Meshy's
+preview image as the immediate model thumbnail); the matplotlib views are
+rendered here afterwards, one job at a time on a niced thread, and the job
+publishes an ``assets_updated`` event when they are ready.
+
+The same queue repackages model.glb as split-asset glTF (gltf_split) before
+rendering, and on its own whenever model.glb changes (retexture, variant).
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import OUTPUTS_DIR, RENDER_WORKERS, RENDER_NICE
+from app.services.assets import build_asset_manifest, SPLIT_DIR_NAME
+from app.services.gltf_split import split_glb
+from app.services.mesh_renderer import render_views_from_glb
+from app.services.metrics import REGISTRY, Gauge
+from app.services.tracing import call_traced
+from app.workers.task_queue import get_job, update_job, append_job_spans
+
+logger = logging.getLogger(__name__)
+
+
+def _lower_priority():
+    # Linux applies setpriority to a single thread when given its native id
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), RENDER_NICE)
+    except (AttributeError, OSError) as e:
+        logger.debug(f"Could not lower render thread priority: {e}")
+
+
+_render_executor = ThreadPoolExecutor(
+    max_workers=RENDER_WORKERS, thread_name_prefix="protoscale-render", initializer=_lower_priority)
+_scheduled: set[str] = set()
+_repackage_scheduled: set[str] = set()
+_scheduled_lock = threading.Lock()
+_SPLIT_LOCKS = tuple(threading.Lock() for _ in range(16))
+
+
+def _remove_path(path):
+    if path.is_symlink():
+        path.unlink(missing_ok=True)
+    else:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _split_model(glb_path) -> int:
+    """Rebuild <job>/gltf next to glb_path so readers never see a partial or missing set.
+
+    Each build is written to its own .gltf.<id> directory and ``gltf`` is a
+    symlink to the live one, replaced atomically. Builds other than the live
+    one (including leftovers of a crashed build) are removed afterwards.
+    """
+    parent = glb_path.parent
+    final_dir = parent / SPLIT_DIR_NAME
+    # One split per job at a time: the cleanup below would remove a concurrent build
+    with _SPLIT_LOCKS[hash(parent.name) % len(_SPLIT_LOCKS)]:
+        build_dir = parent / f".{SPLIT_DIR_NAME}.{time.time_ns():x}"
+        try:
+            names = split_glb(glb_path, build_dir)
+        except Exception:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+        if names is None:
+            # No longer splittable (e.g. a Draco retexture): the GLB is the only form
+            _remove_path(final_dir)
+        else:
+            link_path = parent / f".{SPLIT_DIR_NAME}.link"
+            link_path.unlink(missing_ok=True)
+            os.symlink(build_dir.name, link_path)
+            if final_dir.is_dir() and not final_dir.is_symlink():
+                shutil.rmtree(final_dir)  # plain directory written before builds were versioned
+            os.replace(link_path, final_dir)
+        for path in parent.glob(f".{SPLIT_DIR_NAME}.*"):
+            if names is None or path.name != build_dir.name:
+                _remove_path(path)
+        return len(names or ())
+
+
+def _repackage(job_id: str, spans: list) -> bool:
+    glb_path = OUTPUTS_DIR / job_id / "model.glb"
+    if not glb_path.exists():
+        return False
+    try:
+        files = call_traced(spans, job_id, "repackage", _split_model, glb_path)
+        logger.info(f"Repackaged {job_id} as split glTF ({files} file(s))")
+        return True
+    except Exception as e:
+        logger.error(f"glTF repackaging failed for {job_id}: {e}")
+        return False
+
+
+def _repackage_job(job_id: str):
+    try:
+        if not get_job(job_id):
+            return
+        spans = []
+        _repackage(job_id, spans)
+        append_job_spans(job_id, spans)
+        update_job(job_id, event_type="assets_updated", asset_manifest=build_asset_manifest(job_id))
+    finally:
+        with _scheduled_lock:
+            _repackage_scheduled.discard(job_id)
+
+
+def _render_job(job_id: str):
+    try:
+        job = get_job(job_id)
+        glb_path = OUTPUTS_DIR / job_id / "model.glb"
+        if not job or not glb_path.exists():
+            return  # deleted while waiting
+        spans = []
+        views = []
+        # Split glTF first: it is quick and lets viewers start on the geometry
+        if _repackage(job_id, spans):
+            update_job(job_id, asset_manifest=build_asset_manifest(job_id))
+        try:
+            views = call_traced(spans, job_id, "render", render_views_from_glb, str(glb_path), str(glb_path.parent))
+        except Exception as e:
+            logger.error(f"Background render failed for {job_id}: {e}")
+        append_job_spans(job_id, spans)
+        update_job(
+            job_id,
+            event_type="assets_updated",
+            multi_angle_paths=views,
+            asset_manifest=build_asset_manifest(job_id),
+            views_pending=False,
+        )
+        logger.info(f"Rendered {len(views)} view(s) for {job_id}")
+    finally:
+        with _scheduled_lock:
+            _scheduled.discard(job_id)
+
+
+def schedule_view_render(job_id: str) -> bool:
+    """Queue a view render for a completed job; False if one is already queued."""
+    with _scheduled_lock:
+        if job_id in _scheduled:
+            return False
+        _scheduled.add(job_id)
+    try:
+        _render_executor.submit(_render_job, job_id)
+    except RuntimeError:
+        # Shutting down; views_pending stays set and is picked up next time
+        with _scheduled_lock:
+            _scheduled.discard(job_id)
+        return False
+    return True
+
+
+def schedule_repackage(job_id: str) -> bool:
+    """Queue a split-glTF rebuild after model.glb changed; False if one is already queued."""
+    with _scheduled_lock:
+        if job_id in _repackage_scheduled:
+            return False
+        _repackage_scheduled.add(job_id)
+    try:
+        _render_executor.submit(_repackage_job, job_id)
+    except RuntimeError:
+        with _scheduled_lock:
+            _repackage_scheduled.discard(job_id)
+        return False
+    return True
+
+
+def pending_render_count() -> int:
+    with _scheduled_lock:
+        return len(_scheduled) + len(_repackage_scheduled)
+
+
+REGISTRY.register(Gauge(
+    "protoscale_render_queue_depth", "Completed jobs waiting for preview views or glTF repackaging", pending_render_count))
+
+
+def shutdown_render_queue():
+    """Drop queued renders (they stay pending on the job) and stop the worker."""
+    _render_executor.shutdown(wait=False, cancel_futures=True)
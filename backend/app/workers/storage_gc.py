@@ -0,0 +1,312 @@
+"""Disk usage accounting, retention and quotas for job storage.
+
+A ledger keeps each job's bytes (uploads + outputs, hardlinked files counted
+once), tenant and last access time. It is updated incrementally: a job is
+re-measured when its asset manifest is rebuilt (every stage that writes files
+does that), touched when its assets are served and dropped when it is
+deleted. Only a missing ledger file triggers a full scan, once, in the
+background.
+
+The collector deletes whole finished jobs, least recently used first:
+
+- not accessed for STORAGE_RETENTION_DAYS
+- while their tenant is over STORAGE_TENANT_QUOTA_MB
+- while all jobs together are over STORAGE_QUOTA_MB
+
+Queued/processing jobs and jobs with a retexture in flight are never evicted.
+Intermediate files are removed as soon as a job completes.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+from app.config import (
+    STORAGE_DIR, UPLOADS_DIR, OUTPUTS_DIR, STORAGE_QUOTA_MB, STORAGE_TENANT_QUOTA_MB,
+    STORAGE_RETENTION_DAYS, STORAGE_GC_INTERVAL,
+)
+from app.services.metrics import REGISTRY, Gauge, STORAGE_RECLAIMED
+from app.workers.task_queue import (
+    get_job, remove_job, delete_job_storage, run_io, ACTIVE_STATUSES, RETEXTURE_ACTIVE_STATUSES,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+
+_LEDGER_PATH = STORAGE_DIR / "storage_usage.json"
+# Outputs a finished job never reads again (backups of the pre-variant retexture flow)
+_INTERMEDIATE_OUTPUTS = ("model.glb.bak", "retexture_temp.glb", "model_preview.glb")
+# Temp files of atomic writes are only stale once no write can still be in flight
+_STALE_TEMP_SECONDS = 3600
+
+_lock = threading.Lock()
+# job_id -> (bytes, tenant, last access)
+_usage: Dict[str, Tuple[int, str, float]] = {}
+_tenant_bytes: Dict[str, int] = {}
+_total_bytes = 0
+_dirty = False
+
+
+def _set(job_id: str, size: int, tenant: str, last_access: float):
+    """Must hold _lock."""
+    global _total_bytes, _dirty
+    _pop(job_id)
+    _usage[job_id] = (size, tenant, last_access)
+    _tenant_bytes[tenant] = _tenant_bytes.get(tenant, 0) + size
+    _total_bytes += size
+    _dirty = True
+
+
+def _pop(job_id: str) -> Optional[Tuple[int, str, float]]:
+    """Must hold _lock."""
+    global _total_bytes, _dirty
+    entry = _usage.pop(job_id, None)
+    if entry:
+        size, tenant, _ = entry
+        _total_bytes -= size
+        remaining = _tenant_bytes.get(tenant, 0) - size
+        if remaining > 0:
+            _tenant_bytes[tenant] = remaining
+        else:
+            _tenant_bytes.pop(tenant, None)
+        _dirty = True
+    return entry
+
+
+def _measure(job_id: str) -> Optional[Tuple[int, float]]:
+    """(bytes, newest mtime) of a job's directories, or None when neither exists."""
+    seen = set()
+    total = 0
+    newest = 0.0
+    found = False
+    stack = [str(UPLOADS_DIR / job_id), str(OUTPUTS_DIR / job_id)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        found = True
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue  # removed while scanning
+                # model.glb is a hardlink into the variant store
+                if (st.st_dev, st.st_ino) not in seen:
+                    seen.add((st.st_dev, st.st_ino))
+                    total += st.st_size
+                newest = max(newest, st.st_mtime)
+    return (total, newest) if found else None
+
+
+def record_job(job_id: str):
+    """Re-measure one job (blocking; called whenever its asset manifest is rebuilt)."""
+    measured = _measure(job_id)
+    job = get_job(job_id) if measured else None
+    with _lock:
+        if measured is None:
+            _pop(job_id)
+            return
+        previous = _usage.get(job_id)
+        tenant = (job or {}).get("tenant") or (previous[1] if previous else DEFAULT_TENANT)
+        _set(job_id, measured[0], tenant, time.time())
+
+
+def touch(job_id: str):
+    """Mark a job as used now (LRU order); persisted with the next collection."""
+    global _dirty
+    with _lock:
+        entry = _usage.get(job_id)
+        if entry:
+            _usage[job_id] = (entry[0], entry[1], time.time())
+            _dirty = True
+
+
+def forget_job(job_id: str):
+    """Drop a deleted job from the ledger."""
+    with _lock:
+        _pop(job_id)
+
+
+def storage_bytes() -> int:
+    return _total_bytes
+
+
+def tracked_job_count() -> int:
+    return len(_usage)
+
+
+def load_ledger() -> bool:
+    """Merge the persisted ledger into memory. False when there is none (scan needed)."""
+    try:
+        data = orjson.loads(_LEDGER_PATH.read_bytes())
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.warning(f"Storage ledger unreadable, rescanning: {e}")
+        return False
+    with _lock:
+        for job_id, (size, tenant, last_access) in data.get("jobs", {}).items():
+            # Jobs measured since startup are more current than the file
+            if job_id not in _usage:
+                _set(job_id, size, tenant, last_access)
+    return True
+
+
+def save_ledger():
+    """Persist the ledger if it changed (atomic replace)."""
+    global _dirty
+    with _lock:
+        if not _dirty:
+            return
+        data = orjson.dumps({"jobs": {job_id: list(entry) for job_id, entry in _usage.items()}})
+        _dirty = False
+    tmp_path = _LEDGER_PATH.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, _LEDGER_PATH)
+
+
+def scan_storage() -> int:
+    """Measure every job directory once (first start with no ledger)."""
+    job_ids = set()
+    for root in (UPLOADS_DIR, OUTPUTS_DIR):
+        try:
+            job_ids.update(entry.name for entry in os.scandir(root) if entry.is_dir())
+        except OSError:
+            continue
+    for job_id in job_ids:
+        measured = _measure(job_id)
+        with _lock:
+            if measured is None or job_id in _usage:
+                continue
+            # Jobs created before tenants existed; last write time approximates last use
+            _set(job_id, measured[0], DEFAULT_TENANT, measured[1])
+    save_ledger()
+    return len(job_ids)
+
+
+def collect_intermediates(job_id: str) -> int:
+    """Delete files a completed job no longer needs. Returns the bytes reclaimed.
+
+    Covers the legacy retexture backups, the progressive preview GLB, stale
+    temp files of interrupted writes and background-removed images the job
+    was not generated from.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return 0
+    upload_dir = UPLOADS_DIR / job_id
+    output_dir = OUTPUTS_DIR / job_id
+    used = set(job.get("all_image_paths") or ()) | {job.get("image_path"), job.get("processed_image_path")}
+
+    candidates: List[Path] = [output_dir / name for name in _INTERMEDIATE_OUTPUTS]
+    candidates += [path for path in upload_dir.glob("nobg_*.png") if str(path) not in used]
+    stale_before = time.time() - _STALE_TEMP_SECONDS
+    for directory in (upload_dir, output_dir, output_dir / "variants", output_dir / "variants" / "blobs"):
+        for path in directory.glob("*.tmp"):
+            try:
+                if path.stat().st_mtime < stale_before:
+                    candidates.append(path)
+            except OSError:
+                pass
+
+    reclaimed = 0
+    for path in candidates:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            continue
+        reclaimed += size
+    if reclaimed:
+        STORAGE_RECLAIMED.inc(reclaimed, reason="intermediate")
+        logger.info(f"Removed {reclaimed} bytes of intermediate files of job {job_id}")
+    return reclaimed
+
+
+def _evictable(job_id: str) -> bool:
+    job = get_job(job_id)
+    if job is None:
+        return True  # directories without job state
+    return (job.get("status") not in ACTIVE_STATUSES
+            and job.get("retexture_status") not in RETEXTURE_ACTIVE_STATUSES
+            and not job.get("views_pending"))
+
+
+def _evict(job_id: str, reason: str) -> int:
+    if not _evictable(job_id):
+        return 0
+    remove_job(job_id)
+    delete_job_storage(job_id, UPLOADS_DIR / job_id, OUTPUTS_DIR / job_id)
+    with _lock:
+        entry = _pop(job_id)
+    size = entry[0] if entry else 0
+    STORAGE_RECLAIMED.inc(size, reason=reason)
+    logger.info(f"Evicted job {job_id} ({reason}, {size} bytes)")
+    return size
+
+
+def collect_garbage(now: Optional[float] = None) -> int:
+    """One retention/quota pass (blocking). Returns the bytes reclaimed."""
+    now = time.time() if now is None else now
+    quota = STORAGE_QUOTA_MB * 1024 * 1024
+    tenant_quota = STORAGE_TENANT_QUOTA_MB * 1024 * 1024
+    cutoff = now - STORAGE_RETENTION_DAYS * 86400 if STORAGE_RETENTION_DAYS > 0 else None
+
+    with _lock:
+        lru = sorted(_usage.items(), key=lambda item: item[1][2])
+        tenant_bytes = dict(_tenant_bytes)
+        total = _total_bytes
+
+    reclaimed = 0
+    for job_id, (size, tenant, last_access) in lru:
+        if cutoff is not None and last_access < cutoff:
+            reason = "retention"
+        elif tenant_quota and tenant_bytes.get(tenant, 0) > tenant_quota:
+            reason = "tenant_quota"
+        elif quota and total > quota:
+            reason = "quota"
+        elif not tenant_quota and not (quota and total > quota):
+            break  # LRU order: later jobs are newer than the retention cutoff too
+        else:
+            continue
+        if _evict(job_id, reason):
+            tenant_bytes[tenant] = tenant_bytes.get(tenant, 0) - size
+            total -= size
+            reclaimed += size
+
+    if quota and total > quota:
+        logger.warning(f"Storage still over quota after collection ({total} > {quota} bytes); jobs in use")
+    save_ledger()
+    return reclaimed
+
+
+async def run_storage_gc():
+    """Background collector (started from the app lifespan)."""
+    if not await run_io(load_ledger):
+        count = await run_io(scan_storage)
+        logger.info(f"✓ Storage ledger built ({count} job directories, {storage_bytes()} bytes)")
+    while True:
+        try:
+            reclaimed = await run_io(collect_garbage)
+            if reclaimed:
+                logger.info(f"Storage collection reclaimed {reclaimed} bytes")
+        except Exception as e:
+            logger.error(f"Storage collection failed: {e}")
+        await asyncio.sleep(STORAGE_GC_INTERVAL)
+
+
+REGISTRY.register(Gauge(
+    "protoscale_storage_bytes", "Bytes stored for jobs (uploads and outputs)", storage_bytes))
+REGISTRY.register(Gauge(
+    "protoscale_storage_jobs", "Jobs with files in storage", tracked_job_count))
@@ -1,14 +1,18 @@
-import json
+import os
+import asyncio
 import logging
 import threading
 import shutil
-import copy
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, List
-from collections import deque
 
-from app.config import UPLOADS_DIR
+import orjson
+
+from app.config import UPLOADS_DIR, STORAGE_DIR, IO_EXECUTOR_WORKERS
+from app.workers.job_record import JobRecord
+from app.services.object_store import get_store, object_key
 
 logger = logging.getLogger(__name__)
 
@@ -19,112 +23,366 @@ _EVENTS_LOCK = threading.RLock()
 # Job state persistence
 _JOB_STATE_FILE = "job_state.json"
 
-# In-memory job store: job_id -> dict
-jobs: dict[str, dict] = {}
+# Small manifest of in-flight job ids, loaded eagerly at startup
+_ACTIVE_JOBS_PATH = STORAGE_DIR / "active_jobs.json"
+ACTIVE_STATUSES = frozenset(("queued", "processing"))
+_active_job_ids: set[str] = set()
+# Jobs (usually already completed) with a retexture running at Meshy; also in the manifest
+RETEXTURE_ACTIVE_STATUSES = frozenset(("processing", "cancelling"))
+_retexture_job_ids: set[str] = set()
+
+# Set on shutdown to stop the background cache warmer
+_warm_stop = threading.Event()
+
+# In-memory job store: job_id -> immutable JobRecord snapshot.
+# Writers build a new snapshot under _JOBS_LOCK and swap the reference, so
+# readers grab the current version without locking or copying.
+jobs: dict[str, JobRecord] = {}
+
+# Ids of deleted jobs. Their job_state.json may still be on disk until
+# delete_job_storage runs, so the disk fallback must not bring them back.
+_removed_job_ids: set[str] = set()
+
+# Bounded pool for blocking filesystem work so it never runs on the event loop
+# (CPU-bound work such as rembg/rendering stays on the default executor)
+_io_executor = ThreadPoolExecutor(max_workers=IO_EXECUTOR_WORKERS, thread_name_prefix="protoscale-io")
+
+# Write-behind persistence: job ids whose latest snapshot still has to be saved
+_pending_saves: set[str] = set()
+_manifest_save_pending = False
+_SAVE_LOCKS = tuple(threading.Lock() for _ in range(16))
+_MANIFEST_SAVE_LOCK = threading.Lock()
 
 # Event subscribers per job for SSE streaming
-_job_event_queues: dict[str, list[any]] = {} 
+_job_event_queues: dict[str, list[tuple[asyncio.Queue, asyncio.AbstractEventLoop]]] = {}
 
 # --- Job Persistence ---
 
 def _get_job_state_path(job_id: str) -> Path:
     return UPLOADS_DIR / job_id / _JOB_STATE_FILE
 
-def _save_job_state_to_disk(job_id: str, job: dict):
+def _save_job_state_to_disk(job_id: str, job: JobRecord):
     try:
         job_dir = UPLOADS_DIR / job_id
         job_dir.mkdir(parents=True, exist_ok=True)
         state_path = _get_job_state_path(job_id)
-        with open(state_path, 'w') as f:
-            json.dump(job, f, indent=2, default=str)
+        tmp_path = state_path.with_suffix(".tmp")
+        tmp_path.write_bytes(job.to_json())
+        os.replace(tmp_path, state_path)
     except Exception as e:
         logger.warning(f"Failed to save job state for {job_id}: {e}")
 
-def _load_job_state_from_disk(job_id: str) -> Optional[dict]:
+def _flush_job_save(job_id: str):
+    # Striped lock keeps two flushes of one job from landing out of order
+    with _SAVE_LOCKS[hash(job_id) % len(_SAVE_LOCKS)]:
+        with _JOBS_LOCK:
+            _pending_saves.discard(job_id)
+            job = jobs.get(job_id)
+        if job is not None:  # removed jobs must not be recreated on disk
+            _save_job_state_to_disk(job_id, job)
+
+def _schedule_job_save(job_id: str):
+    """Persist the job off the event loop; bursts of updates coalesce into one write. Must hold _JOBS_LOCK."""
+    if job_id in _pending_saves:
+        return
+    _pending_saves.add(job_id)
+    try:
+        _io_executor.submit(_flush_job_save, job_id)
+    except RuntimeError:  # executor already shut down
+        _flush_job_save(job_id)
+
+def _load_job_state_from_disk(job_id: str) -> Optional[JobRecord]:
     try:
         state_path = _get_job_state_path(job_id)
         if not state_path.exists():
             return None
-        with open(state_path, 'r') as f:
-            return json.load(f)
+        with open(state_path, 'rb') as f:
+            return JobRecord.from_json(f.read())
     except Exception as e:
         logger.warning(f"Failed to load job state for {job_id}: {e}")
         return None
 
-def restore_jobs_from_disk():
+def _flush_active_manifest():
+    global _manifest_save_pending
+    with _MANIFEST_SAVE_LOCK:
+        with _JOBS_LOCK:
+            _manifest_save_pending = False
+            job_ids = sorted(_active_job_ids | _retexture_job_ids)
+        _save_active_manifest(job_ids)
+
+def _schedule_manifest_save():
+    """Must hold _JOBS_LOCK."""
+    global _manifest_save_pending
+    if not _manifest_save_pending:
+        _manifest_save_pending = True
+        try:
+            _io_executor.submit(_flush_active_manifest)
+        except RuntimeError:  # executor already shut down
+            _flush_active_manifest()
+
+def _save_active_manifest(job_ids: Optional[List[str]] = None):
+    try:
+        tmp_path = _ACTIVE_JOBS_PATH.with_suffix(".tmp")
+        if job_ids is None:
+            job_ids = sorted(_active_job_ids | _retexture_job_ids)
+        tmp_path.write_bytes(orjson.dumps(job_ids))
+        os.replace(tmp_path, _ACTIVE_JOBS_PATH)
+    except Exception as e:
+        logger.warning(f"Failed to save active jobs manifest: {e}")
+
+def _track_active(job: JobRecord):
+    """Keep the active-job and retexture indexes (and their manifest) in sync. Must hold _JOBS_LOCK."""
+    job_id = job["job_id"]
+    changed = False
+    for index, active in (
+        (_active_job_ids, job.get("status") in ACTIVE_STATUSES),
+        (_retexture_job_ids, job.get("retexture_status") in RETEXTURE_ACTIVE_STATUSES),
+    ):
+        if active == (job_id in index):
+            continue
+        if active:
+            index.add(job_id)
+        else:
+            index.discard(job_id)
+        changed = True
+    if changed:
+        _schedule_manifest_save()
+
+def restore_jobs_from_disk() -> int:
+    """Load every job_state.json (full scan). Jobs already in memory are kept."""
     restored_count = 0
     try:
         if not UPLOADS_DIR.exists():
-            return
+            return 0
         for job_dir in UPLOADS_DIR.iterdir():
-            if not job_dir.is_dir():
+            if _warm_stop.is_set():
+                break
+            if not job_dir.is_dir() or job_dir.name in jobs:
                 continue
             job_id = job_dir.name
             job_state = _load_job_state_from_disk(job_id)
             if job_state:
                 with _JOBS_LOCK:
-                    jobs[job_id] = job_state
+                    if job_id in _removed_job_ids:
+                        continue
+                    jobs.setdefault(job_id, job_state)
                     restored_count += 1
         logger.info(f"✓ Restored {restored_count} job(s) from disk")
     except Exception as e:
         logger.error(f"Error restoring jobs: {e}")
+    return restored_count
+
+def restore_active_jobs() -> int:
+    """Startup restore: load only in-flight jobs listed in the manifest.
+
+    Historical jobs are loaded on first access (get_job disk fallback) or by
+    warm_job_cache. Without a manifest (first boot), falls back to a full scan.
+    """
+    if not _ACTIVE_JOBS_PATH.exists():
+        restore_jobs_from_disk()
+        with _JOBS_LOCK:
+            for job in list(jobs.values()):
+                _track_active(job)
+            _save_active_manifest()
+            return len(_active_job_ids) + len(_retexture_job_ids)
+
+    try:
+        job_ids = orjson.loads(_ACTIVE_JOBS_PATH.read_bytes())
+    except Exception as e:
+        logger.warning(f"Active jobs manifest unreadable, doing full restore: {e}")
+        _ACTIVE_JOBS_PATH.unlink(missing_ok=True)
+        return restore_active_jobs()
+
+    with _JOBS_LOCK:
+        for job_id in job_ids:
+            job = _load_job_state_from_disk(job_id)
+            if job and (job.get("status") in ACTIVE_STATUSES
+                        or job.get("retexture_status") in RETEXTURE_ACTIVE_STATUSES):
+                jobs[job_id] = job
+                _track_active(job)
+        # Drop ids of jobs that finished or were deleted while we were down
+        _save_active_manifest()
+        return len(_active_job_ids) + len(_retexture_job_ids)
+
+def warm_job_cache() -> int:
+    """Background fill of the in-memory store with historical jobs."""
+    _warm_stop.clear()
+    return restore_jobs_from_disk()
+
+def stop_job_cache_warmer():
+    _warm_stop.set()
 
 # --- Core Job Functions ---
 
-def create_job(job_id: str, image_path: str, settings: dict) -> dict:
-    job = {
+def _new_job(job_id: str, image_path: str, settings: dict, created_at: str, **fields) -> JobRecord:
+    return JobRecord(**{
         "job_id": job_id,
         "status": "pending",
         "progress": 0,
         "stage": "ready",
-        "error": None,
         "image_path": image_path,
         "settings": settings,
         "all_image_paths": settings.get("all_image_paths", [image_path]),
-        "meshy_endpoint_type": None,
         "multi_angle_paths": [],
-        "model_path": None,
-        "created_at": datetime.now().isoformat(),
-        "meshy_task_id": None
-    }
+        "created_at": created_at,
+        "version": 1,
+        **fields,
+    })
+
+def create_job(job_id: str, image_path: str, settings: dict) -> JobRecord:
+    job = _new_job(job_id, image_path, settings, datetime.now().isoformat())
     with _JOBS_LOCK:
         jobs[job_id] = job
-        _save_job_state_to_disk(job_id, job)
+        _schedule_job_save(job_id)
+        _track_active(job)
     return job
 
-def get_job(job_id: str) -> Optional[dict]:
+def _flush_job_saves(job_ids: List[str]):
+    for job_id in job_ids:
+        _flush_job_save(job_id)
+
+def create_jobs(specs: List[Dict[str, Any]]) -> List[JobRecord]:
+    """Create many jobs at once (batch submission).
+
+    Each spec has create_job's job_id, image_path and settings plus any other
+    fields to start with (status, tenant, batch_id...). The jobs are stored
+    under one lock acquisition and written by a single I/O task, with at most
+    one active-jobs manifest update, instead of one write per job.
+    """
+    created_at = datetime.now().isoformat()
+    records = [_new_job(created_at=created_at, **spec) for spec in specs]
+    job_ids = [job["job_id"] for job in records]
     with _JOBS_LOCK:
-        job = jobs.get(job_id)
-        if job:
-            return copy.deepcopy(job)
-    
+        for job in records:
+            jobs[job["job_id"]] = job
+            # Marked pending so single-job updates before the flush coalesce into it
+            _pending_saves.add(job["job_id"])
+            _track_active(job)
+        try:
+            _io_executor.submit(_flush_job_saves, job_ids)
+        except RuntimeError:  # executor already shut down
+            _flush_job_saves(job_ids)
+    return records
+
+def get_job(job_id: str) -> Optional[JobRecord]:
+    """Return the current read-only snapshot of a job (no lock, no copy)."""
+    job = jobs.get(job_id)
+    if job:
+        return job
+
     # Fallback to disk
+    if job_id in _removed_job_ids:
+        return None
     disk_job = _load_job_state_from_disk(job_id)
     if disk_job:
         with _JOBS_LOCK:
-            jobs[job_id] = disk_job
-        return copy.deepcopy(disk_job)
+            if job_id in _removed_job_ids:  # deleted while we were reading
+                return None
+            # Another writer may have created the job meanwhile; keep theirs
+            return jobs.setdefault(job_id, disk_job)
     return None
 
-def update_job(job_id: str, **kwargs):
+def update_job(job_id: str, event_type: str = "stage_update", **kwargs):
     event = None
+    batch_id = None
+    if job_id not in jobs:
+        # History is loaded lazily, so the job may only exist on disk. get_job reads
+        # it without the lock and inserts it under the lock only if still absent
+        # (never for a removed job, so late updates cannot resurrect it).
+        get_job(job_id)
     with _JOBS_LOCK:
-        if job_id in jobs:
-            jobs[job_id].update(kwargs)
-            _save_job_state_to_disk(job_id, jobs[job_id])
-            
+        current = jobs.get(job_id)
+        if current is not None and all(current.get(k) == v for k, v in kwargs.items()):
+            # Nothing changed (e.g. a repeated poll): keep the version, publish nothing
+            current = None
+        if current is not None:
+            # Every change gets a new version (status ETags and long-polls compare it)
+            job = current.replace(version=(current.get("version") or 0) + 1, **kwargs)
+            jobs[job_id] = job
+            _schedule_job_save(job_id)
+            _track_active(job)
+
             # Prepare event
-            job = jobs[job_id]
             event = {
-                "type": "stage_update",
+                "type": event_type,
                 "stage": job.get("stage"),
                 "progress": job.get("progress", 0),
                 "status": job.get("status"),
                 "error": job.get("error"),
+                "version": job.get("version"),
             }
+            if job.get("preview_status"):
+                event["preview_status"] = job.get("preview_status")
+            if event_type == "retexture_update":
+                event["retexture"] = retexture_state(job)
+            if event_type != "stage_update":
+                event["assets"] = sorted((job.get("asset_manifest") or {}).get("files", ()))
+            batch_id = job.get("batch_id")
     
     if event:
         _publish_job_event(job_id, event)
+        if batch_id:
+            # Batch streams follow all their jobs on one channel
+            _publish_job_event(batch_channel(batch_id), {**event, "job_id": job_id})
+
+# Keep the most recent spans only (retexture loops can add many)
+MAX_TIMELINE_SPANS = 200
+
+def append_job_spans(job_id: str, spans: List[dict]):
+    if not spans:
+        return
+    if job_id not in jobs:
+        get_job(job_id)  # disk read outside the lock, as in update_job
+    with _JOBS_LOCK:
+        current = jobs.get(job_id)
+        if current is None:
+            return
+        timeline = list(current.get("timeline", ())) + list(spans)
+        update_job(job_id, timeline=timeline[-MAX_TIMELINE_SPANS:])
+
+def active_job_count() -> int:
+    return len(_active_job_ids)
+
+def active_jobs() -> List[JobRecord]:
+    """Snapshots of queued/processing jobs (without scanning job history)."""
+    return [job for job in map(jobs.get, list(_active_job_ids)) if job is not None]
+
+def retexture_jobs() -> List[JobRecord]:
+    """Snapshots of jobs with a retexture in flight (without scanning job history)."""
+    return [job for job in map(jobs.get, list(_retexture_job_ids)) if job is not None]
+
+def retexture_state(job: JobRecord) -> dict:
+    """Public retexture sub-task state, as served by /retexture/status and SSE."""
+    return {
+        "status": job.get("retexture_status") or "idle",
+        "progress": job.get("retexture_progress", 0),
+        "error": job.get("retexture_error"),
+    }
+
+def queued_job_count() -> int:
+    return sum(1 for job_id in list(_active_job_ids) if (jobs.get(job_id) or {}).get("status") == "queued")
+
+def remove_job(job_id: str):
+    with _JOBS_LOCK:
+        _removed_job_ids.add(job_id)
+        jobs.pop(job_id, None)
+        _pending_saves.discard(job_id)
+        if job_id in _active_job_ids or job_id in _retexture_job_ids:
+            _active_job_ids.discard(job_id)
+            _retexture_job_ids.discard(job_id)
+            _schedule_manifest_save()
+
+def delete_job_storage(job_id: str, *paths: Path):
+    """Remove a job's directories and stored objects (blocking; call via run_io after remove_job)."""
+    # Holding the job's save lock means an in-flight write cannot recreate the dir
+    with _SAVE_LOCKS[hash(job_id) % len(_SAVE_LOCKS)]:
+        for path in paths:
+            if path.exists():
+                shutil.rmtree(path)
+    store = get_store()
+    if store.redirects:
+        for path in paths:
+            store.delete_prefix(object_key(path) + "/")
 
 def update_job_stage(job_id: str, stage: Any, progress: Optional[int] = None):
     # Handle Enum or string
@@ -136,40 +394,37 @@ def update_job_stage(job_id: str, stage: Any, progress: Optional[int] = None):
 
 # --- Event / PubSub ---
 
-import asyncio
-
 def subscribe_job_events(job_id: str) -> asyncio.Queue:
     with _EVENTS_LOCK:
         if job_id not in _job_event_queues:
             _job_event_queues[job_id] = []
         queue = asyncio.Queue()
-        _job_event_queues[job_id].append(queue)
+        # Remember the subscriber's loop so updates made on worker threads still reach it
+        _job_event_queues[job_id].append((queue, asyncio.get_running_loop()))
         return queue
 
 def unsubscribe_job_events(job_id: str, queue: asyncio.Queue):
     with _EVENTS_LOCK:
         if job_id in _job_event_queues:
-            try:
-                _job_event_queues[job_id].remove(queue)
-            except ValueError:
-                pass
+            _job_event_queues[job_id] = [(q, loop) for q, loop in _job_event_queues[job_id] if q is not queue]
             if not _job_event_queues[job_id]:
                 del _job_event_queues[job_id]
 
-def _publish_job_event(job_id: str, event: dict):
-    # In a real app, this should schedule on the loop.
-    # For simplicity in this synchronous update context:
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
+def batch_channel(batch_id: str) -> str:
+    """Event channel (subscribe_job_events key) carrying the events of a batch's jobs."""
+    return f"batch:{batch_id}"
+
+def subscriber_count() -> int:
+    with _EVENTS_LOCK:
+        return sum(len(queues) for queues in _job_event_queues.values())
 
+def _publish_job_event(job_id: str, event: dict):
     with _EVENTS_LOCK:
         queues = list(_job_event_queues.get(job_id, []))
-    
-    for q in queues:
-        if loop and not loop.is_closed():
-            loop.call_soon_threadsafe(lambda qq, ev: qq.put_nowait(ev), q, event)
+
+    for q, loop in queues:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(q.put_nowait, event)
 
 # --- Helpers ---
 
@@ -177,13 +432,17 @@ async def run_in_thread(fn, *args):
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(None, fn, *args)
 
+async def run_io(fn, *args):
+    """Run blocking filesystem work on the bounded I/O executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, fn, *args)
+
+def shutdown_io_executor():
+    """Wait for queued job/manifest writes (call on shutdown)."""
+    _io_executor.shutdown(wait=True)
+
 # Compatibility mocks for old imports
 def submit_job_to_pipeline(*args, **kwargs):
     logger.warning("submit_job_to_pipeline called but GPU queue is disabled")
     return True
 
-def get_pipeline_metrics():
-    return {
-        "status": "cloud_mode", 
-        "provider": "Meshy AI"
-    }
@@ -0,0 +1 @@
+"""Micro-benchmarks for the backend (run from backend/: python -m benchmarks.<name>)."""
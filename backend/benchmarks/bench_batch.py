@@ -0,0 +1,147 @@
+"""Batch submission vs one upload + generate-3d pair per job.
+
+Starts the Meshy emulator and the backend, then creates --jobs jobs two
+ways: ``single`` sends /api/upload followed by /api/jobs/{id}/generate-3d
+per job from --concurrency clients; ``batch`` sends them all as one
+streamed POST /api/batches. Reported per mode: wall time until every job id
+is known and queued, jobs/s, HTTP requests and the backend's CPU seconds
+(utime + stime from /proc). With --wait the batch run also follows
+/api/batches/{id}/stream until every job has finished at the emulator.
+Background removal is off so only the submission path is measured. The
+backend uses the normal storage dir; start from an empty one, since jobs
+left over from earlier runs are resumed and polled against the emulator.
+
+    python -m benchmarks.bench_batch --jobs 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+from benchmarks.bench_storage import _cpu_seconds
+from benchmarks.loadtest import API_KEY, _spawn, _test_image, _wait_ready
+
+EMULATOR_PORT = 8091
+BACKEND_PORT = 8090
+
+
+async def _single(client: httpx.AsyncClient, count: int, concurrency: int, image: bytes) -> int:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.post("/api/upload", files={"files": ("input.png", image, "image/png")},
+                                         data={"remove_bg": "false"})
+            response.raise_for_status()
+            job_id = response.json()["job_id"]
+            (await client.post(f"/api/jobs/{job_id}/generate-3d", json={})).raise_for_status()
+
+    await asyncio.gather(*(one() for _ in range(count)))
+    return count * 2
+
+
+def _batch_body(count: int, image: bytes):
+    """Multipart body generator: manifest first, then one image part per item."""
+    boundary = uuid.uuid4().hex
+    manifest = {"defaults": {"remove_bg": False}, "items": [{"ref": f"sku-{i}"} for i in range(count)]}
+
+    async def body():
+        yield (f"--{boundary}\r\nContent-Disposition: form-data; name=\"manifest\"\r\n"
+               f"Content-Type: application/json\r\n\r\n{json.dumps(manifest)}\r\n").encode()
+        for index in range(count):
+            yield (f"--{boundary}\r\nContent-Disposition: form-data; name=\"item{index}\"; filename=\"{index}.png\"\r\n"
+                   f"Content-Type: image/png\r\n\r\n").encode() + image + b"\r\n"
+        yield f"--{boundary}--\r\n".encode()
+
+    return body(), f"multipart/form-data; boundary={boundary}"
+
+
+async def _batch(client: httpx.AsyncClient, count: int, image: bytes) -> dict:
+    body, content_type = _batch_body(count, image)
+    response = await client.post("/api/batches", content=body, headers={"Content-Type": content_type})
+    response.raise_for_status()
+    return response.json()
+
+
+async def _follow(client: httpx.AsyncClient, batch_id: str) -> dict:
+    last = {}
+    async with client.stream("GET", f"/api/batches/{batch_id}/stream", timeout=None) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                last = json.loads(line[6:])
+                if last.get("finished"):
+                    break
+    return last
+
+
+async def _run_mode(mode: str, args, image: bytes) -> dict:
+    emulator = _spawn(["benchmarks.meshy_emulator:app", "--port", str(EMULATOR_PORT)], {
+        "EMULATOR_QUEUE_SECONDS": "0.2",
+        "EMULATOR_GENERATION_SECONDS": "0.5",
+        "EMULATOR_GLB_SIZE_MB": "0.1",
+    })
+    backend = _spawn(["app.main:app", "--port", str(BACKEND_PORT)], {
+        "MESHY_API_URL": f"http://127.0.0.1:{EMULATOR_PORT}/v1",
+        "MESHY_API_KEY": "emulator",
+        "PROTOSCALE_API_KEY": API_KEY,
+        "PRELOAD_HEAVY_MODULES": "false",
+        "RATE_LIMIT_UPLOAD": "100000/hour",
+        "RATE_LIMIT_GENERATE": "100000/hour",
+        "RATE_LIMIT_BATCH": "100000/hour",
+        "MESHY_INITIAL_IN_FLIGHT": "50",
+        "MESHY_MAX_IN_FLIGHT": "50",
+    })
+    try:
+        await _wait_ready(f"http://127.0.0.1:{EMULATOR_PORT}/stats")
+        await _wait_ready(f"http://127.0.0.1:{BACKEND_PORT}/health")
+        limits = httpx.Limits(max_connections=args.concurrency + 4)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{BACKEND_PORT}", headers={"X-API-Key": API_KEY},
+                                     limits=limits, timeout=300) as client:
+            cpu_started = _cpu_seconds(backend.pid)
+            started = time.perf_counter()
+            if mode == "single":
+                requests = await _single(client, args.jobs, args.concurrency, image)
+                batch = None
+            else:
+                batch = await _batch(client, args.jobs, image)
+                requests = 1
+            elapsed = time.perf_counter() - started
+            cpu = _cpu_seconds(backend.pid) - cpu_started
+            result = {
+                "mode": mode,
+                "jobs": args.jobs,
+                "requests": requests,
+                "submit_s": round(elapsed, 2),
+                "jobs_per_s": round(args.jobs / elapsed, 1),
+                "api_cpu_s": round(cpu, 2),
+                "api_cpu_ms_per_job": round(cpu * 1000 / args.jobs, 2),
+            }
+            if batch and args.wait:
+                final = await _follow(client, batch["batch_id"])
+                result["until_finished_s"] = round(time.perf_counter() - started, 2)
+                result["final_counts"] = final.get("counts")
+            return result
+    finally:
+        for process in (backend, emulator):
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--modes", default="single,batch")
+    parser.add_argument("--wait", action="store_true", help="Follow the batch stream until every job finished")
+    args = parser.parse_args()
+
+    image = _test_image()
+    for mode in args.modes.split(","):
+        print(json.dumps(asyncio.run(_run_mode(mode, args, image))))
+
+
+if __name__ == "__main__":
+    main()
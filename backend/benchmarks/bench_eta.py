@@ -0,0 +1,116 @@
+"""ETA accuracy: learned stage durations vs the fixed QUALITY_PRESETS estimate.
+
+Simulates --jobs Meshy jobs in sequence over four settings combinations with
+different generation times (log-normal spread), exponential Meshy queue
+waits and uneven progress curves; halfway through, Meshy slows down by
+--drift. Before each job finishes, MeshyService.estimate_remaining is asked
+for the time left while queued at Meshy and at 25/50/75% of generation, and
+compared with the true remainder; each finished job then feeds its stage
+durations to the estimator. The baseline counts down
+``estimated_time_min`` from submission, as a client had to before.
+
+    python -m benchmarks.bench_eta --jobs 2000 --drift 1.5
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("MESHY_API_KEY", "bench")
+
+from app.config import QUALITY_PRESETS, DEFAULT_QUALITY_PRESET, JobStage
+from app.services.eta import estimator, job_key
+from app.services.meshy import meshy_service
+
+# settings -> mean generation seconds
+COMBINATIONS = [
+    ({"should_texture": False}, 1, 70.0),
+    ({"should_texture": True}, 1, 150.0),
+    ({"should_texture": True, "enable_pbr": True}, 1, 200.0),
+    ({"should_texture": True}, 3, 260.0),
+]
+CHECKPOINTS = ("meshy_queue", "gen_25", "gen_50", "gen_75")
+
+
+def _progress_at(fraction_of_time: float, curve: float) -> int:
+    """Job progress as _check_job_status reports it (Meshy 0-100 mapped to 10-95)."""
+    return 10 + int(100 * fraction_of_time ** curve * 0.85)
+
+
+def _estimate(job: dict, generation_elapsed=None, queue_elapsed=0.0) -> float:
+    now = time.time()
+    meshy_service._generation_started_at.pop(job["job_id"], None)
+    meshy_service._submitted_at[job["job_id"]] = now - queue_elapsed
+    if generation_elapsed is not None:
+        meshy_service._generation_started_at[job["job_id"]] = now - generation_elapsed
+    return meshy_service.estimate_remaining([job])[job["job_id"]]
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    baseline_total = QUALITY_PRESETS[DEFAULT_QUALITY_PRESET]["estimated_time_min"] * 60
+    errors = {name: [] for name in CHECKPOINTS}
+    baseline = {name: [] for name in CHECKPOINTS}
+    timings = []
+
+    for index in range(args.jobs):
+        settings, images, generation_mean = rng.choice(COMBINATIONS)
+        slowdown = args.drift if index >= args.jobs // 2 else 1.0
+        queue_s = rng.expovariate(1 / (10.0 * slowdown))
+        generation_s = generation_mean * slowdown * rng.lognormvariate(0, 0.25)
+        download_s = rng.uniform(1.0, 4.0)
+        curve = rng.uniform(0.7, 1.4)
+        job = {
+            "job_id": f"bench-eta-{index}",
+            "status": "processing",
+            "stage": JobStage.GEOMETRY.value,
+            "progress": 5,
+            "settings": settings,
+            "all_image_paths": [f"{n}.png" for n in range(images)],
+        }
+
+        measure = index >= args.warmup
+        if measure:
+            started = time.perf_counter()
+            estimate = _estimate(job)
+            timings.append(time.perf_counter() - started)
+            errors["meshy_queue"].append(abs(estimate - (queue_s + generation_s + download_s)))
+            baseline["meshy_queue"].append(abs(baseline_total - (queue_s + generation_s + download_s)))
+            for share, name in ((0.25, "gen_25"), (0.5, "gen_50"), (0.75, "gen_75")):
+                elapsed = generation_s * share
+                job["progress"] = _progress_at(share, curve)
+                actual = generation_s - elapsed + download_s
+                errors[name].append(abs(_estimate(job, elapsed, queue_s) - actual))
+                baseline[name].append(abs(max(baseline_total - queue_s - elapsed, 0) - actual))
+
+        key = job_key(job)
+        estimator.observe("meshy_queue", key, queue_s)
+        estimator.observe("generation", key, generation_s)
+        estimator.observe("download", key, download_s)
+
+    def mae(values):
+        return round(statistics.mean(values), 1)
+
+    return {
+        "jobs": args.jobs,
+        "drift": args.drift,
+        "mae_s": {name: mae(values) for name, values in errors.items()},
+        "baseline_mae_s": {name: mae(values) for name, values in baseline.items()},
+        "estimate_us": round(statistics.median(timings) * 1e6, 1),
+        "stat_keys": estimator.key_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=20, help="Jobs learned from before errors are counted")
+    parser.add_argument("--drift", type=float, default=1.5, help="Meshy slowdown factor for the second half")
+    parser.add_argument("--seed", type=int, default=1)
+    print(json.dumps(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Bulk ZIP export: throughput and memory of GET /api/jobs/export.
+
+Writes --jobs history jobs with a --model-mb GLB each (10 GB by default)
+into a temporary storage dir, serves the jobs router with uvicorn in this
+process and downloads the whole history as one archive, discarding the
+bytes. Reports archive size, wall time, MB/s and the process RSS before and
+at peak (sampled every 0.1s); bounded memory means the peak does not grow
+with --jobs or --model-mb. --verify saves the archive and checks every CRC
+(needs the disk space).
+
+    python -m benchmarks.bench_export --jobs 100 --model-mb 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+import uuid
+import zipfile
+from pathlib import Path
+
+os.environ.setdefault("MESHY_API_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_EXPORT", "1000/hour")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.middleware.auth import API_KEY
+from app.routers import jobs
+from app.services import assets, export
+from app.workers import storage_gc, task_queue
+
+_BLOCK = 8 * 1024 * 1024
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _write_fixtures(root: Path, count: int, model_mb: float):
+    block = os.urandom(_BLOCK)
+    size = int(model_mb * 1024 * 1024)
+    for index in range(count):
+        job_dir = root / "outputs" / str(uuid.uuid4())
+        job_dir.mkdir(parents=True)
+        with open(job_dir / "model.glb", "wb") as f:
+            f.write(index.to_bytes(8, "little"))  # distinct content per job
+            remaining = size - 8
+            while remaining > 0:
+                f.write(block[:min(remaining, _BLOCK)])
+                remaining -= _BLOCK
+
+
+async def _download(port: int, job_count: int, verify_path: Path = None) -> dict:
+    peak = {"rss": _rss_mb()}
+    done = asyncio.Event()
+
+    async def sample():
+        while not done.is_set():
+            peak["rss"] = max(peak["rss"], _rss_mb())
+            await asyncio.sleep(0.1)
+
+    sampler = asyncio.create_task(sample())
+    total = 0
+    out = open(verify_path, "wb") if verify_path else None
+    started = time.perf_counter()
+    try:
+        async with httpx.AsyncClient(headers={"X-API-Key": API_KEY}, timeout=None) as client:
+            url = f"http://127.0.0.1:{port}/api/jobs/export?limit={job_count}"
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_raw():
+                    total += len(chunk)
+                    if out:
+                        out.write(chunk)
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        await sampler
+        if out:
+            out.close()
+    return {"archive_gb": round(total / 1e9, 2), "seconds": round(elapsed, 1),
+            "mb_per_s": round(total / 1e6 / elapsed, 1), "rss_peak_mb": round(peak["rss"], 1)}
+
+
+async def _run(port: int, job_count: int, verify_path: Path = None) -> dict:
+    app = FastAPI()
+    app.include_router(jobs.router)
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        return await _download(port, job_count, verify_path)
+    finally:
+        server.should_exit = True
+        await serve_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--model-mb", type=float, default=100)
+    parser.add_argument("--verify", action="store_true", help="Save the archive and test every entry")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-export-", dir=os.getenv("BENCH_TMPDIR")))
+    for module in (task_queue, assets, jobs, export, storage_gc):
+        if hasattr(module, "UPLOADS_DIR"):
+            module.UPLOADS_DIR = root / "uploads"
+        if hasattr(module, "OUTPUTS_DIR"):
+            module.OUTPUTS_DIR = root / "outputs"
+    task_queue._ACTIVE_JOBS_PATH = root / "active_jobs.json"
+    storage_gc._LEDGER_PATH = root / "storage_usage.json"
+    try:
+        started = time.perf_counter()
+        _write_fixtures(root, args.jobs, args.model_mb)
+        fixture_s = time.perf_counter() - started
+        rss_before = _rss_mb()
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        verify_path = root / "export.zip" if args.verify else None
+        result = asyncio.run(_run(port, args.jobs, verify_path))
+        if verify_path:
+            with zipfile.ZipFile(verify_path) as archive:
+                result["entries"] = len(archive.infolist())
+                result["verified"] = archive.testzip() is None
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "model_mb": args.model_mb,
+        "fixture_write_s": round(fixture_s, 1),
+        "rss_before_mb": round(rss_before, 1),
+        **result,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Time from a SUCCEEDED Meshy task to job completion, and to rendered views.
+
+Finalizes N jobs at once through MeshyService against the emulator's GLB
+and preview fixtures. ``completed`` is when the job is marked completed
+(GLB + Meshy preview stored); ``views_ready`` is when the background render
+queue has published ``assets_updated``, which is also what completion
+waited for when the views were rendered inline.
+
+    python -m benchmarks.bench_finalize --jobs 4 --subdivisions 6
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.loadtest import _spawn, _wait_ready
+
+EMULATOR_PORT = 8097
+EMULATOR_URL = f"http://127.0.0.1:{EMULATOR_PORT}"
+os.environ.update(MESHY_API_KEY="emulator", MESHY_API_URL=f"{EMULATOR_URL}/v1")
+
+from app.services import assets
+from app.services.meshy import meshy_service
+from app.workers import render_queue, task_queue
+from app.workers.task_queue import create_job, get_job, update_job, subscribe_job_events
+
+
+async def _finalize(client: httpx.AsyncClient, job_id: str, task_id: str) -> dict:
+    events = subscribe_job_events(job_id)
+    started = time.perf_counter()
+    await meshy_service._download_and_finalize(
+        client, job_id, f"{EMULATOR_URL}/assets/{task_id}.glb", f"{EMULATOR_URL}/assets/{task_id}.png")
+    completed = time.perf_counter() - started
+    while (await events.get()).get("type") != "assets_updated":
+        pass
+    return {
+        "completed": completed,
+        "views_ready": time.perf_counter() - started,
+        "status": get_job(job_id).get("status"),
+        "views": len(get_job(job_id).get("multi_angle_paths", ())),
+    }
+
+
+async def run(job_count: int, root: Path) -> dict:
+    async with httpx.AsyncClient(timeout=60) as client:
+        job_ids, task_ids = [], []
+        for i in range(job_count):
+            response = await client.post(f"{EMULATOR_URL}/v1/image-to-3d", json={})
+            task_ids.append(response.json()["result"])
+            job_id = f"bench-finalize-{i:03d}"
+            create_job(job_id, str(root / "uploads" / job_id / "original_0.png"), {})
+            update_job(job_id, status="processing")
+            job_ids.append(job_id)
+        # Warm the emulator's fixture cache so the first download is not penalized
+        await client.get(f"{EMULATOR_URL}/assets/{task_ids[0]}.glb")
+        results = await asyncio.gather(*(_finalize(client, j, t) for j, t in zip(job_ids, task_ids)))
+
+    def summary(key):
+        values = [r[key] for r in results]
+        return {"p50_s": round(statistics.median(values), 3), "max_s": round(max(values), 3)}
+
+    return {
+        "jobs": job_count,
+        "completed": summary("completed"),
+        "views_ready": summary("views_ready"),
+        "statuses": sorted({r["status"] for r in results}),
+        "views_per_job": sorted({r["views"] for r in results}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--subdivisions", type=int, default=6, help="Icosphere detail of the GLB fixture")
+    parser.add_argument("--glb-mb", type=float, default=5.0)
+    args = parser.parse_args()
+
+    emulator = _spawn(["benchmarks.meshy_emulator:app", "--port", str(EMULATOR_PORT)], {
+        "EMULATOR_MESH_SUBDIVISIONS": str(args.subdivisions),
+        "EMULATOR_GLB_SIZE_MB": str(args.glb_mb),
+    })
+    root = Path(tempfile.mkdtemp(prefix="bench-finalize-", dir=os.getenv("BENCH_TMPDIR")))
+    (root / "uploads").mkdir()
+    (root / "outputs").mkdir()
+    task_queue.UPLOADS_DIR = assets.UPLOADS_DIR = root / "uploads"
+    task_queue._ACTIVE_JOBS_PATH = root / "active_jobs.json"
+    for module in (assets, render_queue):
+        module.OUTPUTS_DIR = root / "outputs"
+    from app.services import meshy
+    meshy.OUTPUTS_DIR = root / "outputs"
+    try:
+        asyncio.run(_wait_ready(f"{EMULATOR_URL}/stats"))
+        result = asyncio.run(run(args.jobs, root))
+    finally:
+        emulator.terminate()
+        emulator.wait(timeout=10)
+        render_queue.shutdown_render_queue()
+        task_queue.shutdown_io_executor()
+        shutil.rmtree(root, ignore_errors=True)
+
+    result.update(faces=20 * 4 ** args.subdivisions)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
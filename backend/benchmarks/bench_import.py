@@ -0,0 +1,76 @@
+"""Cold import time of the API process, with a budget check for CI.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the best cumulative time plus the slowest top-level imports. Exits 1
+when the budget is exceeded or a deferred module is imported eagerly.
+
+    python -m benchmarks.bench_import --runs 5 --budget-ms 600
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "600"))
+
+# Must only load on first render/rembg (see mesh_renderer.preload / image_processor.preload)
+DEFERRED_MODULES = ("trimesh", "matplotlib", "mpl_toolkits", "rembg", "onnxruntime")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| *(\S+)")
+
+
+def _import_profile(module: str) -> dict[str, int]:
+    env = {**os.environ, "MESHY_API_KEY": os.environ.get("MESHY_API_KEY", "benchmark")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.splitlines()[-1] if proc.stderr else "import failed")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        if match.group(3) == "site":
+            # Interpreter startup ends with `site`; only count what follows
+            cumulative = {}
+            continue
+        cumulative[match.group(3)] = int(match.group(2))
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = [_import_profile(args.module) for _ in range(args.runs)]
+    best = min(profiles, key=lambda p: p[args.module])
+    total_ms = best[args.module] / 1000
+    eager = sorted(m for m in best if m.split(".")[0] in DEFERRED_MODULES and "." not in m)
+    slowest = sorted(((m, us) for m, us in best.items() if m != args.module and "." not in m),
+                     key=lambda item: item[1], reverse=True)[:args.top]
+
+    result = {
+        "module": args.module,
+        "import_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "eager_deferred_modules": eager,
+        "slowest": {m: round(us / 1000, 1) for m, us in slowest},
+    }
+    print(json.dumps(result, indent=2))
+
+    if total_ms > args.budget_ms or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
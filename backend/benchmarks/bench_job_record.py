@@ -0,0 +1,92 @@
+"""Memory per job and (de)serialization throughput: plain dict vs JobRecord.
+
+    python -m benchmarks.bench_job_record --jobs 20000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import uuid
+
+from app.workers.job_record import JobRecord
+
+
+def _sample_job(i: int) -> dict:
+    job_id = str(uuid.uuid4())
+    paths = [f"/srv/storage/uploads/{job_id}/nobg_{n}.png" for n in range(2)]
+    return {
+        "job_id": job_id,
+        "status": "completed",
+        "progress": 100,
+        "stage": "completed",
+        "error": None,
+        "image_path": paths[0],
+        "processed_image_path": paths[0],
+        "settings": {
+            "remove_bg": True, "ai_model": "meshy-6", "should_texture": True, "enable_pbr": False,
+            "quality_preset": "v3", "model_type": "standard", "symmetry_mode": "auto",
+            "all_image_paths": paths,
+        },
+        "all_image_paths": paths,
+        "meshy_endpoint_type": "multi-image-to-3d",
+        "multi_angle_paths": [f"/srv/storage/outputs/{job_id}/view_{n}.png" for n in range(4)],
+        "model_path": f"/srv/storage/outputs/{job_id}/model.glb",
+        "created_at": f"2026-01-01T00:00:{i % 60:02d}.000000",
+        "meshy_task_id": f"0190{i:012d}",
+        "retexture_task_id": None,
+    }
+
+
+def _measure_memory(build, payloads) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = [build(p) for p in payloads]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return (after - before) / len(payloads)
+
+
+def _throughput(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20000)
+    args = parser.parse_args()
+
+    samples = [_sample_job(i) for i in range(args.jobs)]
+    legacy_blobs = [json.dumps(s, indent=2, default=str) for s in samples]
+    records = [JobRecord.from_dict(s) for s in samples]
+    record_blobs = [r.to_json() for r in records]
+
+    result = {
+        "jobs": args.jobs,
+        "bytes_per_job": {
+            "dict": round(_measure_memory(json.loads, legacy_blobs)),
+            "record": round(_measure_memory(JobRecord.from_json, record_blobs)),
+        },
+        "serialized_size": {
+            "dict_json": sum(map(len, legacy_blobs)) // args.jobs,
+            "record_orjson": sum(map(len, record_blobs)) // args.jobs,
+        },
+        "dumps_per_sec": {
+            "dict_json": round(_throughput(lambda s: json.dumps(s, indent=2, default=str), samples)),
+            "record_orjson": round(_throughput(JobRecord.to_json, records)),
+        },
+        "loads_per_sec": {
+            "dict_json": round(_throughput(json.loads, legacy_blobs)),
+            "record_orjson": round(_throughput(JobRecord.from_json, record_blobs)),
+        },
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Status polling cost: plain polls vs conditional (ETag) polls vs long-polls.
+
+Starts the Meshy emulator and the backend, creates one job generating for
+--seconds, and lets --clients clients follow it until it completes.
+``poll`` GETs /status every --poll-interval seconds, ``conditional`` does
+the same with If-None-Match, and ``long_poll`` keeps one
+?wait=30&since=<version> request open at a time. Reported per mode:
+requests, full (200) responses, response bytes, the backend's CPU seconds
+(utime + stime from /proc) and how long after the job's SSE event a client
+saw each new version.
+
+    python -m benchmarks.bench_longpoll --clients 200 --seconds 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.bench_storage import _cpu_seconds
+from benchmarks.loadtest import API_KEY, _spawn, _test_image, _wait_ready
+
+EMULATOR_PORT = 8089
+BACKEND_PORT = 8088
+MODES = ("poll", "conditional", "long_poll")
+
+
+def _version(response: httpx.Response) -> int:
+    return int(response.headers["etag"].removeprefix("W/").strip('"'))
+
+
+async def _client(client: httpx.AsyncClient, job_id: str, mode: str, poll_interval: float,
+                  published_at: dict, stats: dict):
+    version = None
+    while True:
+        headers, params = {}, {}
+        if mode == "conditional" and version is not None:
+            headers["If-None-Match"] = f'W/"{version}"'
+        if mode == "long_poll" and version is not None:
+            params = {"since": version, "wait": 30}
+        response = await client.get(f"/api/jobs/{job_id}/status", headers=headers, params=params)
+        stats["requests"] += 1
+        stats["bytes"] += len(response.content)
+        if response.status_code == 200:
+            stats["full"] += 1
+            version = _version(response)
+            if version in published_at:
+                stats["delays"].append(time.perf_counter() - published_at[version])
+            if response.json()["status"] in ("completed", "failed"):
+                return
+        elif response.status_code != 304:
+            raise RuntimeError(f"Unexpected status {response.status_code}")
+        if mode != "long_poll":
+            await asyncio.sleep(poll_interval)
+
+
+async def _follow_events(client: httpx.AsyncClient, job_id: str, published_at: dict):
+    """Reference: when each version was pushed over SSE."""
+    async with client.stream("GET", f"/api/jobs/{job_id}/stream", timeout=None) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                event = json.loads(line[6:])
+                published_at.setdefault(event.get("version"), time.perf_counter())
+
+
+async def _run_mode(mode: str, args) -> dict:
+    emulator = _spawn(["benchmarks.meshy_emulator:app", "--port", str(EMULATOR_PORT)], {
+        "EMULATOR_QUEUE_SECONDS": "1",
+        "EMULATOR_GENERATION_SECONDS": str(args.seconds),
+        "EMULATOR_GLB_SIZE_MB": "0.1",
+    })
+    backend = _spawn(["app.main:app", "--port", str(BACKEND_PORT)], {
+        "MESHY_API_URL": f"http://127.0.0.1:{EMULATOR_PORT}/v1",
+        "MESHY_API_KEY": "emulator",
+        "PROTOSCALE_API_KEY": API_KEY,
+        "PRELOAD_HEAVY_MODULES": "false",
+    })
+    stats = {"requests": 0, "full": 0, "bytes": 0, "delays": []}
+    published_at: dict = {}
+    try:
+        await _wait_ready(f"http://127.0.0.1:{EMULATOR_PORT}/stats")
+        await _wait_ready(f"http://127.0.0.1:{BACKEND_PORT}/health")
+        limits = httpx.Limits(max_connections=args.clients + 8)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{BACKEND_PORT}", headers={"X-API-Key": API_KEY},
+                                     limits=limits, timeout=60) as client:
+            response = await client.post("/api/upload", files={"files": ("input.png", _test_image(), "image/png")},
+                                         data={"remove_bg": "false"})
+            response.raise_for_status()
+            job_id = response.json()["job_id"]
+            events = asyncio.create_task(_follow_events(client, job_id, published_at))
+            cpu_started = _cpu_seconds(backend.pid)
+            started = time.perf_counter()
+            (await client.post(f"/api/jobs/{job_id}/generate-3d", json={})).raise_for_status()
+            await asyncio.gather(*(_client(client, job_id, mode, args.poll_interval, published_at, stats)
+                                   for _ in range(args.clients)))
+            elapsed = time.perf_counter() - started
+            cpu = _cpu_seconds(backend.pid) - cpu_started
+            events.cancel()
+            await asyncio.gather(events, return_exceptions=True)
+    finally:
+        for process in (backend, emulator):
+            process.terminate()
+            process.wait()
+
+    delays = stats.pop("delays")
+    return {
+        "mode": mode,
+        "clients": args.clients,
+        **stats,
+        "versions": len(published_at),
+        "seconds": round(elapsed, 1),
+        "api_cpu_s": round(cpu, 2),
+        "see_update_p50_ms": round(statistics.median(delays) * 1000, 1) if delays else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=20.0, help="Emulated generation time")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+    for mode in args.modes.split(","):
+        print(json.dumps(asyncio.run(_run_mode(mode, args))))
+
+
+if __name__ == "__main__":
+    main()
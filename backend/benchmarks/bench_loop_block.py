@@ -0,0 +1,163 @@
+"""Status-endpoint latency while a large delete or history listing runs.
+
+Pollers hit GET /api/jobs/{id}/status continuously while one request
+deletes a big job (``--scenario delete``) or lists a large history
+(``--scenario history``). ``--legacy`` runs the filesystem work inline on
+the event loop, as the handlers did before the I/O executor.
+
+    python -m benchmarks.bench_loop_block --scenario delete --delete-mb 1024
+    python -m benchmarks.bench_loop_block --scenario history --history-jobs 5000 --legacy
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("MESHY_API_KEY", "benchmark")
+
+import httpx
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+from app.main import app
+from app.routers import jobs as jobs_router
+from app.services import assets
+from app.workers import task_queue
+
+JOB_ID = "bench-loop-status"
+DELETE_JOB_ID = "bench-loop-delete"
+
+
+async def _inline_io(fn, *args):
+    return fn(*args)
+
+
+def _make_delete_job(root: Path, size_mb: int, file_mb: int):
+    output_dir = root / "outputs" / DELETE_JOB_ID
+    output_dir.mkdir(parents=True)
+    chunk = os.urandom(1024 * 1024)
+    for i in range(max(1, size_mb // file_mb)):
+        with open(output_dir / f"part_{i}.bin", "wb") as f:
+            for _ in range(file_mb):
+                f.write(chunk)
+    (root / "uploads" / DELETE_JOB_ID).mkdir(parents=True)
+
+
+def _make_history(root: Path, count: int):
+    for i in range(count):
+        job_id = f"bench-history-{i:06d}"
+        output_dir = root / "outputs" / job_id
+        output_dir.mkdir(parents=True)
+        (output_dir / "model.glb").write_bytes(b"glTF")
+        upload_dir = root / "uploads" / job_id
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "settings.json").write_text(json.dumps({"quality_preset": "v3", "model_version": "v3"}))
+
+
+async def _poll(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list, period: float):
+    """Fixed-rate poller; latency counts from the scheduled send time, so a
+    stalled loop shows up even when no request is in flight during the stall."""
+    url = f"/api/jobs/{JOB_ID}/status"
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        delay = scheduled - time.perf_counter()
+        await asyncio.sleep(max(delay, 0))
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - scheduled)
+        if response.status_code != 200:
+            raise RuntimeError(f"Unexpected status {response.status_code}")
+        scheduled += period
+
+
+async def run(scenario: str, pollers: int, repeat: int, period: float) -> dict:
+    baseline: list[float] = []
+    during: list[float] = []
+    operation_times: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Baseline: pollers alone
+        stop = asyncio.Event()
+        tasks = [asyncio.create_task(_poll(client, stop, baseline, period)) for _ in range(pollers)]
+        await asyncio.sleep(1.0)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+        stop = asyncio.Event()
+        tasks = [asyncio.create_task(_poll(client, stop, during, period)) for _ in range(pollers)]
+        await asyncio.sleep(0.2)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            if scenario == "delete":
+                response = await client.delete(f"/api/jobs/{DELETE_JOB_ID}")
+            else:
+                response = await client.get("/api/jobs")
+            operation_times.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f"{scenario} returned {response.status_code}")
+        await asyncio.sleep(0.2)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    def summary(values):
+        values = sorted(values)
+        return {
+            "requests": len(values),
+            "p50_ms": round(statistics.median(values) * 1000, 2),
+            "p99_ms": round(values[max(0, int(len(values) * 0.99) - 1)] * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+
+    return {
+        "baseline": summary(baseline),
+        "during": summary(during),
+        "operation_ms": round(statistics.median(operation_times) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=("delete", "history"), default="delete")
+    parser.add_argument("--delete-mb", type=int, default=1024)
+    parser.add_argument("--file-mb", type=int, default=16, help="Size of each file in the deleted job")
+    parser.add_argument("--history-jobs", type=int, default=5000)
+    parser.add_argument("--pollers", type=int, default=8)
+    parser.add_argument("--period-ms", type=float, default=20.0, help="Interval between each poller's requests")
+    parser.add_argument("--legacy", action="store_true", help="Run filesystem work on the event loop")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-loop-", dir=os.getenv("BENCH_TMPDIR")))
+    (root / "outputs").mkdir()
+    (root / "uploads").mkdir()
+    for module in (jobs_router, assets, task_queue):
+        module.UPLOADS_DIR = root / "uploads"
+    for module in (jobs_router, assets):
+        module.OUTPUTS_DIR = root / "outputs"
+    task_queue._ACTIVE_JOBS_PATH = root / "active_jobs.json"
+    if args.legacy:
+        jobs_router.run_io = _inline_io
+
+    try:
+        task_queue.create_job(JOB_ID, str(root / "uploads" / JOB_ID / "original_0.png"), {})
+        if args.scenario == "delete":
+            _make_delete_job(root, args.delete_mb, args.file_mb)
+            repeat = 1
+        else:
+            _make_history(root, args.history_jobs)
+            repeat = 3
+        result = asyncio.run(run(args.scenario, args.pollers, repeat, args.period_ms / 1000))
+    finally:
+        task_queue.shutdown_io_executor()
+        shutil.rmtree(root, ignore_errors=True)
+
+    result.update(scenario=args.scenario, mode="inline" if args.legacy else "io-executor", pollers=args.pollers)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Print export: conversion time on large meshes and cache-hit latency.
+
+Writes a --faces triangle GLB (a subdivided icosphere) as the model of a
+history job in a temporary storage dir, serves the jobs router with uvicorn
+in this process and requests each format once cold (conversion in the
+worker pool) and --hits times warm, timing each request to its response
+headers (the download itself is the same for both). While the cold request
+runs, a probe task measures event loop lag, which stays low because
+conversion runs in another process.
+
+    python -m benchmarks.bench_print --faces 1000000 --formats stl,3mf,obj --repair
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import shutil
+import socket
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+os.environ.setdefault("MESHY_API_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_PRINT", "1000/hour")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.middleware.auth import API_KEY
+from app.routers import jobs
+from app.services import assets, print_export
+from app.workers import storage_gc, task_queue
+
+
+def _write_model(path: Path, faces: int) -> int:
+    import trimesh
+
+    # An icosphere has 20 * 4^n faces
+    subdivisions = max(1, round(math.log(faces / 20, 4)))
+    mesh = trimesh.creation.icosphere(subdivisions=subdivisions, radius=0.5)
+    path.parent.mkdir(parents=True)
+    mesh.export(path)
+    return len(mesh.faces)
+
+
+async def _lag_probe(done: asyncio.Event, lags: list):
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - started - 0.01)
+
+
+async def _request(client: httpx.AsyncClient, url: str) -> tuple:
+    """Seconds until the response headers (conversion done or cache hit), and the response."""
+    started = time.perf_counter()
+    async with client.stream("GET", url) as response:
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        await response.aread()
+    return elapsed, response
+
+
+async def _bench_format(client: httpx.AsyncClient, url: str, hits: int) -> dict:
+    done = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(_lag_probe(done, lags))
+    cold_s, response = await _request(client, url)
+    done.set()
+    await probe
+    assert response.headers["x-print-cache"] == "miss"
+
+    warm = []
+    for _ in range(hits):
+        elapsed, hit = await _request(client, url)
+        assert hit.headers["x-print-cache"] == "hit"
+        warm.append(elapsed)
+    return {
+        "cold_s": round(cold_s, 2),
+        "bytes": len(response.content),
+        "watertight": response.headers["x-print-watertight"],
+        "loop_lag_max_ms": round(max(lags) * 1000, 1),
+        "hit_p50_ms": round(statistics.median(warm) * 1000, 2),
+        "hit_max_ms": round(max(warm) * 1000, 2),
+    }
+
+
+async def _run(port: int, job_id: str, args) -> dict:
+    app = FastAPI()
+    app.include_router(jobs.router)
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    results = {}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", headers={"X-API-Key": API_KEY},
+                                     timeout=None) as client:
+            for fmt in args.formats.split(","):
+                query = f"size_mm={args.size_mm}&repair={str(args.repair).lower()}"
+                results[fmt] = await _bench_format(client, f"/api/jobs/{job_id}/print/{fmt}?{query}", args.hits)
+    finally:
+        server.should_exit = True
+        await serve_task
+        print_export.shutdown_print_pool()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=1_000_000)
+    parser.add_argument("--formats", default="stl,3mf,obj")
+    parser.add_argument("--size-mm", type=float, default=120)
+    parser.add_argument("--repair", action="store_true")
+    parser.add_argument("--hits", type=int, default=50)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-print-", dir=os.getenv("BENCH_TMPDIR")))
+    for module in (task_queue, assets, jobs, print_export, storage_gc):
+        if hasattr(module, "UPLOADS_DIR"):
+            module.UPLOADS_DIR = root / "uploads"
+        if hasattr(module, "OUTPUTS_DIR"):
+            module.OUTPUTS_DIR = root / "outputs"
+    task_queue._ACTIVE_JOBS_PATH = root / "active_jobs.json"
+    storage_gc._LEDGER_PATH = root / "storage_usage.json"
+    try:
+        job_id = str(uuid.uuid4())
+        faces = _write_model(root / "outputs" / job_id / "model.glb", args.faces)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        results = asyncio.run(_run(port, job_id, args))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(json.dumps({"faces": faces, "repair": args.repair, "size_mm": args.size_mm, "formats": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Time to first visible model with and without progressive generation.
+
+Runs the same jobs through MeshyService against the emulator twice: once
+as a single full-quality task, once with ``progressive`` (low-poly
+untextured preview submitted alongside). Reports, per mode, the time from
+submission to the first loadable GLB (``preview_ready`` or completion) and
+to the final model.
+
+    python -m benchmarks.bench_progressive --jobs 4 --generation-seconds 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.loadtest import _spawn, _test_image, _wait_ready
+
+EMULATOR_PORT = 8096
+os.environ.update(MESHY_API_KEY="emulator", MESHY_API_URL=f"http://127.0.0.1:{EMULATOR_PORT}/v1")
+
+from app.services import assets, meshy
+from app.services.meshy import meshy_service
+from app.workers import render_queue, task_queue
+from app.workers.task_queue import create_job, update_job, subscribe_job_events
+
+
+async def _run_job(job_id: str) -> dict:
+    events = subscribe_job_events(job_id)
+    started = time.perf_counter()
+    await meshy_service.submit_job(job_id)
+    first_model = None
+    while True:
+        event = await events.get()
+        if event.get("type") == "preview_ready" and first_model is None:
+            first_model = time.perf_counter() - started
+        if event.get("status") in ("completed", "failed"):
+            final = time.perf_counter() - started
+            return {
+                "status": event["status"],
+                "first_model": first_model if first_model is not None else final,
+                "final": final,
+                "preview_status": event.get("preview_status"),
+            }
+
+
+async def run(job_count: int, progressive: bool, root: Path) -> dict:
+    image = _test_image()
+    job_ids = []
+    for i in range(job_count):
+        job_id = f"bench-{'progressive' if progressive else 'single'}-{i:03d}"
+        image_path = root / "uploads" / job_id / "original_0.png"
+        image_path.parent.mkdir(parents=True)
+        image_path.write_bytes(image)
+        create_job(job_id, str(image_path), {"progressive": progressive})
+        update_job(job_id, status="queued")
+        job_ids.append(job_id)
+
+    meshy_service.start_polling()
+    try:
+        results = await asyncio.gather(*(_run_job(job_id) for job_id in job_ids))
+    finally:
+        meshy_service.stop_polling()
+
+    def p50(key):
+        return round(statistics.median(r[key] for r in results), 1)
+
+    return {
+        "mode": "progressive" if progressive else "single",
+        "completed": sum(r["status"] == "completed" for r in results),
+        "first_model_p50_s": p50("first_model"),
+        "final_p50_s": p50("final"),
+        "preview_statuses": sorted({str(r["preview_status"]) for r in results}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--generation-seconds", type=float, default=20.0)
+    parser.add_argument("--fast-variant-factor", type=float, default=0.3)
+    args = parser.parse_args()
+
+    emulator = _spawn(["benchmarks.meshy_emulator:app", "--port", str(EMULATOR_PORT)], {
+        "EMULATOR_QUEUE_SECONDS": "2",
+        "EMULATOR_GENERATION_SECONDS": str(args.generation_seconds),
+        "EMULATOR_FAST_VARIANT_FACTOR": str(args.fast_variant_factor),
+        "EMULATOR_GLB_SIZE_MB": "1",
+    })
+    root = Path(tempfile.mkdtemp(prefix="bench-progressive-", dir=os.getenv("BENCH_TMPDIR")))
+    (root / "uploads").mkdir()
+    (root / "outputs").mkdir()
+    task_queue.UPLOADS_DIR = assets.UPLOADS_DIR = root / "uploads"
+    task_queue._ACTIVE_JOBS_PATH = root / "active_jobs.json"
+    for module in (assets, render_queue, meshy):
+        module.OUTPUTS_DIR = root / "outputs"
+    results = []
+    try:
+        asyncio.run(_wait_ready(f"http://127.0.0.1:{EMULATOR_PORT}/stats"))
+        for progressive in (False, True):
+            results.append(asyncio.run(run(args.jobs, progressive, root)))
+    finally:
+        emulator.terminate()
+        emulator.wait(timeout=10)
+        render_queue.shutdown_render_queue()
+        task_queue.shutdown_io_executor()
+        shutil.rmtree(root, ignore_errors=True)
+
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Rate limiter memory and throughput at 1M distinct clients.
+
+Compares the GCRA limiter (one float per key) with the previous
+per-IP timestamp lists (``--legacy``), then times an idle-key sweep.
+
+    python -m benchmarks.bench_rate_limit --clients 1000000
+    python -m benchmarks.bench_rate_limit --clients 1000000 --legacy
+"""
+import argparse
+import gc
+import json
+import os
+import time
+from collections import defaultdict
+
+os.environ.setdefault("MESHY_API_KEY", "benchmark")
+
+from app.middleware.rate_limit import InMemoryStorage, RateLimit, RateLimiter
+
+API_KEY = "demo-key-CHANGE-THIS-IN-PRODUCTION"
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _client_keys(count: int):
+    for i in range(count):
+        yield f"generate|{API_KEY}|10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+class _LegacyLimiter:
+    """Previous routers/jobs.py limiter: timestamp list per IP, never pruned."""
+
+    def __init__(self):
+        self.timestamps = defaultdict(list)
+
+    def hit(self, key: str, limit: int = 10, window_seconds: int = 3600) -> bool:
+        now = time.time()
+        self.timestamps[key] = [ts for ts in self.timestamps[key] if now - ts < window_seconds]
+        if len(self.timestamps[key]) >= limit:
+            return False
+        self.timestamps[key].append(now)
+        return True
+
+
+def run(clients: int, hits_per_client: int, legacy: bool) -> dict:
+    rate = RateLimit.parse("10/hour")
+    limiter = _LegacyLimiter() if legacy else RateLimiter(InMemoryStorage(max_keys=clients))
+    keys = list(_client_keys(clients))
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    for _ in range(hits_per_client):
+        if legacy:
+            for key in keys:
+                limiter.hit(key)
+        else:
+            for key in keys:
+                limiter.hit(key, rate)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    rss_after = _rss_bytes()
+
+    total = clients * hits_per_client
+    result = {
+        "mode": "legacy-lists" if legacy else "gcra",
+        "clients": clients,
+        "hits": total,
+        "hits_per_second": round(total / elapsed),
+        "memory_mb": round((rss_after - rss_before) / 2**20, 1),
+        "bytes_per_client": round((rss_after - rss_before) / clients, 1),
+    }
+
+    if not legacy:
+        # Every key is idle once its TAT has passed
+        started = time.perf_counter()
+        evicted = sum(limiter.storage.sweep(limiter.clock() + rate.period))
+        result["sweep_seconds"] = round(time.perf_counter() - started, 3)
+        result["swept_keys"] = evicted
+        result["keys_after_sweep"] = len(limiter.storage)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    parser.add_argument("--hits-per-client", type=int, default=3)
+    parser.add_argument("--legacy", action="store_true", help="Use the previous timestamp-list limiter")
+    args = parser.parse_args()
+    print(json.dumps(run(args.clients, args.hits_per_client, args.legacy)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Adaptive vs full-resolution background removal: speed and mask agreement.
+
+Runs every image in a fixture directory through rembg twice with the same
+session: once at full resolution (REMBG_MODE=full) and once through the
+adaptive path (reduced-scale JPEG decode, mask at --mask-size, guided
+upscaling onto an output capped at --max-side). Reports per-image and mean
+wall time plus the IoU of the two alpha masks (thresholded at 0.5, full mask
+resampled to the adaptive output size).
+
+Without --fixtures a set of synthetic 12/24/48 MP JPEGs is generated; real
+phone photos are the more meaningful input for the IoU figure.
+
+    python -m benchmarks.bench_rembg --fixtures ~/photos --model u2net
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.services import image_processor
+
+_SIZES_MP = (12, 24, 48)
+
+
+def _generate_fixtures(root: Path) -> list[Path]:
+    rng = np.random.default_rng(0)
+    paths = []
+    for mp in _SIZES_MP:
+        height = int((mp * 1e6 * 3 / 4) ** 0.5)
+        width = height * 4 // 3
+        noise = rng.integers(90, 170, (height // 8, width // 8, 3), dtype=np.uint8)
+        img = Image.fromarray(noise).resize((width, height), Image.Resampling.BICUBIC)
+        draw = ImageDraw.Draw(img)
+        draw.ellipse((width * 0.3, height * 0.2, width * 0.7, height * 0.85), fill=(200, 60, 40))
+        draw.rectangle((width * 0.45, height * 0.05, width * 0.55, height * 0.3), fill=(40, 80, 200))
+        path = root / f"synthetic_{mp}mp.jpg"
+        img.filter(ImageFilter.GaussianBlur(2)).save(path, quality=92)
+        paths.append(path)
+    return paths
+
+
+def _iou(full_mask: Image.Image, adaptive_mask: Image.Image) -> float:
+    full = np.asarray(full_mask.resize(adaptive_mask.size, Image.Resampling.BOX)) >= 128
+    adaptive = np.asarray(adaptive_mask) >= 128
+    union = np.logical_or(full, adaptive).sum()
+    return float(np.logical_and(full, adaptive).sum() / union) if union else 1.0
+
+
+def _run_image(path: Path, session, max_side: int) -> dict:
+    from rembg import remove
+
+    started = time.perf_counter()
+    full = remove(image_processor._open_scaled(str(path), 0), session=session)
+    full_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    img = image_processor._fit(image_processor._open_scaled(str(path), max_side), max_side)
+    adaptive = image_processor.adaptive_remove(img, session)
+    adaptive_s = time.perf_counter() - started
+
+    return {
+        "image": path.name,
+        "input": "x".join(map(str, Image.open(path).size)),
+        "output": "x".join(map(str, adaptive.size)),
+        "full_s": round(full_s, 2),
+        "adaptive_s": round(adaptive_s, 2),
+        "iou": round(_iou(full.getchannel("A"), adaptive.getchannel("A")), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, help="Directory of JPEG/PNG images (default: synthetic)")
+    parser.add_argument("--model", default=image_processor.REMBG_MODEL)
+    parser.add_argument("--mask-size", type=int, default=image_processor.REMBG_MASK_SIZE)
+    parser.add_argument("--max-side", type=int, default=image_processor.REMBG_MAX_OUTPUT_SIDE)
+    args = parser.parse_args()
+
+    from rembg import new_session
+
+    image_processor.REMBG_MASK_SIZE = args.mask_size
+    session = new_session(args.model)
+    root = None
+    if args.fixtures:
+        paths = sorted(p for p in args.fixtures.iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    else:
+        root = Path(tempfile.mkdtemp(prefix="bench-rembg-", dir=os.getenv("BENCH_TMPDIR")))
+        paths = _generate_fixtures(root)
+    try:
+        # First inference pays for ONNX graph optimization; keep it out of the timings
+        image_processor.adaptive_remove(Image.new("RGB", (320, 320)), session)
+        results = [_run_image(path, session, args.max_side) for path in paths]
+    finally:
+        if root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    for result in results:
+        print(json.dumps(result))
+    print(json.dumps({
+        "model": args.model,
+        "images": len(results),
+        "mask_size": args.mask_size,
+        "max_side": args.max_side,
+        "full_mean_s": round(statistics.mean(r["full_s"] for r in results), 2),
+        "adaptive_mean_s": round(statistics.mean(r["adaptive_s"] for r in results), 2),
+        "iou_mean": round(statistics.mean(r["iou"] for r in results), 4),
+        "iou_min": min(r["iou"] for r in results),
+    }))
+
+
+if __name__ == "__main__":
+    main()
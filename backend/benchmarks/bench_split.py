@@ -0,0 +1,184 @@
+"""Time to first render: monolithic GLB vs split-asset glTF.
+
+Repackages a GLB with gltf_split, then downloads both forms from a local
+server that shares a fixed bandwidth across all connections and adds a
+round-trip delay per request. The client opens up to 6 connections like a
+browser. Reported per bandwidth:
+
+- ``glb``: the whole GLB (nothing renders before it is complete)
+- ``split.first_render_s``: model_lo.gltf, then model.bin and the texture
+  placeholders in parallel (geometry with placeholder textures)
+- ``split.textured_s``: additionally model.gltf and the full textures
+
+Without --glb a textured icosphere fixture is generated (3 noise textures,
+like Meshy's base color / metallic-roughness / normal maps).
+
+    python -m benchmarks.bench_split --mbps 20,100 --texture-size 2048
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from app.services.gltf_split import split_glb
+
+CHUNK = 16 * 1024
+
+
+def _fixture(path: Path, subdivisions: int, texture_size: int):
+    import numpy as np
+    import trimesh
+    from PIL import Image
+
+    mesh = trimesh.creation.icosphere(subdivisions=subdivisions)
+    v = mesh.vertices
+    uv = np.stack([np.arctan2(v[:, 1], v[:, 0]) / (2 * np.pi) + 0.5, v[:, 2] * 0.5 + 0.5], 1)
+    rng = np.random.default_rng(0)
+
+    def texture():
+        return Image.fromarray(rng.integers(0, 255, (texture_size, texture_size, 3), dtype=np.uint8))
+
+    material = trimesh.visual.material.PBRMaterial(
+        baseColorTexture=texture(), metallicRoughnessTexture=texture(), normalTexture=texture())
+    mesh.visual = trimesh.visual.TextureVisuals(uv=uv, material=material)
+    path.write_bytes(mesh.export(file_type="glb"))
+
+
+class _Link:
+    """Token bucket shared by every response: the client's downlink."""
+
+    # Idle credit, so sleep overshoot is made up instead of lowering the rate
+    BURST_S = 0.05
+
+    def __init__(self, mbps: float):
+        self.bytes_per_s = mbps * 1e6 / 8
+        self.next_free = 0.0
+
+    async def send(self, size: int):
+        now = time.perf_counter()
+        self.next_free = max(self.next_free, now - self.BURST_S) + size / self.bytes_per_s
+        if self.next_free > now:
+            await asyncio.sleep(self.next_free - now)
+
+
+def _app(root: Path, link_ref: list, rtt: float) -> Starlette:
+    async def serve(request):
+        path = root / request.path_params["name"]
+        if not path.is_file():
+            return Response(status_code=404)
+        await asyncio.sleep(rtt)
+        data = path.read_bytes()
+
+        async def body():
+            for offset in range(0, len(data), CHUNK):
+                chunk = data[offset:offset + CHUNK]
+                await link_ref[0].send(len(chunk))
+                yield chunk
+        return StreamingResponse(body(), headers={"Content-Length": str(len(data))})
+
+    return Starlette(routes=[Route("/{name}", serve)])
+
+
+async def _fetch(client: httpx.AsyncClient, base: str, uri: str) -> bytes:
+    response = await client.get(f"{base}/{uri.split('?')[0]}")
+    response.raise_for_status()
+    return response.content
+
+
+async def _measure(base: str) -> dict:
+    limits = httpx.Limits(max_connections=6)
+    async with httpx.AsyncClient(limits=limits, timeout=600) as client:
+        started = time.perf_counter()
+        glb = await _fetch(client, base, "model.glb")
+        glb_s = time.perf_counter() - started
+
+    async with httpx.AsyncClient(limits=limits, timeout=600) as client:
+        started = time.perf_counter()
+        lo = json.loads(await _fetch(client, base, "model_lo.gltf"))
+        buffers = [b["uri"] for b in lo.get("buffers", ())]
+        placeholders = [i["uri"] for i in lo.get("images", ()) if i.get("uri")]
+        await asyncio.gather(*(_fetch(client, base, uri) for uri in buffers + placeholders))
+        first_render = time.perf_counter() - started
+        full = json.loads(await _fetch(client, base, "model.gltf"))
+        textures = [i["uri"] for i in full.get("images", ()) if i.get("uri")]
+        await asyncio.gather(*(_fetch(client, base, uri) for uri in textures))
+        textured = time.perf_counter() - started
+
+    return {
+        "glb_s": round(glb_s, 2),
+        "glb_mb": round(len(glb) / 1e6, 1),
+        "split": {"first_render_s": round(first_render, 2), "textured_s": round(textured, 2)},
+    }
+
+
+async def run(root: Path, bandwidths: list, rtt: float) -> list:
+    link_ref = [None]
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(_app(root, link_ref, rtt), port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    results = []
+    try:
+        for mbps in bandwidths:
+            link_ref[0] = _Link(mbps)
+            results.append({"mbps": mbps, **await _measure(f"http://127.0.0.1:{port}")})
+    finally:
+        server.should_exit = True
+        await serve_task
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--glb", type=Path, help="GLB to test (default: generated fixture)")
+    parser.add_argument("--subdivisions", type=int, default=6)
+    parser.add_argument("--texture-size", type=int, default=2048)
+    parser.add_argument("--mbps", default="20,100", help="Comma-separated downlink bandwidths")
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-split-", dir=os.getenv("BENCH_TMPDIR")))
+    try:
+        glb_path = root / "model.glb"
+        if args.glb:
+            shutil.copy(args.glb, glb_path)
+        else:
+            _fixture(glb_path, args.subdivisions, args.texture_size)
+        started = time.perf_counter()
+        names = split_glb(glb_path, root)
+        split_s = time.perf_counter() - started
+        if names is None:
+            raise SystemExit("GLB layout not supported by gltf_split")
+        sizes = {name: (root / name).stat().st_size for name in names}
+        bandwidths = [float(x) for x in args.mbps.split(",")]
+        results = asyncio.run(run(root, bandwidths, args.rtt_ms / 1000))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(json.dumps({
+        "split_seconds": round(split_s, 2),
+        "geometry_mb": round(sizes["model.bin"] / 1e6, 2),
+        "placeholders_kb": round(sum(v for k, v in sizes.items() if "_lo." in k) / 1e3, 1),
+        "textures_mb": round(sum(v for k, v in sizes.items() if re.match(r"model_tex\d+\.", k)) / 1e6, 1),
+    }))
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
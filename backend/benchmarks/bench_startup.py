@@ -0,0 +1,89 @@
+"""Time-to-first-request with a large job history.
+
+Builds N job_state.json files (1% in-flight) in a temp dir, then measures
+app startup (lifespan) plus the first status request for a historical job.
+Run each mode in its own process:
+
+    python -m benchmarks.bench_startup --jobs 10000
+    python -m benchmarks.bench_startup --jobs 10000 --eager
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("MESHY_API_KEY", "benchmark")
+os.environ.setdefault("JOB_CACHE_WARM_DELAY", "3600")  # keep the warmer out of the measurement
+
+import httpx
+
+from app import main
+from app.services.meshy import meshy_service
+from app.workers import task_queue
+from app.workers.job_record import JobRecord
+
+
+def _build_history(root: Path, count: int) -> list[str]:
+    uploads = root / "uploads"
+    job_ids = []
+    active = []
+    for i in range(count):
+        job_id = f"bench-{i:06d}"
+        status = "processing" if i % 100 == 0 else "completed"
+        record = JobRecord(job_id=job_id, status=status, progress=100, stage="completed",
+                           image_path=str(uploads / job_id / "nobg_0.png"),
+                           settings={"ai_model": "meshy-6", "should_texture": True},
+                           created_at="2026-01-01T00:00:00")
+        job_dir = uploads / job_id
+        job_dir.mkdir(parents=True)
+        (job_dir / "job_state.json").write_bytes(record.to_json())
+        job_ids.append(job_id)
+        if status == "processing":
+            active.append(job_id)
+    (root / "active_jobs.json").write_text(json.dumps(active))
+    return job_ids
+
+
+async def _measure(historical_job_id: str) -> dict:
+    started = time.perf_counter()
+    async with main.lifespan(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get(f"/api/jobs/{historical_job_id}/status")
+        first = time.perf_counter()
+        assert response.status_code == 200, response.status_code
+        return {
+            "startup_ms": round((ready - started) * 1000, 1),
+            "first_request_ms": round((first - ready) * 1000, 2),
+            "time_to_first_request_ms": round((first - started) * 1000, 1),
+            "jobs_in_memory": len(task_queue.jobs),
+        }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--eager", action="store_true", help="Full restore at startup (previous behaviour)")
+    args = parser.parse_args()
+
+    meshy_service.start_polling = lambda: None
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        job_ids = _build_history(root, args.jobs)
+        task_queue.UPLOADS_DIR = root / "uploads"
+        task_queue._ACTIVE_JOBS_PATH = root / "active_jobs.json"
+        if args.eager:
+            main.restore_active_jobs = task_queue.restore_jobs_from_disk
+
+        result = asyncio.run(_measure(job_ids[-1]))
+
+    result.update(jobs=args.jobs, mode="eager" if args.eager else "lazy")
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,105 @@
+"""Throughput of GET /api/jobs/{id}/status under concurrent load.
+
+Compares the current lock-free snapshot reads against the previous
+lock + deepcopy reads (``--legacy`` patches the router's get_job).
+
+    python -m benchmarks.bench_status --concurrency 64 --seconds 10
+    python -m benchmarks.bench_status --concurrency 64 --seconds 10 --legacy
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import shutil
+import statistics
+import threading
+import time
+
+os.environ.setdefault("MESHY_API_KEY", "benchmark")
+
+import httpx
+
+from app.config import UPLOADS_DIR
+from app.main import app
+from app.routers import jobs as jobs_router
+from app.workers import task_queue
+
+JOB_ID = "bench-status-job"
+_legacy_lock = threading.RLock()
+_legacy_jobs: dict[str, dict] = {}
+
+
+def _legacy_get_job(job_id: str):
+    """Previous behaviour: deepcopy of a plain dict under the store lock."""
+    with _legacy_lock:
+        job = _legacy_jobs.get(job_id)
+        if job:
+            return copy.deepcopy(job)
+    return None
+
+
+def _seed_job():
+    paths = [str(UPLOADS_DIR / JOB_ID / f"nobg_{i}.png") for i in range(4)]
+    task_queue.create_job(JOB_ID, paths[0], {
+        "remove_bg": True, "ai_model": "meshy-6", "should_texture": True, "enable_pbr": True,
+        "quality_preset": "v3", "model_type": "standard", "symmetry_mode": "auto",
+        "all_image_paths": paths,
+    })
+    task_queue.update_job(JOB_ID, status="processing", stage="geometry", progress=42,
+                          meshy_task_id="0190-bench", meshy_endpoint_type="multi-image-to-3d",
+                          asset_manifest={"files": {f"view_{i}.png": {"path": p, "size": 1, "version": "1-1"}
+                                                    for i, p in enumerate(paths)}, "thumbnail": None})
+
+
+async def _worker(client: httpx.AsyncClient, deadline: float, latencies: list):
+    url = f"/api/jobs/{JOB_ID}/status"
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"Unexpected status {response.status_code}")
+
+
+async def run(concurrency: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        await asyncio.gather(*[_worker(client, deadline, latencies) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--legacy", action="store_true", help="Use lock + deepcopy reads")
+    args = parser.parse_args()
+
+    if args.legacy:
+        jobs_router.get_job = _legacy_get_job
+
+    _seed_job()
+    _legacy_jobs[JOB_ID] = json.loads(task_queue.jobs[JOB_ID].to_json())
+    try:
+        result = asyncio.run(run(args.concurrency, args.seconds))
+    finally:
+        shutil.rmtree(UPLOADS_DIR / JOB_ID, ignore_errors=True)
+
+    result.update(mode="legacy-deepcopy" if args.legacy else "snapshot", concurrency=args.concurrency)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Model download throughput and API-worker CPU: local vs S3 object storage.
+
+For each backend, starts the Meshy emulator and the backend, runs one job
+through upload -> generate-3d -> completion, then downloads
+``/result/model.glb`` from --concurrency clients for --seconds. With local
+storage the API streams the file; with S3 it answers with a presigned
+redirect and the client fetches the bytes from the bucket. Reported per
+backend: downloads/s, MB/s and the backend process's CPU seconds per GB
+served (utime + stime from /proc).
+
+S3 runs against a moto server started here, or against --s3-endpoint
+(e.g. MinIO: bucket must exist, credentials from AWS_* variables).
+
+    python -m benchmarks.bench_storage --glb-size-mb 20 --concurrency 8 --seconds 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from benchmarks.loadtest import API_KEY, _spawn, _test_image, _wait_ready
+
+EMULATOR_PORT = 8094
+BACKEND_PORT = 8093
+MOTO_PORT = 8092
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 (after pid and comm)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _completed_job(client: httpx.AsyncClient) -> str:
+    response = await client.post("/api/upload", files={"files": ("input.png", _test_image(), "image/png")},
+                                 data={"remove_bg": "false"})
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    (await client.post(f"/api/jobs/{job_id}/generate-3d", json={})).raise_for_status()
+    while True:
+        status = (await client.get(f"/api/jobs/{job_id}/status")).json()
+        if status["status"] in ("completed", "failed"):
+            if status["status"] != "completed":
+                raise RuntimeError(f"Job failed: {status.get('error')}")
+            return job_id
+        await asyncio.sleep(0.25)
+
+
+async def _download_loop(client: httpx.AsyncClient, url: str, deadline: float, totals: Dict[str, int]):
+    while time.perf_counter() < deadline:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(1 << 16):
+                totals["bytes"] += len(chunk)
+        totals["downloads"] += 1
+        totals["redirects"] += bool(response.history)
+
+
+async def _run_backend(name: str, env: Dict[str, str], args) -> dict:
+    emulator = _spawn(["benchmarks.meshy_emulator:app", "--port", str(EMULATOR_PORT)], {
+        "EMULATOR_QUEUE_SECONDS": "0.5",
+        "EMULATOR_GENERATION_SECONDS": "1",
+        "EMULATOR_GLB_SIZE_MB": str(args.glb_size_mb),
+    })
+    backend = _spawn(["app.main:app", "--port", str(BACKEND_PORT)], {
+        "MESHY_API_URL": f"http://127.0.0.1:{EMULATOR_PORT}/v1",
+        "MESHY_API_KEY": "emulator",
+        "PROTOSCALE_API_KEY": API_KEY,
+        "PRELOAD_HEAVY_MODULES": "false",
+        **env,
+    })
+    base_url = f"http://127.0.0.1:{BACKEND_PORT}"
+    try:
+        await _wait_ready(f"http://127.0.0.1:{EMULATOR_PORT}/stats")
+        await _wait_ready(f"{base_url}/health")
+        limits = httpx.Limits(max_connections=args.concurrency * 2 + 4)
+        async with httpx.AsyncClient(base_url=base_url, headers={"X-API-Key": API_KEY}, limits=limits,
+                                     timeout=120, follow_redirects=True) as client:
+            job_id = await _completed_job(client)
+            url = f"/api/jobs/{job_id}/result/model.glb"
+            await client.get(url)  # warm connections and caches
+
+            totals = {"bytes": 0, "downloads": 0, "redirects": 0}
+            cpu_started = _cpu_seconds(backend.pid)
+            started = time.perf_counter()
+            deadline = started + args.seconds
+            await asyncio.gather(*(_download_loop(client, url, deadline, totals) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+            cpu = _cpu_seconds(backend.pid) - cpu_started
+            await client.delete(f"/api/jobs/{job_id}")
+        gigabytes = totals["bytes"] / 1e9
+        return {
+            "backend": name,
+            "downloads_per_s": round(totals["downloads"] / elapsed, 2),
+            "mb_per_s": round(totals["bytes"] / 1e6 / elapsed, 1),
+            "redirected": totals["redirects"] == totals["downloads"],
+            "api_cpu_s": round(cpu, 2),
+            "api_cpu_s_per_gb": round(cpu / gigabytes, 3) if gigabytes else None,
+        }
+    finally:
+        for process in (backend, emulator):
+            process.terminate()
+            process.wait()
+
+
+def _start_moto(port: int) -> subprocess.Popen:
+    import boto3
+
+    process = subprocess.Popen([sys.executable, "-m", "moto.server", "-p", str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    asyncio.run(_wait_ready(f"http://127.0.0.1:{port}/moto-api/"))
+    boto3.client("s3", endpoint_url=f"http://127.0.0.1:{port}", region_name="us-east-1",
+                 aws_access_key_id="bench", aws_secret_access_key="bench").create_bucket(Bucket="bench")
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--glb-size-mb", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--backends", default="local,s3")
+    parser.add_argument("--s3-endpoint", help="Existing S3-compatible endpoint (default: moto server)")
+    parser.add_argument("--s3-bucket", default="bench")
+    args = parser.parse_args()
+
+    moto: Optional[subprocess.Popen] = None
+    s3_env = {"STORAGE_BACKEND": "s3", "S3_BUCKET": args.s3_bucket, "S3_PREFIX": "bench/"}
+    try:
+        for name in args.backends.split(","):
+            env = {"STORAGE_BACKEND": "local"}
+            if name == "s3":
+                if args.s3_endpoint:
+                    env = {**s3_env, "S3_ENDPOINT_URL": args.s3_endpoint}
+                else:
+                    moto = moto or _start_moto(MOTO_PORT)
+                    env = {**s3_env, "S3_ENDPOINT_URL": f"http://127.0.0.1:{MOTO_PORT}",
+                           "AWS_ACCESS_KEY_ID": "bench", "AWS_SECRET_ACCESS_KEY": "bench"}
+            print(json.dumps(asyncio.run(_run_backend(name, env, args))))
+    finally:
+        if moto:
+            moto.terminate()
+            moto.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Meshy submission throughput against a throttling emulator.
+
+Starts the Meshy emulator with a cap on unfinished tasks (and optionally a
+create rate limit and 5xx errors), submits a burst of jobs through the real
+MeshyService and reports completed/failed jobs, throughput next to the
+upstream ceiling, and how many 429s the emulator sent. ``--legacy`` submits
+every job at once and fails it on any non-202, as submit_job did before the
+submission controller. Download/render is skipped so only submission and
+generation are measured.
+
+    python -m benchmarks.bench_submission --jobs 60 --max-active 8
+    python -m benchmarks.bench_submission --jobs 60 --max-active 8 --legacy
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.loadtest import _spawn, _test_image, _wait_ready
+
+EMULATOR_PORT = 8098
+os.environ.update(MESHY_API_KEY="emulator", MESHY_API_URL=f"http://127.0.0.1:{EMULATOR_PORT}/v1")
+
+from app.config import JobStage
+from app.services.meshy import meshy_service
+from app.workers import task_queue
+from app.workers.task_queue import create_job, get_job, update_job
+
+
+async def _finalize_without_download(client, job_id: str, url: str):
+    update_job(job_id, status="completed", stage=JobStage.COMPLETED.value, progress=100)
+
+
+async def _legacy_submit(job_id: str):
+    outcome = await meshy_service._create_task(job_id)
+    if outcome is not None and not outcome.accepted:
+        meshy_service._fail_submission(job_id, outcome.error)
+
+
+async def run(job_count: int, legacy: bool, timeout: float, root: Path) -> dict:
+    image = _test_image()
+    job_ids = []
+    for i in range(job_count):
+        job_id = f"bench-submit-{i:04d}"
+        image_path = root / "uploads" / job_id / "original_0.png"
+        image_path.parent.mkdir(parents=True)
+        image_path.write_bytes(image)
+        create_job(job_id, str(image_path), {})
+        update_job(job_id, status="queued")
+        job_ids.append(job_id)
+
+    meshy_service._download_and_finalize = _finalize_without_download
+    meshy_service.start_polling()
+    started = time.perf_counter()
+    try:
+        if legacy:
+            await asyncio.gather(*(_legacy_submit(job_id) for job_id in job_ids))
+        else:
+            for job_id in job_ids:
+                await meshy_service.submit_job(job_id)
+        while time.perf_counter() - started < timeout:
+            if all(get_job(j).get("status") in ("completed", "failed") for j in job_ids):
+                break
+            await asyncio.sleep(0.5)
+        elapsed = time.perf_counter() - started
+    finally:
+        meshy_service.stop_polling()
+
+    statuses = [get_job(j).get("status") for j in job_ids]
+    completed = statuses.count("completed")
+    return {
+        "mode": "legacy" if legacy else "aimd",
+        "jobs": job_count,
+        "completed": completed,
+        "failed": statuses.count("failed"),
+        "unfinished": job_count - completed - statuses.count("failed"),
+        "seconds": round(elapsed, 1),
+        "jobs_per_minute": round(completed / elapsed * 60, 1),
+        "final_window": meshy_service.submissions.limit.window,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=60)
+    parser.add_argument("--max-active", type=int, default=8, help="Emulator cap on unfinished tasks")
+    parser.add_argument("--create-rate", type=float, default=0.0, help="Emulator creates/second limit")
+    parser.add_argument("--create-error-rate", type=float, default=0.0)
+    parser.add_argument("--generation-seconds", type=float, default=6.0)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--legacy", action="store_true", help="Fail jobs on any non-202, no queueing")
+    args = parser.parse_args()
+
+    emulator = _spawn(["benchmarks.meshy_emulator:app", "--port", str(EMULATOR_PORT)], {
+        "EMULATOR_QUEUE_SECONDS": "1",
+        "EMULATOR_GENERATION_SECONDS": str(args.generation_seconds),
+        "EMULATOR_MAX_ACTIVE_TASKS": str(args.max_active),
+        "EMULATOR_CREATE_RATE_LIMIT": str(args.create_rate),
+        "EMULATOR_CREATE_ERROR_RATE": str(args.create_error_rate),
+        "EMULATOR_RETRY_AFTER_SECONDS": "1",
+        "EMULATOR_GLB_SIZE_MB": "0.1",
+    })
+    root = Path(tempfile.mkdtemp(prefix="bench-submit-", dir=os.getenv("BENCH_TMPDIR")))
+    (root / "uploads").mkdir()
+    task_queue.UPLOADS_DIR = root / "uploads"
+    task_queue._ACTIVE_JOBS_PATH = root / "active_jobs.json"
+    try:
+        stats_url = f"http://127.0.0.1:{EMULATOR_PORT}/stats"
+        asyncio.run(_wait_ready(stats_url))
+        result = asyncio.run(run(args.jobs, args.legacy, args.timeout, root))
+        stats = httpx.get(stats_url).json()
+    finally:
+        emulator.terminate()
+        emulator.wait(timeout=10)
+        task_queue.shutdown_io_executor()
+        shutil.rmtree(root, ignore_errors=True)
+
+    # Upstream ceiling: max_active tasks every (queue + generation) seconds
+    result["upstream_jobs_per_minute"] = round(args.max_active / (1 + args.generation_seconds) * 60, 1)
+    result["upstream_429s"] = stats["throttled"]
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
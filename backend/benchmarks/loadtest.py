@@ -0,0 +1,277 @@
+"""End-to-end load test: upload -> generate-3d -> SSE stream -> result.
+
+Starts the Meshy emulator and the backend (``uvicorn app.main:app``) as
+subprocesses, drives N jobs at the given concurrency and writes a JSON
+report with per-endpoint p50/p95/p99, job throughput, backend event loop
+lag and peak RSS. Pass ``--compare`` to diff against a previous report.
+
+    python -m benchmarks.loadtest --jobs 50 --concurrency 10 --output before.json
+    python -m benchmarks.loadtest --jobs 50 --concurrency 10 --output after.json --compare before.json
+
+Emulator behaviour is set with ``EMULATOR_*`` variables (see
+benchmarks.meshy_emulator); ``--backend-url`` targets an already running
+backend instead of spawning one.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+API_KEY = os.getenv("PROTOSCALE_API_KEY", "demo-key-CHANGE-THIS-IN-PRODUCTION")
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 0.99) * 1000, 2),
+    }
+
+
+def _test_image() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (512, 512), (180, 120, 60)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _spawn(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *args, "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, **env},
+    )
+
+
+async def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+class LoadTest:
+    def __init__(self, base_url: str, jobs: int, concurrency: int, job_timeout: float, keep_jobs: bool):
+        self.base_url = base_url
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.job_timeout = job_timeout
+        self.keep_jobs = keep_jobs
+        self.latencies: Dict[str, List[float]] = {
+            "upload": [], "generate": [], "first_event": [], "stream": [], "result": [], "end_to_end": []}
+        self.outcomes: Dict[str, int] = {"completed": 0, "failed": 0, "error": 0}
+        self.errors: List[str] = []
+        self.image = _test_image()
+
+    async def _timed(self, name: str, coro):
+        started = time.perf_counter()
+        result = await coro
+        self.latencies[name].append(time.perf_counter() - started)
+        return result
+
+    async def _stream_until_done(self, client: httpx.AsyncClient, job_id: str) -> str:
+        started = time.perf_counter()
+        first = True
+        async with client.stream("GET", f"/api/jobs/{job_id}/stream", timeout=self.job_timeout) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if first:
+                    self.latencies["first_event"].append(time.perf_counter() - started)
+                    first = False
+                event = json.loads(line[6:])
+                if event.get("status") in ("completed", "failed"):
+                    self.latencies["stream"].append(time.perf_counter() - started)
+                    return event["status"]
+        return "error"
+
+    async def _run_job(self, client: httpx.AsyncClient):
+        started = time.perf_counter()
+        job_id = None
+        try:
+            response = await self._timed("upload", client.post(
+                "/api/upload",
+                files={"files": ("input.png", self.image, "image/png")},
+                data={"remove_bg": "false"},
+            ))
+            response.raise_for_status()
+            job_id = response.json()["job_id"]
+
+            response = await self._timed("generate", client.post(f"/api/jobs/{job_id}/generate-3d", json={}))
+            response.raise_for_status()
+
+            status = await asyncio.wait_for(self._stream_until_done(client, job_id), self.job_timeout)
+            if status == "completed":
+                response = await self._timed("result", client.get(f"/api/jobs/{job_id}/result/model.glb"))
+                response.raise_for_status()
+                self.latencies["end_to_end"].append(time.perf_counter() - started)
+            self.outcomes[status] += 1
+        except Exception as e:
+            self.outcomes["error"] += 1
+            if len(self.errors) < 20:
+                self.errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            if job_id and not self.keep_jobs:
+                try:
+                    await client.delete(f"/api/jobs/{job_id}")
+                except httpx.HTTPError:
+                    pass
+
+    async def run(self, backend_pid: Optional[int]) -> dict:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        rss_samples: List[int] = []
+        done = asyncio.Event()
+
+        async def sample_rss():
+            while not done.is_set():
+                rss = _rss_bytes(backend_pid)
+                if rss:
+                    rss_samples.append(rss)
+                await asyncio.sleep(0.5)
+
+        async def bounded(client):
+            async with semaphore:
+                await self._run_job(client)
+
+        limits = httpx.Limits(max_connections=self.concurrency * 2 + 4)
+        async with httpx.AsyncClient(base_url=self.base_url, headers={"X-API-Key": API_KEY},
+                                     limits=limits, timeout=60.0) as client:
+            sampler = asyncio.create_task(sample_rss()) if backend_pid else None
+            started = time.perf_counter()
+            await asyncio.gather(*[bounded(client) for _ in range(self.jobs)])
+            elapsed = time.perf_counter() - started
+            done.set()
+            if sampler:
+                await sampler
+            backend_metrics = (await client.get("/api/jobs/metrics/gpu")).json()
+
+        return {
+            "jobs": self.jobs,
+            "concurrency": self.concurrency,
+            "elapsed_s": round(elapsed, 2),
+            "jobs_per_minute": round(self.outcomes["completed"] / elapsed * 60, 2),
+            "outcomes": self.outcomes,
+            "endpoints": {name: _latency_summary(v) for name, v in self.latencies.items()},
+            "event_loop_lag_seconds": backend_metrics.get("event_loop_lag_seconds"),
+            "rss_peak_mb": round(max(rss_samples) / 2**20, 1) if rss_samples else None,
+            "rss_mean_mb": round(sum(rss_samples) / len(rss_samples) / 2**20, 1) if rss_samples else None,
+            "errors": self.errors,
+        }
+
+
+def _compare(current: dict, previous: dict) -> List[str]:
+    rows = []
+
+    def row(label, new, old):
+        if new is None or old is None:
+            return
+        delta = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        new, old = round(new, 4), round(old, 4)
+        rows.append(f"{label:<32} {old:>12} {new:>12} {delta:>9}")
+
+    row("jobs_per_minute", current["jobs_per_minute"], previous.get("jobs_per_minute"))
+    for name, stats in current["endpoints"].items():
+        old = previous.get("endpoints", {}).get(name, {})
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            row(f"{name}.{key}", stats[key], old.get(key))
+    lag, old_lag = current.get("event_loop_lag_seconds") or {}, previous.get("event_loop_lag_seconds") or {}
+    for key in ("p99", "avg"):
+        row(f"event_loop_lag.{key}_s", lag.get(key), old_lag.get(key))
+    row("rss_peak_mb", current.get("rss_peak_mb"), previous.get("rss_peak_mb"))
+    return [f"{'metric':<32} {'previous':>12} {'current':>12} {'delta':>9}"] + rows
+
+
+async def _main(args) -> dict:
+    processes: List[subprocess.Popen] = []
+    backend_pid = args.backend_pid
+    base_url = args.backend_url
+    try:
+        if not base_url:
+            emulator_url = f"http://127.0.0.1:{args.emulator_port}"
+            processes.append(_spawn(["benchmarks.meshy_emulator:app", "--port", str(args.emulator_port)], {}))
+            await _wait_ready(f"{emulator_url}/stats")
+
+            backend = _spawn(["app.main:app", "--port", str(args.backend_port)], {
+                "MESHY_API_URL": f"{emulator_url}/v1",
+                "MESHY_API_KEY": "emulator",
+                "PROTOSCALE_API_KEY": API_KEY,
+                "RATE_LIMIT_UPLOAD": f"{max(args.jobs * 2, 100)}/hour",
+                "RATE_LIMIT_GENERATE": f"{max(args.jobs * 2, 10)}/hour",
+            })
+            processes.append(backend)
+            backend_pid = backend.pid
+            base_url = f"http://127.0.0.1:{args.backend_port}"
+            await _wait_ready(f"{base_url}/health")
+
+        test = LoadTest(base_url, args.jobs, args.concurrency, args.job_timeout, args.keep_jobs)
+        return await test.run(backend_pid)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--job-timeout", type=float, default=600.0, help="Seconds per job before giving up")
+    parser.add_argument("--backend-url", help="Use a running backend instead of spawning one")
+    parser.add_argument("--backend-pid", type=int, help="PID of --backend-url process for RSS sampling")
+    parser.add_argument("--backend-port", type=int, default=8088)
+    parser.add_argument("--emulator-port", type=int, default=8099)
+    parser.add_argument("--keep-jobs", action="store_true", help="Do not delete jobs afterwards")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Previous JSON report to diff against")
+    args = parser.parse_args()
+
+    result = asyncio.run(_main(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+    if args.compare:
+        print("\n".join(_compare(result, json.loads(Path(args.compare).read_text()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Local Meshy API emulator for load tests (no real Meshy calls, no credits).
+
+Implements create/get/delete for ``image-to-3d``, ``multi-image-to-3d`` and
+``text-to-texture`` under ``/v1`` with configurable latency, progress
+curve, failure rates, throttling (429 + Retry-After past a request rate or
+a cap on unfinished tasks) and GLB fixture size. Point the backend at it with
+``MESHY_API_URL=http://127.0.0.1:8099/v1``.
+
+    python -m benchmarks.meshy_emulator --port 8099 --generation-seconds 20 --failure-rate 0.05
+
+Every option can also be set through ``EMULATOR_*`` environment variables
+(e.g. EMULATOR_GLB_SIZE_MB) when running under uvicorn directly:
+
+    uvicorn benchmarks.meshy_emulator:app --port 8099
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import struct
+import time
+import uuid
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+
+_FIELD_TYPES = {"seed": int, "max_active_tasks": int, "mesh_subdivisions": int, "progress_curve": str}
+
+
+@dataclass
+class EmulatorConfig:
+    create_latency_ms: float = 150.0      # response time of POST create
+    get_latency_ms: float = 30.0          # response time of GET task
+    queue_seconds: float = 3.0            # time spent PENDING
+    generation_seconds: float = 20.0      # time spent IN_PROGRESS
+    fast_variant_factor: float = 0.3      # generation time multiplier for lowpoly / untextured tasks
+    jitter: float = 0.2                   # +/- fraction applied to queue/generation times
+    progress_curve: str = "linear"        # linear | ease-out | steps
+    failure_rate: float = 0.0             # fraction of tasks that end FAILED
+    create_error_rate: float = 0.0        # fraction of POSTs answered 500
+    stuck_rate: float = 0.0               # fraction of tasks that stay IN_PROGRESS forever
+    poll_error_rate: float = 0.0          # fraction of GETs answered 500
+    max_active_tasks: int = 0             # 429 on create while this many tasks are unfinished (0 = off)
+    create_rate_limit: float = 0.0        # 429 on creates above this many per second (0 = off)
+    retry_after_seconds: float = 2.0      # Retry-After sent with 429s
+    glb_size_mb: float = 5.0              # size of the served GLB fixture
+    mesh_subdivisions: int = 4            # icosphere detail of the GLB (faces = 20 * 4**n)
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "EmulatorConfig":
+        config = cls()
+        for f in fields(cls):
+            raw = os.getenv(f"EMULATOR_{f.name.upper()}")
+            if raw is None:
+                continue
+            kind = _FIELD_TYPES.get(f.name, float)
+            setattr(config, f.name, kind(raw))
+        return config
+
+
+@dataclass
+class _Task:
+    task_id: str
+    kind: str
+    created_at: float
+    queue_seconds: float
+    generation_seconds: float
+    fails: bool
+    stuck: bool = False
+
+
+config = EmulatorConfig.from_env()
+_rng = random.Random(config.seed)
+_tasks: Dict[str, _Task] = {}
+_stats = {"deleted": 0, "throttled": 0}
+_create_tokens = {"tokens": 0.0, "updated": time.monotonic()}
+
+app = FastAPI(title="Meshy API emulator")
+
+_KINDS = ("image-to-3d", "multi-image-to-3d", "text-to-texture")
+
+
+def _pad_glb(glb: bytes, target_size: int) -> bytes:
+    """Grow the BIN buffer of a GLB with unreferenced zero bytes (still valid glTF)."""
+    json_len, = struct.unpack_from("<I", glb, 12)
+    doc = json.loads(glb[20:20 + json_len])
+    bin_offset = 20 + json_len
+    bin_len, = struct.unpack_from("<I", glb, bin_offset)
+    binary = glb[bin_offset + 8:bin_offset + 8 + bin_len]
+
+    extra = max(0, target_size - len(glb))
+    extra -= extra % 4
+    doc["buffers"][0]["byteLength"] = len(binary) + extra
+    json_chunk = json.dumps(doc, separators=(",", ":")).encode()
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    binary += b"\0" * extra
+
+    body = (struct.pack("<II", len(json_chunk), 0x4E4F534A) + json_chunk
+            + struct.pack("<II", len(binary), 0x004E4942) + binary)
+    return struct.pack("<III", 0x46546C67, 2, 12 + len(body)) + body
+
+
+@lru_cache(maxsize=4)
+def _glb_fixture(size_bytes: int, subdivisions: int) -> bytes:
+    import trimesh
+
+    glb = trimesh.creation.icosphere(subdivisions=subdivisions).export(file_type="glb")
+    return _pad_glb(glb, size_bytes)
+
+
+@lru_cache(maxsize=1)
+def _thumbnail_fixture() -> bytes:
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (512, 512), (90, 90, 110)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _jittered(seconds: float) -> float:
+    return max(0.0, seconds * (1 + _rng.uniform(-config.jitter, config.jitter)))
+
+
+def _progress(fraction: float) -> int:
+    fraction = min(max(fraction, 0.0), 1.0)
+    if config.progress_curve == "ease-out":
+        fraction = 1 - (1 - fraction) ** 2
+    elif config.progress_curve == "steps":
+        fraction = int(fraction * 4) / 4
+    return min(99, int(fraction * 100))
+
+
+def _unfinished(task: _Task, now: float) -> bool:
+    return task.stuck or now - task.created_at < task.queue_seconds + task.generation_seconds
+
+
+def _throttled() -> bool:
+    now = time.monotonic()
+    if config.max_active_tasks and sum(_unfinished(t, now) for t in _tasks.values()) >= config.max_active_tasks:
+        return True
+    if config.create_rate_limit:
+        # Token bucket with a one-second burst
+        rate = config.create_rate_limit
+        tokens = min(rate, _create_tokens["tokens"] + (now - _create_tokens["updated"]) * rate)
+        _create_tokens["updated"] = now
+        if tokens < 1:
+            _create_tokens["tokens"] = tokens
+            return True
+        _create_tokens["tokens"] = tokens - 1
+    return False
+
+
+def _task_payload(task: _Task, request: Request) -> dict:
+    elapsed = time.monotonic() - task.created_at
+    payload = {"id": task.task_id, "progress": 0, "created_at": int(task.created_at * 1000)}
+    if elapsed < task.queue_seconds:
+        payload["status"] = "PENDING"
+        return payload
+
+    generation_elapsed = elapsed - task.queue_seconds
+    if task.stuck:
+        payload.update(status="IN_PROGRESS", progress=_progress(0.5))
+        return payload
+    if generation_elapsed < task.generation_seconds:
+        payload["status"] = "IN_PROGRESS"
+        payload["progress"] = _progress(generation_elapsed / task.generation_seconds)
+        return payload
+
+    if task.fails:
+        payload.update(status="FAILED", task_error={"message": "Emulated generation failure"})
+        return payload
+
+    base = str(request.base_url).rstrip("/")
+    glb_url = f"{base}/assets/{task.task_id}.glb"
+    payload.update(status="SUCCEEDED", progress=100, thumbnail_url=f"{base}/assets/{task.task_id}.png")
+    if task.kind == "text-to-texture":
+        payload["texture_urls"] = [{"glb_url": glb_url}]
+    else:
+        payload["model_urls"] = {"glb": glb_url}
+    return payload
+
+
+@app.post("/v1/{kind}")
+async def create_task(kind: str, request: Request):
+    if kind not in _KINDS:
+        raise HTTPException(404, f"Unknown endpoint: {kind}")
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = {}
+    await asyncio.sleep(config.create_latency_ms / 1000)
+    if _rng.random() < config.create_error_rate:
+        return JSONResponse({"message": "Emulated server error"}, status_code=500)
+    if _throttled():
+        _stats["throttled"] += 1
+        return JSONResponse({"message": "Too many requests"}, status_code=429,
+                            headers={"Retry-After": str(config.retry_after_seconds)})
+
+    task = _Task(
+        task_id=str(uuid.uuid4()),
+        kind=kind,
+        created_at=time.monotonic(),
+        queue_seconds=_jittered(config.queue_seconds),
+        generation_seconds=_jittered(config.generation_seconds) * (
+            config.fast_variant_factor
+            if payload.get("model_type") == "lowpoly" or payload.get("should_texture") is False else 1.0),
+        fails=_rng.random() < config.failure_rate,
+        stuck=_rng.random() < config.stuck_rate,
+    )
+    _tasks[task.task_id] = task
+    return JSONResponse({"result": task.task_id}, status_code=202)
+
+
+@app.get("/v1/{kind}/{task_id}")
+async def get_task(kind: str, task_id: str, request: Request):
+    await asyncio.sleep(config.get_latency_ms / 1000)
+    task = _tasks.get(task_id)
+    if not task or task.kind != kind:
+        raise HTTPException(404, "Task not found")
+    if _rng.random() < config.poll_error_rate:
+        return JSONResponse({"message": "Emulated server error"}, status_code=500)
+    return _task_payload(task, request)
+
+
+@app.delete("/v1/{kind}/{task_id}")
+async def delete_task(kind: str, task_id: str):
+    task = _tasks.get(task_id)
+    if not task or task.kind != kind:
+        raise HTTPException(404, "Task not found")
+    del _tasks[task_id]
+    _stats["deleted"] += 1
+    return Response(status_code=200)
+
+
+@app.get("/assets/{task_id}.glb")
+async def get_glb(task_id: str):
+    if task_id not in _tasks:
+        raise HTTPException(404, "Task not found")
+    content = await asyncio.to_thread(_glb_fixture, int(config.glb_size_mb * 1024 * 1024), config.mesh_subdivisions)
+    return Response(content, media_type="model/gltf-binary")
+
+
+@app.get("/assets/{task_id}.png")
+async def get_thumbnail(task_id: str):
+    if task_id not in _tasks:
+        raise HTTPException(404, "Task not found")
+    return Response(_thumbnail_fixture(), media_type="image/png")
+
+
+@app.get("/stats")
+async def stats():
+    now = time.monotonic()
+    return {
+        "tasks": len(_tasks),
+        "active": sum(_unfinished(t, now) for t in _tasks.values()),
+        **_stats,
+        "config": config.__dict__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    for f in fields(EmulatorConfig):
+        kind = _FIELD_TYPES.get(f.name, float)
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=kind, default=getattr(config, f.name))
+    args = parser.parse_args()
+    for f in fields(EmulatorConfig):
+        setattr(config, f.name, getattr(args, f.name))
+    _rng.seed(config.seed)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -51,7 +51,9 @@ export const useHistoryStore = defineStore('history', () => {
       const mappedJobs = jobs.map(job => ({
         jobId: job.job_id,
         name: localMap[job.job_id]?.name || job.job_id.slice(0, 8),
-        thumbnailUrl: `${API_BASE}/api/jobs/${job.job_id}/thumbnail`,
+        thumbnailUrl: job.thumbnail_url
+          ? `${API_BASE}${job.thumbnail_url}&size=256`
+          : `${API_BASE}/api/jobs/${job.job_id}/thumbnail?size=256`,
         thumbnailBlobUrl: null, // Will be loaded async
         createdAt: job.created_at,
         modelVersion: job.model_version,